@@ -3,6 +3,8 @@ A module to manage the assets used in the application.
 Author: Viren070
 """
 import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 import customtkinter
@@ -20,6 +22,8 @@ class Assets:
     def __init__(self, paths: Paths):
         self.logger = Logger(__name__).get_logger()
         self.paths = paths
+        self._image_cache = OrderedDict()
+        self._image_cache_lock = threading.Lock()
         # assign the asset directory from Paths object as an attribute for easy access
 
     def define_assets(self):
@@ -67,6 +71,65 @@ class Assets:
         self.logger.debug(f"Creating CTkImage from {image_path}")
         return customtkinter.CTkImage(Image.open(image_path), size=size)
 
+    def get_cached_image(self, key):
+        """
+        Get a customtkinter image object that was previously created with cache_image
+
+        Args:
+            key (str): the key the image was cached under
+
+        Returns:
+            customtkinter.CTkImage or None: the cached image, or None if it is not in the cache
+        """
+        with self._image_cache_lock:
+            image = self._image_cache.get(key)
+            if image is not None:
+                self._image_cache.move_to_end(key)
+            return image
+
+    def cache_image(self, key, image_path, size):
+        """
+        Create a customtkinter image object and keep it in a bounded in-memory LRU cache,
+        so that showing the same image again does not read or decode the file
+
+        Args:
+            key (str): the key to cache the image under
+            image_path (str or pathlib.Path): the path to the image file
+            size (tuple): the size in (x, y) to resize the image to
+
+        Returns:
+            customtkinter.CTkImage: the cached image
+        """
+        image = self.get_cached_image(key)
+        if image is not None:
+            return image
+        with Image.open(image_path) as file:
+            # decode the image now so that the file is not kept open
+            file.load()
+            image = customtkinter.CTkImage(file.copy(), size=size)
+        with self._image_cache_lock:
+            self._image_cache[key] = image
+            while len(self._image_cache) > constants.App.IMAGE_CACHE_SIZE.value:
+                self._image_cache.popitem(last=False)
+        return image
+
+    def create_thumbnail(self, image_path, thumbnail_path, size):
+        """
+        Resize an image to fit within the given size and save it as a PNG file
+
+        Args:
+            image_path (str or pathlib.Path): the path to the image file
+            thumbnail_path (str or pathlib.Path): the path to save the thumbnail to
+            size (tuple): the maximum size in (x, y) of the thumbnail
+
+        Returns:
+            pathlib.Path: the path of the thumbnail
+        """
+        with Image.open(image_path) as image:
+            image.thumbnail(size, Image.LANCZOS)
+            image.save(thumbnail_path, format="PNG")
+        return Path(thumbnail_path)
+
     def get_image_path(self, image_name, extension=".png"):
         """
         Get the path to an image file in the assets/images directory given the image name
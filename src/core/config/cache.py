@@ -1,6 +1,9 @@
 import json
+import os
 import shutil
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 
 from core.config import constants
@@ -12,100 +15,294 @@ class Cache:
     """
     The Cache class is used to store and retrieve data in the cache directory.
 
+    The index is loaded into memory once and guarded by a lock. Changes are appended to
+    a journal file, which is folded back into the index file once it grows past
+    a threshold and whenever the cache is loaded.
+
+    Each entry records its size and when it was last accessed. Once the total size of the entries
+    exceeds the size limit, the least recently accessed entries are evicted. Access times are only
+    updated in memory on a lookup, and are written with the next change to the journal, on a sweep,
+    on compaction or when the cache is closed, so a lookup never writes to the disk.
+
+    Parsed JSON data is also kept in memory, up to the memory limit, so repeated lookups of the same key
+    skip reading and parsing the file. The memoized data is tied to the modification time and size of the file
+    and is dropped when the entry changes. The data is shared between callers, so it must be treated as read-only.
+
     Methods:
-        - is_index_file_valid: Check if the index file is valid.
-        - create_index_file: Create the index file.
-        - get_data_from_cache: Get data from the cache.
-        - add_to_index: Add data to the index file.
-        - remove_from_index: Remove data from the index file.
-        - add_json_data_to_cache: Add JSON data to the cache.
-        - get_json_data_from_cache: Get JSON data from the cache.
-        - add_custom_file_to_cache: Add a custom file to the cache.
+        - add_file: Add a file to the cache.
+        - get_file: Get the path of a file from the cache.
+        - add_json: Add JSON data to the cache.
+        - get_json: Get JSON data from the cache.
+        - compact: Write the in-memory index to the index file and clear the journal.
+        - sweep: Remove expired and missing entries and evict entries over the size limit.
+        - start_sweeper: Sweep the cache periodically in a background thread.
+        - stop_sweeper: Stop the background sweeper.
+        - close: Stop the sweeper and write the index, including the access times that have not been written yet.
+        - stats: Get statistics about the cache.
     """
-    def __init__(self, paths: Paths):
+    def __init__(self, paths: Paths, size_limit: int = constants.App.CACHE_SIZE_LIMIT.value, memory_limit: int = constants.App.CACHE_MEMORY_LIMIT.value):
         self.logger = Logger(__name__ + "." + self.__class__.__name__).get_logger()
         self.paths = paths
         self.cache_directory = self.paths.cache_dir
         self.cache_directory.mkdir(parents=True, exist_ok=True)
         self.index_file = self.cache_directory / "index.json"
-
-        if not self._is_index_file_valid():
-            self._create_index_file()
-
-    def _is_index_file_valid(self):
+        self.journal_file = self.cache_directory / "index.journal"
+        self._lock = threading.RLock()
+        self._index = {}
+        self._journal_length = 0
+        # access times that have only been updated in memory, by key
+        self._unsaved_access_times = {}
+        self.size_limit = size_limit
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._sweeper_thread = None
+        self._stop_sweeper = threading.Event()
+        self.memory_limit = memory_limit
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._memory_hits = 0
+
+        self._load_index()
+
+    def _read_index_file(self):
         """
-        Check if the index file is valid.
+        Read the entries from the index file.
 
         Returns:
-            bool: True if the index file is valid, False otherwise.
+            dict or None: The entries of the index file, or None if the file is missing or invalid.
         """
         if not self.index_file.exists():
-            return False
+            return None
         with open(self.index_file, "r", encoding="utf-8") as file:
             try:
                 contents = json.load(file)
             except json.JSONDecodeError as error:
                 self.logger.error("Index file is not a valid JSON file, full error: %s", error)
-                return False
-            if contents.get("cache_version") != constants.App.CACHE_VERSION.value:
-                self.logger.debug("Cache version mismatch, returning False")
-                return False
-        return True
-
-    def _create_index_file(self):
+                return None
+        if contents.get("cache_version") != constants.App.CACHE_VERSION.value:
+            self.logger.debug("Cache version mismatch, discarding index")
+            return None
+        contents.pop("cache_version")
+        return contents
+
+    def _replay_journal(self):
         """
-        Creates the index file in the cache directory.
+        Apply the changes recorded in the journal to the in-memory index.
         """
-        self.logger.info("Creating cache index file")
-        self.index_file.parent.mkdir(exist_ok=True)
-        with open(self.index_file, "w", encoding="utf-8") as file:
-            json.dump({"cache_version": constants.App.CACHE_VERSION.value}, file)
-
-    def _get_index(self):
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # a partially written line from an interrupted write, everything before it is still valid
+                    self.logger.warning("Ignoring invalid line in cache journal")
+                    continue
+                match record.get("op"):
+                    case "set":
+                        self._index[record["key"]] = record["entry"]
+                    case "remove":
+                        self._index.pop(record["key"], None)
+                    case "touch":
+                        if record["key"] in self._index:
+                            self._index[record["key"]]["last_access"] = record["last_access"]
+                self._journal_length += 1
+
+    def _load_index(self):
         """
-        Get the index file.
-
-        Returns:
-            dict: The contents of the index file.
+        Load the index file and the journal into memory, then compact them.
         """
-        with open(self.index_file, "r", encoding="utf-8") as file:
-            return json.load(file)
+        with self._lock:
+            entries = self._read_index_file()
+            if entries is None:
+                self.logger.info("Creating cache index file")
+                self._index = {}
+                self.journal_file.unlink(missing_ok=True)
+            else:
+                self._index = entries
+                self._replay_journal()
+            for key, entry in list(self._index.items()):
+                if not isinstance(entry, dict):
+                    self.logger.error("Data for key %s is invalid, removing from index", key)
+                    del self._index[key]
+                    continue
+                # entries written by older versions do not record their size or access time
+                if "size" not in entry:
+                    entry["size"] = self._get_file_size(entry.get("path"))
+                    entry.setdefault("last_access", time.time())
+            self.compact()
+
+    def compact(self):
+        """
+        Write the in-memory index to the index file and clear the journal.
+        """
+        with self._lock:
+            contents = {"cache_version": constants.App.CACHE_VERSION.value}
+            contents.update(self._index)
+            temporary_file = self.index_file.with_suffix(".tmp")
+            with open(temporary_file, "w", encoding="utf-8") as file:
+                json.dump(contents, file)
+            os.replace(temporary_file, self.index_file)
+            self.journal_file.unlink(missing_ok=True)
+            self._journal_length = 0
+            self._unsaved_access_times.clear()
+
+    def _append_to_journal(self, record: dict = None):
+        """
+        Append a change to the journal, along with the access times that have not been written yet,
+        compacting the index once the journal is long enough.
 
-    def _set_index(self, data: dict):
+        Args:
+            record (dict, optional): The change to record. If not given, only the access times are written.
+        """
+        with self._lock:
+            records = [
+                {"op": "touch", "key": key, "last_access": last_access}
+                for key, last_access in self._unsaved_access_times.items() if key in self._index
+            ]
+            self._unsaved_access_times.clear()
+            if record is not None:
+                records.append(record)
+            if not records:
+                return
+            with open(self.journal_file, "a", encoding="utf-8") as file:
+                file.write("".join(json.dumps(record) + "\n" for record in records))
+            self._journal_length += len(records)
+            if self._journal_length >= constants.App.CACHE_JOURNAL_COMPACT_THRESHOLD.value:
+                self.compact()
+
+    def _get_file_size(self, path):
         """
-        Set the index file.
+        Get the size of a cached file, treating missing files as empty.
 
         Args:
-            data (dict): The data to write to the index file.
+            path (str): The path of the file.
+
+        Returns:
+            int: The size of the file in bytes.
         """
-        with open(self.index_file, "w", encoding="utf-8") as file:
-            json.dump(data, file)
+        try:
+            return Path(path).stat().st_size
+        except (OSError, TypeError):
+            return 0
 
     def _add_path_to_index(self, key: str, path: str, ttl: float):
         """
-        Add a given path to the index file.
+        Add a given path to the index, evicting other entries if the cache is over its size limit.
 
         Args:
             key (str): The key to store the data under.
             path (str): The path to store with the key.
             ttl (float): The time-to-live for the cache entry.
         """
-        if not self._is_index_file_valid():
-            self._create_index_file()
-            return {
-                "status": False,
-            }
-
-        index = self._get_index()
-        index[key] = {
+        entry = {
             "path": str(path),  # Ensure path is stored as a string
             "ttl": ttl,
+            "size": self._get_file_size(path),
+            "last_access": time.time(),
         }
-        self._set_index(index)
+        with self._lock:
+            self._forget_in_memory(key)
+            self._index[key] = entry
+            self._append_to_journal({"op": "set", "key": key, "entry": entry})
+            self._evict_to_fit(keep=key)
+
+    def _remember_in_memory(self, key: str, signature: tuple, data):
+        """
+        Keep parsed data in memory, evicting the least recently used data once the memory limit is exceeded.
+
+        Args:
+            key (str): The key the data is stored under.
+            signature (tuple): The modification time and size of the file the data was parsed from.
+            data: The parsed data.
+        """
+        # the size of the file is used as an estimate of the size of the parsed data
+        size = signature[1]
+        if size > self.memory_limit:
+            return
+        with self._lock:
+            self._forget_in_memory(key)
+            self._memory[key] = (signature, data, size)
+            self._memory_size += size
+            while self._memory_size > self.memory_limit:
+                _, (_, _, evicted_size) = self._memory.popitem(last=False)
+                self._memory_size -= evicted_size
+
+    def _recall_from_memory(self, key: str, signature: tuple):
+        """
+        Get parsed data from memory if it was parsed from the current version of the file.
+
+        Args:
+            key (str): The key the data is stored under.
+            signature (tuple): The current modification time and size of the file.
+
+        Returns:
+            tuple: Whether the data was found, and the data.
+        """
+        with self._lock:
+            memoized = self._memory.get(key)
+            if memoized is None:
+                return False, None
+            if memoized[0] != signature:
+                self._forget_in_memory(key)
+                return False, None
+            self._memory.move_to_end(key)
+            self._memory_hits += 1
+            return True, memoized[1]
+
+    def _forget_in_memory(self, key: str):
+        """
+        Drop the parsed data for the given key from memory.
+
+        Args:
+            key (str): The key to drop.
+        """
+        with self._lock:
+            memoized = self._memory.pop(key, None)
+            if memoized is not None:
+                self._memory_size -= memoized[2]
+
+    def _evict_to_fit(self, keep: str = None):
+        """
+        Evict the least recently accessed entries until the cache is within its size limit.
+
+        Args:
+            keep (str, optional): A key that should not be evicted, such as the entry that was just added.
+        """
+        with self._lock:
+            total_size = sum(entry.get("size", 0) for entry in self._index.values())
+            if total_size <= self.size_limit:
+                return
+            candidates = sorted(
+                (entry.get("last_access", 0), key) for key, entry in self._index.items() if key != keep
+            )
+            for _, key in candidates:
+                if total_size <= self.size_limit:
+                    break
+                self.logger.debug("Evicting %s from the cache", key)
+                total_size -= self._index[key].get("size", 0)
+                self._remove_from_index(key, delete_file=True)
+                self._evictions += 1
+
+    def _touch(self, key: str):
+        """
+        Record that the entry for the given key was accessed. The access time is written with the next change.
+
+        Args:
+            key (str): The key that was accessed.
+        """
+        last_access = time.time()
+        with self._lock:
+            if key not in self._index:
+                return
+            self._index[key]["last_access"] = last_access
+            self._unsaved_access_times[key] = last_access
 
     def _get_path_from_index(self, key: str):
         """
-        Get a given path from the index file.
+        Get a given path from the index.
 
         Args:
             key (str): The key to get the path for.
@@ -113,20 +310,15 @@ class Cache:
         Returns:
             dict: A dictionary with the status and path.
         """
-        if not self._is_index_file_valid():
-            self._create_index_file()
-            return {
-                "status": False,
-            }
-
-        index = self._get_index()
-        if key not in index:
+        with self._lock:
+            data = self._index.get(key)
+        if data is None:
             self.logger.debug("Key %s not found in cache", key)
+            self._misses += 1
             return {
                 "status": False,
             }
 
-        data = index.get(key)
         try:
             path = Path(data["path"])
             ttl = data["ttl"]
@@ -134,41 +326,151 @@ class Cache:
             # index entry is invalid, remove it
             self.logger.error("Data for key %s is invalid: %s", key, error)
             self._remove_from_index(key)
+            self._misses += 1
             return {
                 "status": False,
             }
 
-        if not path.exists():
+        try:
+            file_stat = path.stat()
+            modified_time = file_stat.st_mtime
+        except FileNotFoundError:
             self.logger.debug("Cache file %s does not exist, removing from index", path)
             self._remove_from_index(key)
+            self._misses += 1
             return {
                 "status": False,
             }
 
-        if path.stat().st_mtime + ttl < time.time():
+        if modified_time + ttl < time.time():
             self.logger.debug("Cache file %s is older than the ttl, removing", path)
-            path.unlink()
-            self._remove_from_index(key)
+            self._remove_from_index(key, delete_file=True)
+            self._misses += 1
             return {
                 "status": False,
             }
 
+        self._hits += 1
+        self._touch(key)
         self.logger.debug("Got path from cache under key %s", key)
         return {
             "status": True,
             "path": path,
+            "signature": (file_stat.st_mtime_ns, file_stat.st_size),
         }
 
-    def _remove_from_index(self, key: str):
+    def _remove_from_index(self, key: str, delete_file: bool = False):
         """
-        Remove a given key from the index file.
+        Remove a given key from the index.
 
         Args:
             key (str): The key to remove from the index.
+            delete_file (bool, optional): Whether to also delete the cached file.
+        """
+        with self._lock:
+            self._forget_in_memory(key)
+            entry = self._index.pop(key, None)
+            if entry is None:
+                return
+            self._append_to_journal({"op": "remove", "key": key})
+        if delete_file and isinstance(entry, dict) and entry.get("path"):
+            try:
+                Path(entry["path"]).unlink(missing_ok=True)
+            except OSError as error:
+                self.logger.error("Failed to delete cache file %s: %s", entry["path"], error)
+
+    def sweep(self):
+        """
+        Remove entries that have expired or whose file no longer exists,
+        then evict entries until the cache is within its size limit.
+
+        Returns:
+            int: The number of entries that were removed.
+        """
+        now = time.time()
+        removed = 0
+        with self._lock:
+            entries = list(self._index.items())
+        for key, entry in entries:
+            try:
+                path = Path(entry["path"])
+                modified_time = path.stat().st_mtime
+            except (KeyError, TypeError, OSError):
+                self._remove_from_index(key)
+                removed += 1
+                continue
+            if modified_time + entry.get("ttl", float("inf")) < now:
+                self.logger.debug("Cache file %s is older than the ttl, removing", path)
+                self._remove_from_index(key, delete_file=True)
+                removed += 1
+        evictions = self._evictions
+        self._evict_to_fit()
+        removed += self._evictions - evictions
+        self._append_to_journal()
+        self.logger.info("Swept the cache and removed %s entries", removed)
+        return removed
+
+    def start_sweeper(self, interval: float = constants.App.CACHE_SWEEP_INTERVAL.value):
+        """
+        Sweep the cache now and then periodically in a daemon thread.
+
+        Args:
+            interval (float, optional): The number of seconds between sweeps.
+        """
+        if self._sweeper_thread is not None and self._sweeper_thread.is_alive():
+            return
+        self._stop_sweeper.clear()
+
+        def run():
+            while True:
+                try:
+                    self.sweep()
+                except Exception as error:
+                    self.logger.error("Failed to sweep the cache: %s", error)
+                if self._stop_sweeper.wait(interval):
+                    return
+
+        self._sweeper_thread = threading.Thread(target=run, name="CacheSweeper", daemon=True)
+        self._sweeper_thread.start()
+
+    def stop_sweeper(self):
+        """
+        Stop the background sweeper if it is running.
+        """
+        self._stop_sweeper.set()
+
+    def close(self):
+        """
+        Stop the background sweeper and write the index, including the access times that have not been written yet.
+        """
+        self.stop_sweeper()
+        self.compact()
+
+    def stats(self):
         """
-        index = self._get_index()
-        index.pop(key, None)  # Use pop with default to avoid KeyError
-        self._set_index(index)
+        Get statistics about the cache.
+
+        Returns:
+            dict: A dictionary with fields: entries (int), bytes (int), size_limit (int), hits (int),
+                misses (int), hit_rate (float), evictions (int), memory_entries (int), memory_bytes (int)
+                and memory_hits (int).
+        """
+        with self._lock:
+            entries = len(self._index)
+            total_size = sum(entry.get("size", 0) for entry in self._index.values())
+        lookups = self._hits + self._misses
+        return {
+            "entries": entries,
+            "bytes": total_size,
+            "size_limit": self.size_limit,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "evictions": self._evictions,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "memory_hits": self._memory_hits,
+        }
 
     def add_file(self, key: str, file: Path, ttl: float = float("inf")):
         """
@@ -178,14 +480,18 @@ class Cache:
             key (str): The key to store the file under.
             file (pathlib.Path): The file to store in the cache.
             ttl (float): The time to live for the data in the cache in seconds. Default is infinity.
-        """
-        if not self._is_index_file_valid():
-            self._create_index_file()
 
+        Returns:
+            dict: A dictionary with the status and path.
+        """
         self.logger.debug("Adding file to cache under key %s", key)
         cache_file = self.cache_directory / file.name
         shutil.move(file, cache_file)
         self._add_path_to_index(key, cache_file, ttl)
+        return {
+            "status": True,
+            "path": cache_file,
+        }
 
     def get_file(self, key: str):
         """
@@ -202,27 +508,33 @@ class Cache:
     def add_json(self, key: str, data, ttl: float = float("inf")):
         """
         Create a JSON file in the cache directory with the given data.
-        Add the key and the path to the index file, with the ttl.
+        Add the key and the path to the index, with the ttl.
 
         Args:
             key (str): The key to store the data under.
             data: The data to store in the json file.
             ttl (float): The time to live for the data in the cache in seconds. Default is infinity.
-        """
-        if not self._is_index_file_valid():
-            self._create_index_file()
 
+        Returns:
+            dict: A dictionary with the status and path.
+        """
         self.logger.debug("Adding dictionary to cache under key %s", key)
         cache_file = self.cache_directory / f"{key}.json"
         with open(cache_file, "w", encoding="utf-8") as file:
             json.dump(data, file)
 
         self._add_path_to_index(key, str(cache_file), ttl)
+        return {
+            "status": True,
+            "path": cache_file,
+        }
 
     def get_json(self, key: str):
         """
         Get a dictionary from the cache. If the data is older than the ttl, it will be removed.
 
+        The returned data may be shared with other callers and must not be modified.
+
         Args:
             key (str): The key to get the data for.
 
@@ -236,6 +548,14 @@ class Cache:
                 "status": False,
             }
 
+        found, contents = self._recall_from_memory(key, file_info["signature"])
+        if found:
+            self.logger.debug("Got dictionary from memory under key %s", key)
+            return {
+                "status": True,
+                "data": contents,
+            }
+
         with open(file_info["path"], "r", encoding="utf-8") as file:
             try:
                 contents = json.load(file)
@@ -244,6 +564,7 @@ class Cache:
                 return {
                     "status": False,
                 }
+        self._remember_in_memory(key, file_info["signature"], contents)
         self.logger.debug("Got dictionary from cache under key %s", key)
         return {
             "status": True,
@@ -7,6 +7,10 @@ class App(Enum):
     VERSION = "0.14.0a1"
     SETTINGS_VERSION = 5
     CACHE_VERSION = 2
+    CACHE_JOURNAL_COMPACT_THRESHOLD = 200
+    CACHE_SIZE_LIMIT = 1024 * 1024 * 512
+    CACHE_SWEEP_INTERVAL = 60 * 60
+    CACHE_MEMORY_LIMIT = 1024 * 1024 * 64
     GH_OWNER = "Viren070"
     GH_REPO = "EmuHaven"
     GH_ASSET_REGEX = r"EmuHaven.*\.zip"
@@ -16,6 +20,24 @@ class App(Enum):
     DEFAULT_COLOUR_THEMES = ["blue", "dark-blue", "green"]
     VALID_APPEARANCE_MODES = ["dark", "light"]
     RESULTS_PER_GAME_PAGE = 20
+    PROGRESS_REFRESH_INTERVAL = 100
+    PROGRESS_SPEED_WINDOW = 5
+    IMAGE_CACHE_SIZE = 100
+    EVENT_POLL_INTERVAL = 50
+    COPY_WORKERS = 8
+    COPY_BUFFER_SIZE = 1024 * 1024
+    COPY_LARGE_FILE_THRESHOLD = 1024 * 1024 * 16
+    EXTRACT_WORKERS = 4
+    ROM_LIBRARY_RESCAN_INTERVAL = 60 * 60 * 24
+    VERIFY_WORKERS = 4
+    VERIFY_BUFFER_SIZE = 1024 * 1024 * 8
+    ARTIFACT_STORE_SIZE_LIMIT = 1024 * 1024 * 1024 * 2
+    EVENT_WORKERS = {
+        "critical": 4,
+        "normal": 8,
+        "transfer": 4,
+        "background": 4,
+    }
 
 
 class GitHubOAuth(Enum):
@@ -33,10 +55,14 @@ class GitHub(Enum):
     API_RATE_LIMIT = API_URL + "rate_limit"
     API_USER = API_URL + "user"
     RAW_URL = "https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}"
+    CONDITIONAL_CACHE_TTL = 60 * 60 * 24 * 30
+    IN_MEMORY_RESPONSE_LIMIT = 64
 
 
 class Myrient(Enum):
     BASE_URL = "https://myrient.erista.me/files/"
+    CATALOG_TTL = 60 * 60 * 24
+    CATALOG_SEARCH_LIMIT = 500
 
 
 class Dolphin(Enum):
@@ -63,6 +89,7 @@ class Xenia(Enum):
     GH_CANARY_RELEASE_ASSET_REGEX = r"xenia_canary.zip"
     MYRIENT_XBOX_360_PATH = "Redump/Microsoft - Xbox 360/"
     MYRIENT_XBOX_360_DIGITAL_PATH = "No-Intro/Microsoft - Xbox 360 (Digital)/"
+    GAME_FILE_EXTENSIONS = [".iso", ".xex", ".zar"]
     USER_FOLDERS = ["xenia.config.toml", "xenia-canary.config.toml", "content"]
 
 
@@ -76,6 +103,11 @@ class Switch(Enum):
     TITLEDB_GH_REPO_NAME = "NX_TitleDB"
     TITLEDB_FILENAME = "titles-tiny.US.en.json"
     TITLEDB_DOWNLOAD_URL = f"https://github.com/{TITLEDB_GH_REPO_OWNER}/{TITLEDB_GH_REPO_NAME}/releases/download/latest/{TITLEDB_FILENAME}"
+    TITLEDB_INDEX_FILENAME = "titles-tiny.US.en.idx"
+    TITLEDB_TTL = 60 * 60 * 24 * 7
+    FIRMWARE_KEYS_TTL = 60 * 60
+    ICON_SIZE = (224, 224)
+    ICON_PREFETCH_CONCURRENCY = 8
     TITLEID_BLACKLIST = ["0100000000001009"]
     GAMES_URLS = []
 
@@ -109,3 +141,13 @@ class Requests(Enum):
         "Authorization": "BEARER {GH_TOKEN}",
         "X-GitHub-Api-Version": "2022-11-28",
     }
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 16
+    ASYNC_MAX_CONNECTIONS = 64
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.5
+    RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+    DOWNLOAD_CONNECTIONS = 4
+    SEGMENTED_DOWNLOAD_MIN_SIZE = 1024 * 1024 * 32
+    MIN_SEGMENT_SIZE = 1024 * 1024 * 8
+    PARTIAL_SAVE_INTERVAL = 1024 * 1024 * 16
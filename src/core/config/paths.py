@@ -20,6 +20,10 @@ class Paths:
         self.logger.info("Portable mode: %s", portable_mode)
         self.logger.info("App directory: %s", self.app_dir)
         self.cache_dir = self.app_dir / "cache"
+        self.sync_manifest_dir = self.app_dir / "sync"
+        self.myrient_catalog_file = self.app_dir / "myrient_catalog.db"
+        self.dat_dir = self.app_dir / "dats"
+        self.artifact_dir = self.app_dir / "artifacts"
         self.asset_dir = Path(__file__).resolve().parent.parent.parent / "assets"
         self.versions_file = self.app_dir / "versions.json"
         self.settings_file = self.app_dir / "settings.json"
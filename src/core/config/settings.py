@@ -23,6 +23,7 @@ class Settings:
             "auto_emulator_updates": True,
             "announcements_read": [],
             "firmware_denied": False,
+            "cache_size_limit": 512,
             "token": ""
 
         }
@@ -88,7 +89,8 @@ class Settings:
                 "delete_files_after_installing": "",
                 "auto_app_updates": "",
                 "auto_emulator_updates": "",
-                "firmware_denied": ""
+                "firmware_denied": "",
+                "cache_size_limit": ""
             }
         }
 
@@ -170,6 +172,7 @@ class Settings:
                 "auto_app_updates": self.auto_app_updates,
                 "auto_emulator_updates": self.auto_emulator_updates,
                 "firmware_denied": self.firmware_denied,
+                "cache_size_limit": self.cache_size_limit,
                 "announcements_read": self.announcements_read,
             }
         }
@@ -213,6 +216,10 @@ class Settings:
         lambda self: self._get_property("firmware_denied"),
         lambda self, value: self._set_property("firmware_denied", value),
     )
+    cache_size_limit = property(
+        lambda self: self._get_property("cache_size_limit"),
+        lambda self, value: self._set_property("cache_size_limit", value),
+    )
     announcements_read = property(
         lambda self: self._get_property("announcements_read"),
         lambda self, value: self._set_property("announcements_read", value),
@@ -5,14 +5,13 @@ import subprocess
 from pathlib import Path
 from zipfile import ZipFile
 
-import py7zr
-
 from core.config import constants
 from core.logging.logger import Logger
-from core.network.web import (download_file_with_progress,
-                              get_all_files_from_page)
+from core.network.web import download_artifact, get_all_files_from_page
 from core.utils.files import (copy_directory_with_progress,
+                              extract_7z_archive_with_progress,
                               extract_zip_archive_with_progress)
+from core.utils.sync import get_manifest_path, sync_directories
 
 
 class Dolphin:
@@ -108,10 +107,11 @@ class Dolphin:
         return {"status": False, "message": "Unable to find a release for your system"}
 
     def download_release(self, release, progress_handler=None):
-        return download_file_with_progress(
+        return download_artifact(
             download_url=release["download_url"],
             download_path=Path(release["filename"]).resolve(),
             progress_handler=progress_handler,
+            size=release.get("size"),
         )
 
     def extract_release(self, release: Path, progress_handler=None):
@@ -134,56 +134,8 @@ class Dolphin:
                 }
 
     def _extract_7z_archive(self, release_archive, progress_handler):
-
-        # check if the installation directory exists and has files
-        if self.settings.dolphin.install_directory.exists() and self.settings.dolphin.install_directory.iterdir():
-            # delete old installation
-            # check for portable mode and temporarily move the user directory
-            pass
-        self.settings.dolphin.install_directory.mkdir(exist_ok=True, parents=True)
-
-        try:
-            with py7zr.SevenZipFile(release_archive, mode="r") as archive:
-                archive.extractall(path=self.settings.dolphin.install_directory)
-        except Exception as error:
-            self.logger.error("Error extracting 7z archive: %s", error)
-            return {
-                "status": False,
-                "message": "Extraction failed",
-                "error": error,
-                "extracted_files": []
-            }
-
-        parent_folder = self.settings.dolphin.install_directory
-        subfolder = self.settings.dolphin.install_directory / "Dolphin-x64"
-
-        # move all files from the subfolder to the parent folder
-        progress_handler.set_total_units(len(list(subfolder.iterdir())))
-        progress_handler.report_progress(5)
-        for x, item in enumerate(subfolder.iterdir()):
-            destination = parent_folder / item.name
-
-            # If the destination exists, remove it
-            if destination.exists():
-                if destination.is_dir():
-                    # cant use rmdir as it only works on empty directories
-                    shutil.rmtree(destination)
-                else:
-                    destination.unlink()
-
-            # Move the item to the parent folder
-            shutil.move(str(item), str(destination))
-            progress_handler.report_progress(x + 1)
-
-        subfolder.rmdir()
-
-        progress_handler.report_progress(1)
-        progress_handler.report_success()
-        return {
-            "status": True,
-            "message": "Extraction successful",
-            "extracted_files": []
-        }
+        # the contents of the Dolphin-x64 folder of the archive are renamed into the install directory once it is extracted
+        return extract_7z_archive_with_progress(release_archive, self.settings.dolphin.install_directory, progress_handler, strip_top_folder=True)
 
     def _extract_zip_archive(self, release_archive, progress_handler):
         return extract_zip_archive_with_progress(release_archive, self.settings.dolphin.install_directory, progress_handler)
@@ -214,8 +166,8 @@ class Dolphin:
             current_data_path = self.get_user_directory()
 
             if last_used_data_path is not None and last_used_data_path.exists() and last_used_data_path != current_data_path:
-                self.logger.info("Copying user directory from %s to %s", last_used_data_path, current_data_path)
-                shutil.copytree(last_used_data_path, current_data_path, dirs_exist_ok=True)
+                self.logger.info("Syncing user directory from %s to %s", last_used_data_path, current_data_path)
+                sync_directories(last_used_data_path, current_data_path, get_manifest_path(self.settings.paths.sync_manifest_dir, current_data_path), move=False)
 
         if self.settings.dolphin.portable_mode:
             (self.settings.dolphin.install_directory / "portable.txt").touch()
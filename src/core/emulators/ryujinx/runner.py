@@ -9,9 +9,10 @@ from core.config import constants
 from core.emulators.switch_emulator import SwitchEmulator
 from core.utils.files import (copy_directory_with_progress,
                               extract_zip_archive_with_progress)
+from core.utils.sync import get_manifest_path, sync_directories
 from core.network.github import get_latest_release_with_asset
 from core.logging.logger import Logger
-from core.network.web import download_file_with_progress
+from core.network.web import download_artifact
 
 
 class Ryujinx(SwitchEmulator):
@@ -63,10 +64,11 @@ class Ryujinx(SwitchEmulator):
         )
 
     def download_release(self, release, progress_handler=None):
-        return download_file_with_progress(
+        return download_artifact(
             download_url=release["download_url"],
             download_path=Path(release["filename"]).resolve(),
-            progress_handler=progress_handler
+            progress_handler=progress_handler,
+            size=release.get("size"),
         )
 
     def extract_release(self, zip_path, progress_handler=None):
@@ -106,9 +108,8 @@ class Ryujinx(SwitchEmulator):
             current_data_path = ensure_user_directory()
 
             if last_used_data_path is not None and last_used_data_path.exists() and last_used_data_path != current_data_path:
-                self.logger.info("Copying user directory from %s to %s", last_used_data_path, current_data_path)
-                shutil.copytree(last_used_data_path, current_data_path, dirs_exist_ok=True)
-                shutil.rmtree(last_used_data_path)
+                self.logger.info("Syncing user directory from %s to %s", last_used_data_path, current_data_path)
+                sync_directories(last_used_data_path, current_data_path, get_manifest_path(self.settings.paths.sync_manifest_dir, current_data_path), move=True)
 
         if not self.settings.ryujinx.portable_mode and (self.settings.ryujinx.install_directory / "publish" / "portable").exists():
             return {
@@ -5,9 +5,11 @@ from pathlib import Path
 from packaging import version
 
 from core.config import constants
+from core.emulators.titledb import build_titledb_index
 from core.network.github import get_all_releases, get_file_list
+from core.utils.files import extract_zip_members
 from core.utils.progress_handler import ProgressHandler
-from core.network.web import download_file_with_progress
+from core.network.web import download_artifact, download_file_with_progress
 
 
 class SwitchEmulator:
@@ -108,17 +110,19 @@ class SwitchEmulator:
             return False
 
     def download_firmware_release(self, release, progress_handler=None):
-        return download_file_with_progress(
+        return download_artifact(
             download_url=release["download_url"],
             download_path=Path(release["filename"]).resolve(),
             progress_handler=progress_handler,
+            size=release.get("size"),
         )
 
     def download_keys_release(self, release, progress_handler=None):
-        return download_file_with_progress(
+        return download_artifact(
             download_url=release["download_url"],
             download_path=Path(release["filename"]).resolve(),
             progress_handler=progress_handler,
+            size=release.get("size"),
         )
 
     def install_firmware_from_archive(self, firmware_source, progress_handler=None):
@@ -128,17 +132,10 @@ class SwitchEmulator:
         if firmware_directory.exists():
             shutil.rmtree(firmware_directory)
         firmware_directory.mkdir(parents=True, exist_ok=True)
-        extracted_files = []
-        rollback_needed = False
         try:
-            with zipfile.ZipFile(open(firmware_source, "rb"), 'r') as archive:
-                total = len(archive.namelist())
-                progress_handler.set_total_units(total)
+            jobs = []
+            with zipfile.ZipFile(firmware_source, 'r') as archive:
                 for entry in archive.infolist():
-                    if progress_handler.should_cancel():
-                        progress_handler.cancel()
-                        rollback_needed = True
-                        break
                     if not (entry.filename.endswith(".nca") or entry.filename.endswith(".nca/00")):
                         continue
                     path_components = entry.filename.replace(".cnmt", "").split("/")
@@ -146,19 +143,23 @@ class SwitchEmulator:
                     if nca_id == "00":
                         nca_id = path_components[-2]
                     if ".nca" not in nca_id:
-                        progress_handler.set_total_units(total - 1)
                         continue
                     new_path = firmware_directory / nca_id
                     if self.emulator == "ryujinx":
-                        new_path.mkdir(exist_ok=True)
-                        with open((new_path / "00"), "wb") as f:
-                            f.write(archive.read(entry))
+                        jobs.append((entry, new_path / "00"))
                     elif self.emulator == "yuzu":
-                        firmware_directory.mkdir(exist_ok=True)
-                        with open(new_path, "wb") as f:
-                            f.write(archive.read(entry))
-                    extracted_files.append(entry.filename)
-                    progress_handler.report_progress(len(extracted_files))
+                        jobs.append((entry, new_path))
+            progress_handler.set_total_units(sum(entry.file_size for entry, _ in jobs) / 1024 / 1024)
+            # the NCAs are streamed to disk in parallel instead of being read into memory one at a time
+            extract_result = extract_zip_members(
+                firmware_source,
+                jobs,
+                on_progress=lambda written_bytes: progress_handler.report_progress(written_bytes / 1024 / 1024),
+                should_cancel=progress_handler.should_cancel,
+            )
+            rollback_needed = extract_result["cancelled"]
+            if rollback_needed:
+                progress_handler.cancel()
 
         except Exception as error:
             progress_handler.report_error(error)
@@ -311,6 +312,13 @@ class SwitchEmulator:
             progress_handler=progress_handler,
         )
 
+    @staticmethod
+    def build_titledb_index(titledb_path):
+        return build_titledb_index(
+            titledb_path=titledb_path,
+            index_path=titledb_path.with_name(constants.Switch.TITLEDB_INDEX_FILENAME.value),
+        )
+
     @staticmethod
     def get_saves_list():
         saves = get_file_list(
@@ -0,0 +1,179 @@
+"""
+A compact binary index of the TitleDB.
+
+The index file starts with a header, followed by fixed-width records sorted by title ID
+and a heap of UTF-8 strings that the records point into:
+
+    header:  magic (8 bytes), record count (uint32), reserved (uint32)
+    record:  title ID (uint64), then the offset and length (uint32 each) of the name,
+             description and icon URL in the string heap
+
+Lookups binary search the records of the memory-mapped file, so only the pages that are
+touched are read and the TitleDB never has to be parsed into memory.
+"""
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from core.logging.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+MAGIC = b"EHTDB\x00\x00\x01"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<QIIIIII")
+TITLE_ID = struct.Struct("<Q")
+FIELDS = ("name", "description", "iconUrl")
+
+
+def normalize_title_id(title_id):
+    """
+    Convert a title ID to its integer value.
+
+    Args:
+        title_id (str or int): The title ID as a hexadecimal string or an integer.
+
+    Returns:
+        int or None: The title ID, or None if it is not a valid title ID.
+    """
+    if isinstance(title_id, int):
+        return title_id if 0 <= title_id < 2**64 else None
+    title_id = str(title_id).strip()
+    if len(title_id) != 16:
+        return None
+    try:
+        return int(title_id, 16)
+    except ValueError:
+        return None
+
+
+def build_titledb_index(titledb_path: Path, index_path: Path):
+    """
+    Convert a TitleDB JSON file into a binary index.
+
+    Args:
+        titledb_path (pathlib.Path): The path to the TitleDB JSON file.
+        index_path (pathlib.Path): The path to write the index to.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str), index_path (pathlib.Path) and count (int)
+    """
+    try:
+        with open(titledb_path, "r", encoding="utf-8") as file:
+            titledb = json.load(file)
+    except (OSError, json.JSONDecodeError) as error:
+        logger.error("Failed to read the TitleDB at %s: %s", titledb_path, error)
+        return {"status": False, "message": f"Failed to read the TitleDB: {error}", "index_path": None, "count": 0}
+
+    records = {}
+    for key, meta in titledb.items():
+        if not isinstance(meta, dict):
+            continue
+        title_id = normalize_title_id(meta.get("id") or key)
+        if title_id is None:
+            continue
+        records[title_id] = meta
+
+    heap = bytearray()
+    heap_offsets = {}
+    packed_records = []
+    for title_id in sorted(records):
+        fields = []
+        for field in FIELDS:
+            encoded = str(records[title_id].get(field) or "").encode("utf-8")
+            # identical strings, such as empty descriptions, are stored once
+            if encoded not in heap_offsets:
+                heap_offsets[encoded] = len(heap)
+                heap.extend(encoded)
+            fields.extend((heap_offsets[encoded], len(encoded)))
+        packed_records.append(RECORD.pack(title_id, *fields))
+
+    temporary_path = index_path.with_name(index_path.name + ".tmp")
+    try:
+        with open(temporary_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, len(packed_records), 0))
+            file.write(b"".join(packed_records))
+            file.write(heap)
+        os.replace(temporary_path, index_path)
+    except OSError as error:
+        temporary_path.unlink(missing_ok=True)
+        logger.error("Failed to write the TitleDB index to %s: %s", index_path, error)
+        return {"status": False, "message": f"Failed to write the TitleDB index: {error}", "index_path": None, "count": 0}
+
+    logger.info("Built TitleDB index with %s titles", len(packed_records))
+    return {"status": True, "message": "TitleDB index built successfully", "index_path": index_path, "count": len(packed_records)}
+
+
+class TitleDBIndex:
+    """
+    Read-only access to a binary TitleDB index through a memory map.
+
+    Methods:
+        - get: Get the name, description and icon URL of a title.
+        - close: Unmap and close the index file.
+    """
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self._file = open(index_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count, _ = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{index_path} is not a TitleDB index")
+            self._heap_start = HEADER.size + self.count * RECORD.size
+            if len(self._map) < self._heap_start:
+                raise ValueError(f"TitleDB index {index_path} is truncated")
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self.count
+
+    def _find(self, title_id: int):
+        low, high = 0, self.count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            current = TITLE_ID.unpack_from(self._map, offset)[0]
+            if current == title_id:
+                return offset
+            if current < title_id:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+
+    def get(self, title_id):
+        """
+        Get the metadata of a title.
+
+        Args:
+            title_id (str or int): The title ID to look up.
+
+        Returns:
+            dict or None: A dictionary with fields: name, description and iconUrl, or None if the title is not in the index.
+        """
+        title_id = normalize_title_id(title_id)
+        if title_id is None:
+            return None
+        offset = self._find(title_id)
+        if offset is None:
+            return None
+        fields = RECORD.unpack_from(self._map, offset)[1:]
+        meta = {}
+        for index, field in enumerate(FIELDS):
+            start = self._heap_start + fields[index * 2]
+            meta[field] = self._map[start:start + fields[index * 2 + 1]].decode("utf-8")
+        return meta
+
+    def close(self):
+        """
+        Unmap and close the index file.
+        """
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
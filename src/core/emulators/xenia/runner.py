@@ -10,7 +10,7 @@ from core.config import constants
 from core.logging.logger import Logger
 from core.utils.files import extract_zip_archive_with_progress, copy_directory_with_progress
 from core.network.github import get_latest_release_with_asset
-from core.network.web import download_file_with_progress
+from core.network.web import download_artifact
 
 
 class Xenia:
@@ -61,10 +61,11 @@ class Xenia:
         )
 
     def download_xenia_release(self, release, progress_handler=None):
-        return download_file_with_progress(
+        return download_artifact(
             download_url=release["download_url"],
             download_path=Path(release["filename"]).resolve(),
             progress_handler=progress_handler,
+            size=release.get("size"),
         )
 
     def extract_xenia_release(self, release, progress_handler=None):
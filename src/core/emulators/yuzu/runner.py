@@ -8,6 +8,7 @@ from core.config import constants
 from core.emulators.switch_emulator import SwitchEmulator
 from core.utils.files import (copy_directory_with_progress,
                               extract_zip_archive_with_progress)
+from core.utils.sync import get_manifest_path, sync_directories
 from core.logging.logger import Logger
 
 
@@ -74,9 +75,8 @@ class Yuzu(SwitchEmulator):
             current_data_path = ensure_user_directory()
 
             if last_used_data_path is not None and last_used_data_path.exists() and last_used_data_path != current_data_path:
-                self.logger.info("Copying user directory from %s to %s", last_used_data_path, current_data_path)
-                shutil.copytree(last_used_data_path, current_data_path, dirs_exist_ok=True)
-                shutil.rmtree(last_used_data_path)
+                self.logger.info("Syncing user directory from %s to %s", last_used_data_path, current_data_path)
+                sync_directories(last_used_data_path, current_data_path, get_manifest_path(self.settings.paths.sync_manifest_dir, current_data_path), move=True)
 
         if not self.settings.yuzu.portable_mode and (self.settings.yuzu.install_directory / self.get_installation_folder_name() / "user").exists():
             return {
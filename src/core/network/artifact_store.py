@@ -0,0 +1,187 @@
+"""
+A content-addressed store of downloaded artifacts, such as emulator releases, firmware and keys.
+
+Every artifact is stored once under its SHA-256 hash, and an index maps the URL that it was downloaded from,
+with its size, to the hash. An artifact is materialized at the path that an install expects with a hard link,
+so deleting the materialized file after installing does not remove it from the store, and installing the same
+release or firmware again, or into another emulator, does not download it again. The least recently used artifacts
+are evicted once the store is larger than its byte budget.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from core.logging.logger import Logger
+from core.utils.files import copy_file
+
+logger = Logger(__name__).get_logger()
+
+ARTIFACT_INDEX_VERSION = 1
+
+
+class ArtifactStore:
+    """
+    A store of downloaded files, keyed by their URL, size and SHA-256 hash.
+
+    Methods:
+        - lock_url: Get the lock that serialises downloads of a URL.
+        - get_staging_path: Get the path that a URL is downloaded to before it is added.
+        - add: Add a downloaded file to the store.
+        - materialize: Place the artifact of a URL at a path.
+        - evict: Remove the least recently used artifacts until the store fits its budget.
+    """
+    def __init__(self, store_directory, size_limit):
+        self.store_directory = store_directory
+        self.blob_directory = store_directory / "blobs"
+        self.staging_directory = store_directory / "staging"
+        self.index_path = store_directory / "index.json"
+        self.size_limit = size_limit
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._urls, self._blobs = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if index.get("version") != ARTIFACT_INDEX_VERSION:
+            return {}, {}
+        return index["urls"], index["blobs"]
+
+    def _save_index(self):
+        self.store_directory.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.index_path.with_suffix(".tmp")
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump({"version": ARTIFACT_INDEX_VERSION, "urls": self._urls, "blobs": self._blobs}, f)
+        os.replace(temporary_path, self.index_path)
+
+    def _get_blob_path(self, digest):
+        return self.blob_directory / digest[:2] / digest
+
+    def lock_url(self, url):
+        """
+        Get the lock that serialises the downloads of a URL, so two installs of the same artifact only download it once.
+
+        Args:
+            url (str): The URL of the artifact.
+
+        Returns:
+            threading.Lock: The lock of the URL.
+        """
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def get_staging_path(self, url):
+        """
+        Get the path that a URL is downloaded to before it is added to the store.
+        The path only depends on the URL, so an interrupted download is resumed by the next attempt.
+
+        Args:
+            url (str): The URL of the artifact.
+
+        Returns:
+            pathlib.Path: The staging path.
+        """
+        self.staging_directory.mkdir(parents=True, exist_ok=True)
+        return self.staging_directory / hashlib.sha1(url.encode()).hexdigest()
+
+    def add(self, url, path):
+        """
+        Move a downloaded file into the store and record it under its URL.
+
+        Args:
+            url (str): The URL the file was downloaded from.
+            path (pathlib.Path): The downloaded file. It is moved into the store.
+
+        Returns:
+            str: The SHA-256 hash of the file.
+        """
+        with open(path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        size = path.stat().st_size
+        blob_path = self._get_blob_path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if blob_path.is_file() and digest in self._blobs:
+                # the same content was already downloaded from another URL
+                path.unlink()
+            else:
+                os.replace(path, blob_path)
+            self._blobs[digest] = {"size": size, "last_used": time.time()}
+            self._urls[url] = {"sha256": digest, "size": size}
+            self._save_index()
+        logger.info("Added %s to the artifact store as %s", url, digest)
+        return digest
+
+    def materialize(self, url, target, size=None):
+        """
+        Place the artifact of a URL at a path, with a hard link if possible and a copy otherwise.
+
+        Args:
+            url (str): The URL of the artifact.
+            target (pathlib.Path): The path to place the artifact at. An existing file is replaced.
+            size (int, optional): The expected size of the artifact. An artifact of another size is not used.
+
+        Returns:
+            bool: Whether the artifact was in the store and was placed at the path.
+        """
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry is None or (size is not None and entry["size"] != size):
+                return False
+            digest = entry["sha256"]
+            blob_path = self._get_blob_path(digest)
+            try:
+                blob_size = blob_path.stat().st_size
+            except FileNotFoundError:
+                blob_size = None
+            if blob_size != entry["size"]:
+                # the artifact was removed or damaged outside of the store
+                logger.warning("The artifact of %s is missing from the store", url)
+                del self._urls[url]
+                self._blobs.pop(digest, None)
+                blob_path.unlink(missing_ok=True)
+                self._save_index()
+                return False
+            self._blobs[digest]["last_used"] = time.time()
+            self._save_index()
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = target.with_name(f".{target.name}.{digest[:8]}.tmp")
+        temporary_path.unlink(missing_ok=True)
+        try:
+            os.link(blob_path, temporary_path)
+        except OSError:
+            # hard links are not supported across file systems, or on some file systems such as FAT32
+            copy_file(blob_path, temporary_path, size=blob_size)
+        os.replace(temporary_path, target)
+        logger.info("Materialized %s from the artifact store at %s", url, target)
+        return True
+
+    def evict(self):
+        """
+        Remove the least recently used artifacts until the store is within its byte budget.
+
+        Returns:
+            int: The number of bytes that were freed.
+        """
+        with self._lock:
+            total_size = sum(blob["size"] for blob in self._blobs.values())
+            freed = 0
+            for digest, blob in sorted(self._blobs.items(), key=lambda item: item[1]["last_used"]):
+                if total_size - freed <= self.size_limit:
+                    break
+                # a file that was materialized with a hard link keeps its data when the blob is removed
+                self._get_blob_path(digest).unlink(missing_ok=True)
+                del self._blobs[digest]
+                freed += blob["size"]
+            if freed:
+                self._urls = {url: entry for url, entry in self._urls.items() if entry["sha256"] in self._blobs}
+                self._save_index()
+        if freed:
+            logger.info("Evicted %s bytes from the artifact store", freed)
+        return freed
@@ -0,0 +1,241 @@
+"""
+An asyncio network engine that runs on a single background event loop thread.
+
+The coroutines in this module return the same dictionaries as their blocking counterparts in core.network.web.
+When httpx is installed, requests are made with a shared httpx.AsyncClient, so any number of concurrent
+requests only use the one event loop thread. Without httpx, each request falls back to the blocking function
+in core.network.web, run in the default executor of the event loop.
+
+Coroutines can be run from any thread with submit, which returns a concurrent.futures.Future.
+Files are written with asyncio.to_thread, so disk writes never block the event loop.
+"""
+import asyncio
+import threading
+from pathlib import Path
+
+from core.config import constants
+from core.logging.logger import Logger
+from core.network import web
+from core.utils.progress_handler import ProgressHandler
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = Logger(__name__).get_logger()
+
+_loop = None
+_loop_thread = None
+_client = None
+_lock = threading.Lock()
+
+
+def is_native():
+    """
+    Check whether requests are made natively with asyncio, rather than in executor threads.
+
+    Returns:
+        bool: True if httpx is available.
+    """
+    return httpx is not None
+
+
+def get_loop():
+    """
+    Get the background event loop, starting it if needed.
+
+    Returns:
+        asyncio.AbstractEventLoop: The running event loop.
+    """
+    global _loop, _loop_thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name="AsyncNetworkLoop", daemon=True)
+            _loop_thread.start()
+            logger.debug("Started the async network loop, httpx available: %s", is_native())
+        return _loop
+
+
+def submit(coroutine):
+    """
+    Run a coroutine on the background event loop.
+
+    Args:
+        coroutine (coroutine): The coroutine to run.
+
+    Returns:
+        concurrent.futures.Future: The future for the result of the coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+
+def _get_client():
+    # only called from the event loop thread, so the client is bound to that loop
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=constants.Requests.ASYNC_MAX_CONNECTIONS.value,
+                                max_keepalive_connections=constants.Requests.POOL_MAXSIZE.value),
+            transport=httpx.AsyncHTTPTransport(retries=constants.Requests.MAX_RETRIES.value),
+        )
+    return _client
+
+
+async def _close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def close():
+    """
+    Close the shared client and stop the background event loop.
+    """
+    global _loop, _loop_thread
+    with _lock:
+        loop, thread = _loop, _loop_thread
+        _loop, _loop_thread = None, None
+    if loop is None or loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_client(), loop).result(timeout=5)
+    except Exception as error:
+        logger.error("Failed to close the async client: %s", error)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def _write_file(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+async def get(url, timeout=30, headers=constants.Requests.DEFAULT_HEADERS.value, **kwargs):
+    """Create a GET request to the given URL.
+
+    Args:
+        url (str): URL to make the request to.
+        headers (dict, optional): Headers to include in the request.
+        timeout (int, optional): The timeout for the request. Defaults to 30.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str or Exception) and response (httpx.Response or requests.Response)
+    """
+    if not is_native():
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: web.get(url, timeout=timeout, headers=headers, **kwargs))
+    try:
+        logger.debug("GET %s  %s", url, kwargs)
+        response = await _get_client().get(url, timeout=timeout, headers=headers, **kwargs)
+        response.raise_for_status()
+    except httpx.HTTPError as error:
+        logger.error("GET Error: %s", error)
+        return {"status": False, "message": error}
+    return {"status": True, "message": "Request successful", "response": response}
+
+
+async def download_file(download_url, download_path, **kwargs):
+    """Download a file from the given URL to the given path.
+
+    Args:
+        download_url (str): URL to download the file from.
+        download_path (pathlib.Path): Path to save the downloaded file to.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and download_path (pathlib.Path)
+    """
+    if not is_native():
+        return await asyncio.get_running_loop().run_in_executor(None, lambda: web.download_file(download_url, download_path, **kwargs))
+    logger.debug("Downloading file from %s to %s", download_url, download_path)
+    response = await get(download_url, **kwargs)
+    if not response["status"]:
+        return response
+
+    try:
+        await asyncio.to_thread(_write_file, download_path, response["response"].content)
+    except PermissionError as error:
+        download_path.unlink(missing_ok=True)
+        logger.error("Error writing file: %s", error)
+        return {"status": False, "message": f"Permission was denied. Make sure the app and the user have permission to write to the current directory:\n\n{download_path.parent}",
+                "download_path": None}
+    return {
+        "status": True,
+        "message": "Download successful",
+        "download_path": download_path
+    }
+
+
+async def download_file_with_progress(download_url, download_path, progress_handler, chunk_size=1024*256, **kwargs):
+    """Download a file from the given URL to the given path while reporting the progress.
+
+    Args:
+        download_url (str): URL to download the file from.
+        download_path (pathlib.Path): Path to save the downloaded file to.
+        progress_handler (ProgressHandler): Progress handler to report the progress to.
+        chunk_size (int, optional): The size of the chunks to write.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and download_path (pathlib.Path)
+    """
+    if not is_native():
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: web.download_file_with_progress(download_url, download_path, progress_handler, chunk_size=chunk_size, **kwargs)
+        )
+    if progress_handler is None:
+        progress_handler = ProgressHandler()
+    headers = kwargs.pop("headers", constants.Requests.DEFAULT_HEADERS.value)
+    rollback_needed = False
+    try:
+        async with _get_client().stream("GET", download_url, headers=headers, timeout=kwargs.pop("timeout", 30), **kwargs) as response:
+            response.raise_for_status()
+            if not progress_handler.is_total_units_set():
+                progress_handler.set_total_units(int(response.headers.get("content-length", 0)) / 1024 / 1024)
+            await asyncio.to_thread(download_path.parent.mkdir, parents=True, exist_ok=True)
+            f = await asyncio.to_thread(open, download_path, "wb")
+            try:
+                downloaded_bytes = 0
+                async for chunk in response.aiter_bytes(chunk_size):
+                    if progress_handler.should_cancel():
+                        rollback_needed = True
+                        break
+                    await asyncio.to_thread(f.write, chunk)
+                    downloaded_bytes += len(chunk)
+                    progress_handler.report_progress(downloaded_bytes / 1024 / 1024)
+            finally:
+                await asyncio.to_thread(f.close)
+    except PermissionError as error:
+        progress_handler.report_error(error)
+        download_path.unlink(missing_ok=True)
+        return {
+            "status": False,
+            "message": f"Permission was denied. Make sure the app and the user have permission to write to the current directory:\n\n{download_path.parent}",
+            "download_path": None
+        }
+    except (httpx.HTTPError, OSError) as error:
+        logger.error("Error downloading file: %s", error)
+        progress_handler.report_error(error)
+        download_path.unlink(missing_ok=True)
+        return {
+            "status": False,
+            "message": error,
+            "download_path": None
+        }
+    if rollback_needed:
+        progress_handler.cancel()
+        download_path.unlink(missing_ok=True)
+        return {
+            "status": False,
+            "message": "Download cancelled",
+            "download_path": None
+        }
+    progress_handler.report_success()
+    return {
+        "status": True,
+        "message": "Download successful",
+        "download_path": Path(download_path)
+    }
@@ -1,4 +1,7 @@
+import hashlib
 import re
+import threading
+from collections import OrderedDict
 
 from core.config.constants import GitHub, GitHubOAuth, Requests
 from core.network import web
@@ -6,6 +9,89 @@ from core.logging.logger import Logger
 
 logger = Logger(__name__).get_logger()
 
+_cache = None
+# the most recently used responses, kept until a cache is configured
+_responses = OrderedDict()
+_responses_lock = threading.Lock()
+
+
+def configure_cache(cache):
+    """
+    Set the cache used to store API responses along with their validators.
+
+    Until a cache is configured, only the responses of the most recently requested URLs are kept in memory.
+
+    Args:
+        cache (Cache): The cache to store responses in.
+    """
+    global _cache
+    _cache = cache
+
+
+def _load_cached_response(key):
+    if _cache is None:
+        with _responses_lock:
+            if key not in _responses:
+                return None
+            _responses.move_to_end(key)
+            return _responses[key]
+    cache_lookup_result = _cache.get_json(key)
+    return cache_lookup_result["data"] if cache_lookup_result["status"] else None
+
+
+def _store_cached_response(key, cached_response):
+    if _cache is None:
+        with _responses_lock:
+            _responses[key] = cached_response
+            _responses.move_to_end(key)
+            while len(_responses) > GitHub.IN_MEMORY_RESPONSE_LIMIT.value:
+                _responses.popitem(last=False)
+        return
+    _cache.add_json(key, cached_response, ttl=GitHub.CONDITIONAL_CACHE_TTL.value)
+
+
+def get_json(url, token=None):
+    """
+    Make a conditional GET request to the GitHub API and parse the JSON response.
+
+    The ETag and Last-Modified validators of each response are stored with its payload and sent back
+    as If-None-Match and If-Modified-Since. When GitHub replies with 304 Not Modified, the stored payload
+    is returned, and the request does not count against the rate limit.
+
+    Args:
+        url (str): The API URL to request.
+        token (str, optional): The GitHub token to use for the request. Defaults to None.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and response (the parsed JSON)
+    """
+    # responses differ with and without a token, in their visibility and in the rate limit they count against,
+    # so each token has its own entries. Only a hash of the token is part of the key
+    auth = hashlib.sha256(token.encode("utf-8")).hexdigest() if token else "anonymous"
+    key = "github_" + hashlib.sha1(f"{url}|{auth}".encode("utf-8")).hexdigest()
+    cached_response = _load_cached_response(key)
+    headers = get_headers(token)
+    if cached_response is not None:
+        if cached_response.get("etag"):
+            headers["If-None-Match"] = cached_response["etag"]
+        if cached_response.get("last_modified"):
+            headers["If-Modified-Since"] = cached_response["last_modified"]
+
+    response = web.get(url, headers=headers)
+    if not response["status"]:
+        return response
+    response = response["response"]
+    if response.status_code == 304 and cached_response is not None:
+        logger.debug("%s has not been modified, using cached response", url)
+        return {"status": True, "message": "Request successful", "response": cached_response["data"]}
+
+    data = response.json()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _store_cached_response(key, {"etag": etag, "last_modified": last_modified, "data": data})
+    return {"status": True, "message": "Request successful", "response": data}
+
 
 def get_headers(token=None):
     headers = Requests.GH_HEADERS.value.copy()
@@ -18,9 +104,8 @@ def get_headers(token=None):
 
 def get_all_releases(repo_owner, repo_name, token=None):
     logger.debug("Getting all releases for %s/%s", repo_owner, repo_name)
-    response = web.get(GitHub.API_RELEASES.value.format(owner=repo_owner, repo=repo_name), headers=get_headers(token))
+    response = get_json(GitHub.API_RELEASES.value.format(owner=repo_owner, repo=repo_name), token)
     if response["status"]:
-        response["response"] = response["response"].json()
         return response
     logger.error("Failed to get all releases: %s", response)
     return response
@@ -29,15 +114,13 @@ def get_all_releases(repo_owner, repo_name, token=None):
 def get_latest_release(repo_owner, repo_name, token=None, include_prereleases=False):
     logger.debug("Getting latest release for %s/%s", repo_owner, repo_name)
     if include_prereleases:
-        response = web.get(GitHub.API_RELEASES.value.format(owner=repo_owner, repo=repo_name), headers=get_headers(token))
+        response = get_json(GitHub.API_RELEASES.value.format(owner=repo_owner, repo=repo_name), token)
         if response["status"]:
-            response["response"] = response["response"].json()
             response["response"] = response["response"][0]
             return response
     else:
-        response = web.get(GitHub.API_LATEST_RELEASE.value.format(owner=repo_owner, repo=repo_name), headers=get_headers(token))
+        response = get_json(GitHub.API_LATEST_RELEASE.value.format(owner=repo_owner, repo=repo_name), token)
         if response["status"]:
-            response["response"] = response["response"].json()
             return response
     logger.error("Failed to get latest release: %s", response)
     return response
@@ -115,9 +198,8 @@ def get_latest_release_with_asset(repo_owner, repo_name, regex, token=None, use_
 
 def get_file_list(repo_owner, repo_name, path, token=None):
     logger.debug("Getting file list for %s/%s/%s", repo_owner, repo_name, path)
-    response = web.get(GitHub.API_CONTENTS.value.format(owner=repo_owner, repo=repo_name, path=path), headers=get_headers(token))
+    response = get_json(GitHub.API_CONTENTS.value.format(owner=repo_owner, repo=repo_name, path=path), token)
     if response["status"]:
-        response["response"] = response["response"].json()
         return response
     logger.error("Failed to get file list: %s", response)
     return response
@@ -1,20 +1,164 @@
+import time
+
+from core.config import constants
 from core.config.constants import Myrient
+from core.logging.logger import Logger
 from core.network.web import get_all_files_from_page
-from urllib.parse import quote, unquote
+from urllib.parse import quote
+
+logger = Logger(__name__).get_logger()
+
+_catalog = None
+
+
+def configure_catalog(catalog):
+    """
+    Set the catalog that game lists are stored in and refreshed from.
+
+    Args:
+        catalog (MyrientCatalog): The catalog to use.
+    """
+    global _catalog
+    _catalog = catalog
+
+
+def get_catalog_paths():
+    """
+    Get the Myrient paths of every console that games can be downloaded for.
 
+    Returns:
+        dict: The Myrient path of each console, by the name of the console.
+    """
+    return {
+        "nintendo_wii": constants.Dolphin.MYRIENT_WII_PATH.value,
+        "nintendo_gamecube": constants.Dolphin.MYRIENT_GAMECUBE_PATH.value,
+        "microsoft_xbox_360": constants.Xenia.MYRIENT_XBOX_360_PATH.value,
+        "microsoft_xbox_360_digital": constants.Xenia.MYRIENT_XBOX_360_DIGITAL_PATH.value,
+    }
 
-def get_list_of_games(myrient_path):
-    scrape_result = get_all_files_from_page(url=Myrient.BASE_URL.value + myrient_path, file_ext=".zip")
+
+def get_list_of_games(myrient_path, headers=None):
+    kwargs = {"headers": headers} if headers is not None else {}
+    scrape_result = get_all_files_from_page(url=Myrient.BASE_URL.value + myrient_path, file_ext=".zip", **kwargs)
     if not scrape_result["status"]:
         return scrape_result
-    scrape_result["games"] = []
-    for file in scrape_result["files"]:
-        # Remove the base URL and the myrient path from the filename
-        # this will return a list of filenames that are relative to the myrient path
-        scrape_result["games"].append(unquote(file.replace(Myrient.BASE_URL.value + myrient_path, "").replace(".zip", "")))
+    # the filename of each record is already relative to the myrient path
+    scrape_result["games"] = [
+        {
+            "name": record["filename"].removesuffix(".zip"),
+            "size": record["size"],
+            "size_bytes": record["size_bytes"],
+            "date": record["date"],
+        }
+        for record in scrape_result["records"]
+    ]
 
     return scrape_result
 
 
+def refresh_catalog(console_name, myrient_path, force=False):
+    """
+    Refresh the catalog of a console, if it has not been refreshed within the catalog TTL.
+
+    The listing is requested with the validators of the previous response, and only the games
+    that have changed are written to the catalog.
+
+    Args:
+        console_name (str): The name of the console.
+        myrient_path (str): The Myrient path of the console.
+        force (bool, optional): Refresh the listing even if it was refreshed recently.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str), refreshed (bool) and changes (dict or None)
+    """
+    if _catalog is None:
+        return {"status": False, "message": "The Myrient catalog has not been configured", "refreshed": False, "changes": None}
+    listing = _catalog.get_listing(myrient_path)
+    if listing is not None and not force and time.time() - listing["refreshed_at"] < Myrient.CATALOG_TTL.value:
+        return {"status": True, "message": "The catalog is up to date", "refreshed": False, "changes": None}
+
+    headers = dict(constants.Requests.DEFAULT_HEADERS.value)
+    if listing is not None:
+        if listing["etag"]:
+            headers["If-None-Match"] = listing["etag"]
+        if listing["last_modified"]:
+            headers["If-Modified-Since"] = listing["last_modified"]
+    scrape_result = get_list_of_games(myrient_path, headers=headers)
+    if not scrape_result["status"]:
+        return {"status": False, "message": scrape_result["message"], "refreshed": False, "changes": None}
+    if scrape_result["not_modified"]:
+        logger.info("The listing of %s has not been modified", myrient_path)
+        _catalog.touch_listing(myrient_path, scrape_result["etag"], scrape_result["last_modified"])
+        return {"status": True, "message": "The listing has not been modified", "refreshed": True, "changes": None}
+    changes = _catalog.update_listing(
+        myrient_path, console_name, scrape_result["games"], etag=scrape_result["etag"], last_modified=scrape_result["last_modified"]
+    )
+    return {"status": True, "message": "The catalog was refreshed", "refreshed": True, "changes": changes}
+
+
+def refresh_all_catalogs(force=False):
+    """
+    Refresh the catalog of every console that games can be downloaded for, so searches cover all of them.
+
+    Args:
+        force (bool, optional): Refresh the listings even if they were refreshed recently.
+
+    Returns:
+        dict: A dictionary with fields: status (bool, whether every refresh succeeded), message (str) and results (dict of refresh results by console)
+    """
+    results = {
+        console_name: refresh_catalog(console_name, myrient_path, force=force)
+        for console_name, myrient_path in get_catalog_paths().items()
+    }
+    failed = [console_name for console_name, result in results.items() if not result["status"]]
+    if failed:
+        logger.error("Failed to refresh the catalogs of %s", ", ".join(failed))
+    return {
+        "status": not failed,
+        "message": f"Failed to refresh the catalogs of {', '.join(failed)}" if failed else "Catalogs refreshed",
+        "results": results,
+    }
+
+
+def get_catalog_games(console_name, myrient_path, force_refresh=False):
+    """
+    Get the games of a console from the catalog, refreshing it first if needed.
+
+    If the refresh fails, the games that are already in the catalog are returned.
+
+    Args:
+        console_name (str): The name of the console.
+        myrient_path (str): The Myrient path of the console.
+        force_refresh (bool, optional): Refresh the listing even if it was refreshed recently.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str), refreshed (bool) and games (list)
+    """
+    refresh_result = refresh_catalog(console_name, myrient_path, force=force_refresh)
+    if _catalog is None:
+        return {**refresh_result, "games": []}
+    games = _catalog.get_games(myrient_path)
+    if not refresh_result["status"] and not games:
+        return {**refresh_result, "games": []}
+    return {"status": True, "message": refresh_result["message"], "refreshed": refresh_result["refreshed"], "games": games}
+
+
+def search_catalog(query, consoles=None, limit=100):
+    """
+    Search the games of every console in the catalog.
+
+    Args:
+        query (str): The words to search for.
+        consoles (list, optional): Only search the games of these consoles.
+        limit (int, optional): The maximum number of results.
+
+    Returns:
+        list: The games, ranked by relevance.
+    """
+    if _catalog is None:
+        return []
+    return _catalog.search(query, consoles=consoles, limit=limit)
+
+
 def get_game_download_url(game_name, myrient_path):
     return Myrient.BASE_URL.value + myrient_path + f"{quote(game_name)}.zip"
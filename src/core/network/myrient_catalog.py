@@ -0,0 +1,196 @@
+"""
+A local SQLite catalog of the games on Myrient.
+
+Every listing that has been fetched is stored with its validators, so that it can be refreshed with a conditional
+request, and with the time it was last refreshed. A refresh only writes the rows that were added, changed or removed
+since the previous one. The names of the games are indexed with FTS5, so the catalog can be searched across every
+console at once, with the results ranked by relevance.
+"""
+import sqlite3
+import threading
+import time
+
+from core.logging.logger import Logger
+from core.utils.search import parse_redump_name
+
+logger = Logger(__name__).get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    path TEXT PRIMARY KEY,
+    console TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    refreshed_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL REFERENCES listings(path) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    size TEXT,
+    size_bytes INTEGER,
+    date TEXT,
+    regions TEXT NOT NULL DEFAULT '',
+    revision TEXT,
+    UNIQUE (path, name)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5(name, content='games', content_rowid='id', prefix='2 3');
+CREATE TRIGGER IF NOT EXISTS games_after_insert AFTER INSERT ON games BEGIN
+    INSERT INTO games_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS games_after_delete AFTER DELETE ON games BEGIN
+    INSERT INTO games_fts(games_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS games_after_update AFTER UPDATE OF name ON games BEGIN
+    INSERT INTO games_fts(games_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO games_fts(rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+
+class MyrientCatalog:
+    """
+    A catalog of the games in Myrient listings, stored in an SQLite database.
+
+    The connection is shared between the worker threads that use the catalog, so every query holds a lock.
+
+    Methods:
+        - get_listing: Get the validators and refresh time of a listing.
+        - update_listing: Store the games of a listing, only writing the rows that have changed.
+        - touch_listing: Mark a listing as refreshed without changing its games.
+        - get_games: Get the games of a listing.
+        - search: Search the games of every listing.
+        - close: Close the database.
+    """
+    def __init__(self, database_path):
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        self.database_path = database_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA foreign_keys=ON")
+            self._connection.executescript(SCHEMA)
+
+    def get_listing(self, path):
+        """
+        Get the validators and refresh time of a listing.
+
+        Args:
+            path (str): The Myrient path of the listing.
+
+        Returns:
+            dict or None: A dictionary with fields: path, console, etag, last_modified and refreshed_at, or None if the listing has never been fetched.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM listings WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def touch_listing(self, path, etag=None, last_modified=None):
+        """
+        Mark a listing as refreshed, keeping its games. Used when the listing was not modified.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE listings SET refreshed_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE path = ?",
+                (time.time(), etag, last_modified, path),
+            )
+
+    def update_listing(self, path, console, games, etag=None, last_modified=None):
+        """
+        Store the games of a listing. Only the games that were added, changed or removed are written.
+
+        Args:
+            path (str): The Myrient path of the listing.
+            console (str): The name of the console of the listing.
+            games (list): The games of the listing, as dictionaries with fields: name, size, size_bytes and date.
+            etag (str, optional): The ETag of the listing.
+            last_modified (str, optional): The Last-Modified date of the listing.
+
+        Returns:
+            dict: A dictionary with fields: added (int), updated (int) and removed (int)
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO listings (path, console, etag, last_modified, refreshed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET console = excluded.console, etag = excluded.etag, "
+                "last_modified = excluded.last_modified, refreshed_at = excluded.refreshed_at",
+                (path, console, etag, last_modified, time.time()),
+            )
+            existing = {
+                row["name"]: (row["size"], row["size_bytes"], row["date"])
+                for row in self._connection.execute("SELECT name, size, size_bytes, date FROM games WHERE path = ?", (path,))
+            }
+            added = []
+            updated = []
+            seen = set()
+            for game in games:
+                seen.add(game["name"])
+                values = (game["size"], game["size_bytes"], game["date"])
+                if game["name"] not in existing:
+                    metadata = parse_redump_name(game["name"])
+                    added.append((path, game["name"], *values, ", ".join(sorted(metadata["regions"])), metadata["revision"]))
+                elif existing[game["name"]] != values:
+                    updated.append((*values, path, game["name"]))
+            removed = [(path, name) for name in existing if name not in seen]
+            self._connection.executemany(
+                "INSERT INTO games (path, name, size, size_bytes, date, regions, revision) VALUES (?, ?, ?, ?, ?, ?, ?)", added
+            )
+            self._connection.executemany("UPDATE games SET size = ?, size_bytes = ?, date = ? WHERE path = ? AND name = ?", updated)
+            self._connection.executemany("DELETE FROM games WHERE path = ? AND name = ?", removed)
+        logger.info("Updated the catalog of %s: %s added, %s updated, %s removed", path, len(added), len(updated), len(removed))
+        return {"added": len(added), "updated": len(updated), "removed": len(removed)}
+
+    def get_games(self, path):
+        """
+        Get the games of a listing, ordered by name.
+
+        Args:
+            path (str): The Myrient path of the listing.
+
+        Returns:
+            list: The games, as dictionaries with fields: name, size, size_bytes, date, regions and revision.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name, size, size_bytes, date, regions, revision FROM games WHERE path = ? ORDER BY name", (path,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, query, consoles=None, limit=100):
+        """
+        Search the games of every listing, ranking the results by relevance.
+
+        Every word of the query has to match the start of a word in the name of a game.
+
+        Args:
+            query (str): The words to search for.
+            consoles (list, optional): Only search the listings of these consoles.
+            limit (int, optional): The maximum number of results.
+
+        Returns:
+            list: The games, as dictionaries with fields: console, path, name, size, size_bytes, date, regions and revision.
+        """
+        words = [word.replace('"', '""') for word in query.split()]
+        if not words:
+            return []
+        match = " ".join(f'"{word}"*' for word in words)
+        sql = (
+            "SELECT listings.console, games.path, games.name, games.size, games.size_bytes, games.date, games.regions, games.revision "
+            "FROM games_fts JOIN games ON games.id = games_fts.rowid JOIN listings ON listings.path = games.path "
+            "WHERE games_fts MATCH ?"
+        )
+        parameters = [match]
+        if consoles:
+            sql += f" AND listings.console IN ({', '.join('?' for _ in consoles)})"
+            parameters.extend(consoles)
+        sql += " ORDER BY bm25(games_fts) LIMIT ?"
+        parameters.append(limit)
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from core.logging.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+
+class PartialDownload:
+    """
+    The PartialDownload class keeps track of an unfinished download so that it can be resumed.
+
+    The data is written to a `.part` file next to the final download path, and a `.part.json`
+    sidecar records the URL, the validators (ETag and Last-Modified) and the expected length of
+    the file, along with the byte ranges that have been completely written to the `.part` file.
+
+    Methods:
+        - load: Load the partial download for a path, or start a new one if it cannot be resumed.
+        - missing_ranges: Get the byte ranges that still have to be downloaded.
+        - add_completed_range: Record a byte range as written to the part file.
+        - save: Write the sidecar to disk.
+        - finalize: Verify the part file and move it to the final download path.
+        - discard: Delete the part file and the sidecar.
+    """
+    def __init__(self, download_path: Path, url: str, size: int, etag=None, last_modified=None, completed_ranges=None):
+        self.download_path = download_path
+        self.part_path = download_path.with_name(download_path.name + ".part")
+        self.state_path = download_path.with_name(download_path.name + ".part.json")
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.completed_ranges = completed_ranges or []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, download_path: Path, url: str, size: int, etag=None, last_modified=None):
+        """
+        Load the partial download for the given path if it belongs to the same remote file,
+        otherwise discard it and start a new one.
+
+        Args:
+            download_path (pathlib.Path): The final path of the download.
+            url (str): The URL of the file.
+            size (int): The size of the remote file in bytes.
+            etag (str, optional): The ETag of the remote file.
+            last_modified (str, optional): The Last-Modified header of the remote file.
+
+        Returns:
+            PartialDownload: The partial download to continue.
+        """
+        partial = cls(download_path, url, size, etag, last_modified)
+        try:
+            with open(partial.state_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            partial.discard()
+            return partial
+        except (OSError, json.JSONDecodeError) as error:
+            logger.error("Partial download state for %s is invalid: %s", download_path, error)
+            partial.discard()
+            return partial
+
+        # the validators decide whether the bytes on disk still belong to the remote file
+        same_file = (
+            state.get("url") == url
+            and state.get("size") == size
+            and (etag is None or state.get("etag") == etag)
+            and (last_modified is None or state.get("last_modified") == last_modified)
+            and partial.part_path.exists()
+            and partial.part_path.stat().st_size == size
+        )
+        if not same_file:
+            logger.info("Remote file for %s has changed, restarting the download", download_path)
+            partial.discard()
+            return partial
+
+        partial.completed_ranges = [tuple(completed_range) for completed_range in state.get("completed_ranges", [])]
+        logger.info("Resuming %s with %s of %s bytes already downloaded", download_path, partial.completed_bytes(), size)
+        return partial
+
+    def completed_bytes(self):
+        """
+        Get the number of bytes that have already been written.
+
+        Returns:
+            int: The total length of the completed ranges.
+        """
+        with self._lock:
+            return sum(end - start + 1 for start, end in self.completed_ranges)
+
+    def missing_ranges(self):
+        """
+        Get the inclusive byte ranges that have not been downloaded yet.
+
+        Returns:
+            list: A list of (start, end) tuples.
+        """
+        missing = []
+        position = 0
+        with self._lock:
+            for start, end in sorted(self.completed_ranges):
+                if start > position:
+                    missing.append((position, start - 1))
+                position = max(position, end + 1)
+        if position < self.size:
+            missing.append((position, self.size - 1))
+        return missing
+
+    def add_completed_range(self, start, end):
+        """
+        Record the inclusive byte range as written to the part file, merging it with adjacent ranges.
+
+        Args:
+            start (int): The first byte of the range.
+            end (int): The last byte of the range.
+        """
+        if end < start:
+            return
+        with self._lock:
+            merged = []
+            for existing_start, existing_end in sorted(self.completed_ranges + [(start, end)]):
+                if merged and existing_start <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], existing_end))
+                else:
+                    merged.append((existing_start, existing_end))
+            self.completed_ranges = merged
+
+    def save(self):
+        """
+        Write the sidecar to disk.
+
+        The lock is held for the whole write, so the range workers that save at the same time write one after the other.
+        The sidecar is written to a temporary file that replaces it, so an interrupted write never leaves it corrupt.
+        """
+        with self._lock:
+            state = {
+                "url": self.url,
+                "size": self.size,
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "completed_ranges": self.completed_ranges,
+            }
+            temporary_path = self.state_path.with_name(self.state_path.name + ".tmp")
+            try:
+                with open(temporary_path, "w", encoding="utf-8") as file:
+                    json.dump(state, file)
+                os.replace(temporary_path, self.state_path)
+            except OSError as error:
+                logger.error("Failed to save partial download state for %s: %s", self.download_path, error)
+
+    def finalize(self):
+        """
+        Check that the whole file has been downloaded and move it to the final download path.
+
+        Returns:
+            dict: A dictionary with fields: status (bool) and message (str)
+        """
+        if self.missing_ranges():
+            return {"status": False, "message": "The download is incomplete"}
+        if self.part_path.stat().st_size != self.size:
+            self.discard()
+            return {"status": False, "message": "The downloaded file does not have the expected size"}
+        self.part_path.replace(self.download_path)
+        self.state_path.unlink(missing_ok=True)
+        return {"status": True, "message": "Download complete"}
+
+    def discard(self):
+        """
+        Delete the part file and the sidecar.
+        """
+        self.part_path.unlink(missing_ok=True)
+        self.state_path.unlink(missing_ok=True)
+        with self._lock:
+            self.completed_ranges = []
@@ -0,0 +1,344 @@
+"""
+Extract zip archives while they are being downloaded.
+
+The central directory of the archive is read first through small range requests,
+then each member's compressed data is streamed through the decompressor straight
+into its target file, so the archive itself is never written to disk.
+"""
+import io
+import json
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+
+from urllib3.exceptions import HTTPError
+
+from core.config import constants
+from core.logging.logger import Logger
+from core.network import web
+from core.utils.files import extract_zip_archive_with_progress, extract_zip_member, get_zip_member_target
+from core.utils.progress_handler import ProgressHandler
+
+logger = Logger(__name__).get_logger()
+
+
+class HTTPRangeFile(io.RawIOBase):
+    """
+    A read-only, seekable file backed by HTTP range requests.
+
+    A read at a random offset fetches a small bounded range, which keeps central directory
+    lookups cheap. A read that continues where the previous range ended opens a single
+    open-ended range, so a member's data is streamed over one connection.
+    If the connection drops, the range is reopened from the byte that was last received.
+    """
+    def __init__(self, url, size, headers=constants.Requests.DEFAULT_HEADERS.value, read_ahead=1024*64):
+        super().__init__()
+        self.url = url
+        self.size = size
+        self.headers = headers
+        self.read_ahead = read_ahead
+        self.bytes_received = 0
+        self._position = 0
+        self._response = None
+        self._stream_position = None
+        self._stream_end = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        match whence:
+            case io.SEEK_SET:
+                self._position = offset
+            case io.SEEK_CUR:
+                self._position += offset
+            case io.SEEK_END:
+                self._position = self.size + offset
+            case _:
+                raise ValueError(f"Invalid whence: {whence}")
+        return self._position
+
+    def _open_stream(self, continuing=False):
+        if self._response is not None:
+            self._response.close()
+        continuing = continuing or (self._stream_end is not None and self._position == self._stream_end + 1)
+        end = self.size - 1 if continuing else min(self._position + self.read_ahead, self.size) - 1
+        response = web.get(self.url, stream=True, headers={**self.headers, "Range": f"bytes={self._position}-{end}"})
+        if not response["status"]:
+            raise OSError(f"Failed to read {self.url}: {response['message']}")
+        response = response["response"]
+        if response.status_code != 206:
+            response.close()
+            raise web.RangesRefusedError(f"Expected 206 Partial Content but got {response.status_code}")
+        self._response = response
+        self._stream_position = self._position
+        self._stream_end = end
+
+    def readinto(self, buffer):
+        if self._position >= self.size:
+            return 0
+        if self._response is None or self._stream_position != self._position or self._stream_position > self._stream_end:
+            self._open_stream()
+        for attempt in range(constants.Requests.MAX_RETRIES.value + 1):
+            try:
+                data = self._response.raw.read(min(len(buffer), self._stream_end - self._position + 1))
+            except (OSError, HTTPError) as error:
+                logger.warning("Connection to %s dropped at byte %s: %s", self.url, self._position, error)
+                data = None
+            if data:
+                break
+            if attempt == constants.Requests.MAX_RETRIES.value:
+                raise OSError(f"Connection to {self.url} closed at byte {self._position}")
+            self._open_stream(continuing=True)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        self._stream_position = self._position
+        self.bytes_received += len(data)
+        return len(data)
+
+    def close(self):
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+        super().close()
+
+
+def _load_extract_state(state_path, download_url, size):
+    try:
+        with open(state_path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        return set(), {}
+    if state.get("url") != download_url or state.get("size") != size:
+        return set(), {}
+    return set(state.get("completed", [])), state.get("partial", {})
+
+
+def _save_extract_state(state_path, download_url, size, completed, partial):
+    try:
+        with open(state_path, "w", encoding="utf-8") as file:
+            json.dump({"url": download_url, "size": size, "completed": sorted(completed), "partial": partial}, file)
+    except OSError as error:
+        logger.error("Failed to save extraction state to %s: %s", state_path, error)
+
+
+def _can_resume_member(member):
+    # the data of a stored member is copied as it is, so a partly written member can be continued from its last byte.
+    # a compressed member cannot, as the state of its decompressor is lost
+    return member.compress_type == zipfile.ZIP_STORED and not member.is_dir() and not member.flag_bits & 0x1
+
+
+def _extract_stored_member(reader, member, target, offset=0, on_progress=None, should_cancel=None, buffer_size=1024*256):
+    """
+    Copy the data of a stored member to disk, continuing a partly written target from an offset.
+
+    The partly written target is kept if the extraction is stopped or fails, so it can be continued later.
+
+    Args:
+        reader (io.BufferedReader): The archive.
+        member (zipfile.ZipInfo): The member to extract. It must be stored without compression.
+        target (pathlib.Path): The path to extract the member to.
+        offset (int, optional): The number of bytes of the member that are already in the target.
+        on_progress (callable, optional): Called with the number of bytes written after each buffer.
+        should_cancel (callable, optional): Called before each buffer, the extraction stops if it returns True.
+        buffer_size (int, optional): The size of the buffer used to copy the member.
+
+    Raises:
+        zipfile.BadZipFile: If the local header of the member is invalid or its data does not match its CRC-32.
+
+    Returns:
+        bool: Whether the member was completely extracted.
+    """
+    reader.seek(member.header_offset)
+    header = reader.read(30)
+    # the local file header is 30 bytes long and ends with the lengths of the file name and of the extra field
+    if len(header) != 30 or header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local file header for {member.filename}")
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    data_offset = member.header_offset + 30 + name_length + extra_length
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    crc = 0
+    with open(target, "r+b" if offset else "wb") as destination:
+        # the CRC-32 of the member covers the bytes that were written by an earlier attempt too
+        while destination.tell() < offset:
+            data = destination.read(min(buffer_size, offset - destination.tell()))
+            if not data:
+                break
+            crc = zlib.crc32(data, crc)
+        offset = destination.tell()
+        destination.truncate()
+        reader.seek(data_offset + offset)
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        while offset < member.file_size:
+            if should_cancel is not None and should_cancel():
+                return False
+            read = reader.readinto(view[:min(buffer_size, member.file_size - offset)])
+            if not read:
+                raise OSError(f"Unexpected end of {member.filename} at byte {offset}")
+            destination.write(view[:read])
+            crc = zlib.crc32(view[:read], crc)
+            offset += read
+            if on_progress is not None:
+                on_progress(read)
+    if crc != member.CRC:
+        target.unlink(missing_ok=True)
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {member.filename}")
+    return True
+
+
+def download_and_extract_zip(download_url, extract_directory, download_path, progress_handler=None, buffer_size=1024*256):
+    """
+    Download a zip archive and extract its members as the bytes arrive.
+
+    If the server does not accept byte ranges, the archive is downloaded to download_path,
+    extracted and deleted instead.
+
+    A dropped connection is reopened from the byte that was last received, so it does not interrupt the extraction.
+    When the operation is paused, the members that were completely extracted are kept and skipped
+    the next time the same archive is extracted to the same directory. A member that was stored without compression,
+    as disc images often are, is continued from its last written byte, while a compressed member is extracted again,
+    as the state of its decompressor is lost.
+
+    Args:
+        download_url (str): URL of the zip archive.
+        extract_directory (pathlib.Path): The directory to extract the archive to.
+        download_path (pathlib.Path): Where to store the archive if it has to be downloaded before extracting.
+        progress_handler (ProgressHandler, optional): Progress handler to report the combined progress to.
+        buffer_size (int, optional): The size of the buffer used to copy each member.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and extracted_files (list).
+            If the operation was paused, paused is also set to True.
+    """
+    if progress_handler is None:
+        progress_handler = ProgressHandler()
+    probe = web.probe_download(download_url)
+    if not (probe["status"] and probe["accept_ranges"] and probe["size"] > 0):
+        return _download_then_extract(download_url, extract_directory, download_path, progress_handler)
+
+    size = probe["size"]
+    state_path = download_path.with_name(download_path.name + ".extract.json")
+    previously_completed, previous_partial = _load_extract_state(state_path, download_url, size)
+    completed = set()
+    # the number of bytes written to the stored member that was being extracted when the operation stopped
+    partial = {}
+    extracted_files = []
+    progress_handler.set_total_units(size / 1024 / 1024)
+    remote_file = HTTPRangeFile(probe["url"], size, read_ahead=buffer_size)
+    stopped = False
+    # the bytes that were extracted by an earlier attempt are never received, but count towards the total
+    skipped_bytes = 0
+    current_member = None
+
+    def report_progress(_=None):
+        progress_handler.report_progress((remote_file.bytes_received + skipped_bytes) / 1024 / 1024)
+
+    def get_partial():
+        # the target is written sequentially, so its size is the number of bytes of the member that were extracted
+        member, target = current_member
+        if _can_resume_member(member) and target.is_file():
+            return {member.filename: target.stat().st_size}
+        return {}
+
+    try:
+        reader = io.BufferedReader(remote_file, buffer_size=buffer_size)
+        with zipfile.ZipFile(reader) as archive:
+            for member in archive.infolist():
+                target = get_zip_member_target(extract_directory, member.filename)
+                if member.filename in previously_completed and target.exists() and (member.is_dir() or target.stat().st_size == member.file_size):
+                    completed.add(member.filename)
+                    skipped_bytes += member.compress_size
+                    report_progress()
+                    continue
+                current_member = (member, target)
+                if _can_resume_member(member):
+                    offset = 0
+                    if member.filename in previous_partial and target.is_file():
+                        offset = min(previous_partial[member.filename], target.stat().st_size, member.file_size)
+                    skipped_bytes += offset
+                    report_progress()
+                    extracted = _extract_stored_member(
+                        reader,
+                        member,
+                        target,
+                        offset=offset,
+                        on_progress=report_progress,
+                        should_cancel=progress_handler.should_cancel,
+                        buffer_size=buffer_size,
+                    )
+                else:
+                    extracted = extract_zip_member(
+                        archive,
+                        member,
+                        extract_directory,
+                        on_progress=report_progress,
+                        should_cancel=progress_handler.should_cancel,
+                        buffer_size=buffer_size,
+                        target=target,
+                    )
+                if not extracted:
+                    stopped = True
+                    partial = get_partial()
+                    break
+                current_member = None
+                completed.add(member.filename)
+                extracted_files.append(member.filename)
+    except web.RangesRefusedError as error:
+        logger.warning("Streaming extraction of %s is not possible: %s", download_url, error)
+        return _download_then_extract(download_url, extract_directory, download_path, progress_handler)
+    except zipfile.BadZipFile as error:
+        progress_handler.report_error(error)
+        return {"status": False, "message": "The ZIP file is corrupted or invalid", "extracted_files": extracted_files}
+    except Exception as error:
+        progress_handler.report_error(error)
+        _save_extract_state(state_path, download_url, size, completed, get_partial() if current_member else {})
+        return {"status": False, "message": error, "extracted_files": extracted_files}
+    finally:
+        remote_file.close()
+
+    if stopped:
+        progress_handler.cancel()
+        if progress_handler.should_pause():
+            _save_extract_state(state_path, download_url, size, completed, partial)
+            return {"status": False, "message": "Download paused", "extracted_files": extracted_files, "paused": True}
+        # the members that were kept by an earlier paused attempt belong to this download too
+        for file in [*completed, *partial]:
+            file_path = get_zip_member_target(extract_directory, file)
+            if file_path.is_file():
+                file_path.unlink(missing_ok=True)
+        state_path.unlink(missing_ok=True)
+        return {"status": False, "message": "Download cancelled", "extracted_files": []}
+
+    state_path.unlink(missing_ok=True)
+    progress_handler.report_progress(size / 1024 / 1024)
+    progress_handler.report_success()
+    return {"status": True, "message": "Download and extraction successful", "extracted_files": extracted_files}
+
+
+def _download_then_extract(download_url, extract_directory, download_path, progress_handler):
+    download_result = web.download_file_with_progress(
+        download_url=download_url,
+        download_path=download_path,
+        progress_handler=progress_handler,
+    )
+    if not download_result["status"]:
+        download_result.setdefault("extracted_files", [])
+        return download_result
+    progress_handler.set_total_units(0)
+    progress_handler.report_status("Extracting...")
+    extract_result = extract_zip_archive_with_progress(
+        zip_path=Path(download_result["download_path"]),
+        extract_directory=extract_directory,
+        progress_handler=progress_handler,
+    )
+    Path(download_result["download_path"]).unlink(missing_ok=True)
+    return extract_result
@@ -1,16 +1,104 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
+from urllib.parse import unquote, urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
 from requests import RequestException
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from core.config import constants
 from core.logging.logger import Logger
+from core.network.partial_download import PartialDownload
 from core.utils.progress_handler import ProgressHandler
 
 logger = Logger(__name__).get_logger()
 
+_sessions = {}
+_sessions_lock = threading.Lock()
+_artifact_store = None
+_session_config = {
+    "pool_connections": constants.Requests.POOL_CONNECTIONS.value,
+    "pool_maxsize": constants.Requests.POOL_MAXSIZE.value,
+    "max_retries": constants.Requests.MAX_RETRIES.value,
+    "backoff_factor": constants.Requests.BACKOFF_FACTOR.value,
+    "retry_status_codes": constants.Requests.RETRY_STATUS_CODES.value,
+}
+
+
+def configure_sessions(**config):
+    """Change the pool and retry policy used for new sessions.
+
+    Existing sessions are closed so that the next request to each host picks up the new policy.
+
+    Args:
+        pool_connections (int, optional): Number of connection pools to cache per session.
+        pool_maxsize (int, optional): Maximum number of connections to keep alive per host.
+        max_retries (int, optional): Number of times to retry a failed idempotent request.
+        backoff_factor (float, optional): Backoff factor applied between retries.
+        retry_status_codes (list, optional): Status codes that should trigger a retry.
+    """
+    unknown = set(config) - set(_session_config)
+    if unknown:
+        raise ValueError(f"Unknown session options: {', '.join(sorted(unknown))}")
+    with _sessions_lock:
+        _session_config.update(config)
+    close_sessions()
+
+
+def _create_session():
+    retry = Retry(
+        total=_session_config["max_retries"],
+        backoff_factor=_session_config["backoff_factor"],
+        status_forcelist=_session_config["retry_status_codes"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_session_config["pool_connections"],
+        pool_maxsize=_session_config["pool_maxsize"],
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url):
+    """Get the pooled session for the host of the given URL, creating it if needed.
+
+    Sessions keep connections alive between requests, so repeated calls to the same
+    host reuse the TCP and TLS connection. The connection pool of a session is thread-safe
+    and it can be shared between worker threads.
+
+    Args:
+        url (str): The URL that the session will be used for.
+
+    Returns:
+        requests.Session: The session for the scheme and host of the URL.
+    """
+    parsed_url = urlparse(url)
+    key = (parsed_url.scheme, parsed_url.netloc)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            logger.debug("Creating session for %s://%s", *key)
+            session = _create_session()
+            _sessions[key] = session
+    return session
+
+
+def close_sessions():
+    """Close all pooled sessions and their connections."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
 
 def get(url, timeout=30, headers=constants.Requests.DEFAULT_HEADERS.value, **kwargs):
     """Create a GET request to the given URL.
@@ -25,7 +113,7 @@ def get(url, timeout=30, headers=constants.Requests.DEFAULT_HEADERS.value, **kwa
     """
     try:
         logger.debug("GET %s  %s", url, kwargs)
-        response = requests.get(url, timeout=timeout, headers=headers, **kwargs)
+        response = get_session(url).get(url, timeout=timeout, headers=headers, **kwargs)
         response.raise_for_status()
     except requests.exceptions.RequestException as error:
         logger.error("GET Error: %s", error)
@@ -33,6 +121,28 @@ def get(url, timeout=30, headers=constants.Requests.DEFAULT_HEADERS.value, **kwa
     return {"status": True, "message": "Request successful", "response": response}
 
 
+def head(url, timeout=30, headers=constants.Requests.DEFAULT_HEADERS.value, allow_redirects=True, **kwargs):
+    """Create a HEAD request to the given URL.
+
+    Args:
+        url (str): URL to make the request to.
+        headers (dict, optional): Headers to include in the request.
+        timeout (int, optional): The timeout for the request. Defaults to 30.
+        allow_redirects (bool, optional): Whether to follow redirects. Defaults to True.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str or requests.RequestException) and response (requests.Response)
+    """
+    try:
+        logger.debug("HEAD %s %s", url, kwargs)
+        response = get_session(url).head(url, timeout=timeout, headers=headers, allow_redirects=allow_redirects, **kwargs)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as error:
+        logger.error("HEAD Error: %s", error)
+        return {"status": False, "message": error, "response": None}
+    return {"status": True, "message": "Request successful", "response": response}
+
+
 def post(url, data=None, json=None, timeout=30, headers=constants.Requests.DEFAULT_HEADERS.value, **kwargs):
     """Create a POST request to the given URL.
 
@@ -48,7 +158,7 @@ def post(url, data=None, json=None, timeout=30, headers=constants.Requests.DEFAU
     """
     try:
         logger.debug("POST %s %s", url, kwargs)
-        response = requests.post(url, data=data, json=json, timeout=timeout, headers=headers, **kwargs)
+        response = get_session(url).post(url, data=data, json=json, timeout=timeout, headers=headers, **kwargs)
         response.raise_for_status()
     except requests.exceptions.RequestException as error:
         logger.error("POST Error: %s", error)
@@ -56,6 +166,73 @@ def post(url, data=None, json=None, timeout=30, headers=constants.Requests.DEFAU
     return {"status": True, "message": "Request successful", "response": response}
 
 
+# the tokens of a directory listing: a link, the size or date cell of a row, or the end of a row
+LISTING_TOKEN_REGEX = re.compile(
+    r"""<a\s[^>]*?href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)(?=[\s>]))"""
+    r"""|<td[^>]*?class\s*=\s*["']?(size|date)["']?[^>]*>([^<]*)<"""
+    r"""|</tr\s*>""",
+    re.IGNORECASE,
+)
+SIZE_REGEX = re.compile(r"^([\d.]+)\s*([KMGT]i?)?B?$", re.IGNORECASE)
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def parse_listing_size(size):
+    """Convert a size from a directory listing, such as "1.2 GiB", to a number of bytes.
+
+    Args:
+        size (str): The size shown in the listing.
+
+    Returns:
+        int or None: The number of bytes, or None if the size could not be parsed.
+    """
+    match = SIZE_REGEX.match(size.strip())
+    if match is None:
+        return None
+    unit = (match.group(2) or "")[:1].lower()
+    try:
+        return int(float(match.group(1)) * SIZE_UNITS[unit])
+    except ValueError:
+        return None
+
+
+def iter_listing_records(chunks):
+    """Tokenize a directory listing as it is received.
+
+    Tokens are matched in each chunk as it arrives, and only the unfinished tag at the end of the chunk is kept for the next one,
+    so the page is never held in memory as a whole and every part of it is only scanned once.
+
+    Args:
+        chunks (iterable): The text of the page, in chunks.
+
+    Yields:
+        dict: A record with fields: href (str), size (str or None) and date (str or None) for every link in the page.
+    """
+    record = None
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        last_end = 0
+        for match in LISTING_TOKEN_REGEX.finditer(buffer):
+            last_end = match.end()
+            href = match.group(1) if match.group(1) is not None else match.group(2) if match.group(2) is not None else match.group(3)
+            if href is not None:
+                if record is not None:
+                    yield record
+                record = {"href": href, "size": None, "date": None}
+            elif match.group(4) is not None:
+                if record is not None:
+                    record[match.group(4).lower()] = match.group(5).strip()
+            elif record is not None:
+                yield record
+                record = None
+        # keep the tag that the chunk ends in the middle of, the text before it can not be part of a token
+        tag_start = buffer.rfind("<")
+        buffer = buffer[tag_start:] if tag_start >= last_end else ""
+    if record is not None:
+        yield record
+
+
 def get_all_files_from_page(url, file_ext=None, **kwargs):
     """Get all file links from a page.
 
@@ -64,19 +241,29 @@ def get_all_files_from_page(url, file_ext=None, **kwargs):
         file_ext (str, optional): The file extension to filter by. Defaults to None.
 
     Returns:
-        dict: A dictionary with fields: status (bool) and message (str) and files (list(dict of fields: url(str), filename(str)))
+        dict: A dictionary with fields: status (bool), message (str), files (list of str),
+            records (list of dict with fields: url (str), filename (str), size (str or None), size_bytes (int or None) and date (str or None)),
+            not_modified (bool, True if a conditional request was answered with 304), etag (str or None) and last_modified (str or None)
     """
     logger.debug("Getting all files from %s with extension: %s", url, file_ext)
-    response = get(url, **kwargs)
+    response = get(url, stream=True, **kwargs)
     if not response["status"]:
         return response
     response = response["response"]
+    validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    if response.status_code == 304:
+        response.close()
+        return {"status": True, "message": "Page not modified", "files": [], "records": [], "not_modified": True, **validators}
+    if response.encoding is None:
+        response.encoding = "utf-8"
     files = []
-    soup = BeautifulSoup(response.text, 'html.parser')
-    links = soup.find_all('a')
-    for link in links:
-        href = link.get('href').replace('"', '').strip("\\")
-        if (file_ext is None) or (href.endswith(file_ext) and href not in files):
+    records = []
+    seen_urls = set()
+    try:
+        for record in iter_listing_records(response.iter_content(chunk_size=1024 * 64, decode_unicode=True)):
+            href = unescape(record["href"]).replace('"', '').strip("\\")
+            if file_ext is not None and not href.endswith(file_ext):
+                continue
             result = urlparse(href)
             if all([result.scheme, result.netloc]):
                 file_url = href
@@ -85,27 +272,67 @@ def get_all_files_from_page(url, file_ext=None, **kwargs):
                 result = urlparse(file_url)
                 if not all([result.scheme, result.netloc]):
                     continue
+            if file_url in seen_urls:
+                continue
+            seen_urls.add(file_url)
             files.append(file_url)
+            records.append({
+                "url": file_url,
+                "filename": unquote(result.path.rstrip("/").split("/")[-1]),
+                "size": record["size"],
+                "size_bytes": parse_listing_size(record["size"]) if record["size"] else None,
+                "date": record["date"],
+            })
+    except requests.exceptions.RequestException as error:
+        logger.error("Error reading %s: %s", url, error)
+        return {"status": False, "message": error}
+    finally:
+        response.close()
     logger.debug("%s Files retrieved", len(files))
-    return {"status": True, "message": "Files retrieved successfully", "files": files}
+    return {"status": True, "message": "Files retrieved successfully", "files": files, "records": records, "not_modified": False, **validators}
 
 
-def download_file_with_progress(download_url, download_path, progress_handler, chunk_size=1024*256, **kwargs):
+def download_file_with_progress(download_url, download_path, progress_handler, chunk_size=1024*256, connections=constants.Requests.DOWNLOAD_CONNECTIONS.value, resumable=True, **kwargs):
     """Download a file from the given URL using a stream with a progress handler.
 
+    If the server accepts byte ranges, the file is downloaded into a `.part` file next to the download path
+    and a partial download left behind by an earlier attempt is continued instead of restarted.
+    Large files are split into ranges that are downloaded concurrently.
+    Otherwise, the file is downloaded through a single stream.
+
     Args:
         url (str): URL to download the file from.
         download_path (pathlib.Path): Path to save the downloaded file to.
         progress_handler (ProgressHandler): Progress handler to update the download progress.
         headers (dict): Headers to include in the request.
         chunk_size (int): The size of the chunks to download.
+        connections (int): The maximum number of concurrent connections to use.
+        resumable (bool): Whether to keep the partial file when the download is paused or interrupted.
 
     Returns:
-        dict: A dictionary with fields: status (bool), message (str) and download_path (str)
+        dict: A dictionary with fields: status (bool), message (str) and download_path (str).
+            If the download was paused, paused is also set to True.
     """
     if not isinstance(download_path, Path):
         raise TypeError("download_path must be a pathlib.Path object")
     logger.debug("Downloading file from %s to %s with chunk size: %s", download_url, download_path, chunk_size)
+    probe = probe_download(download_url, **kwargs)
+    if probe["status"] and probe["accept_ranges"] and probe["size"] > 0:
+        if probe["size"] < constants.Requests.SEGMENTED_DOWNLOAD_MIN_SIZE.value:
+            connections = 1
+        ranged_result = download_file_segmented(
+            download_url=download_url,
+            download_path=download_path,
+            probe=probe,
+            progress_handler=progress_handler,
+            connections=connections,
+            chunk_size=chunk_size,
+            resumable=resumable,
+            **kwargs
+        )
+        if not ranged_result.get("ranges_refused"):
+            return ranged_result
+        logger.info("Server refused byte ranges for %s, falling back to a single stream", download_url)
     response = get(download_url, stream=True, **kwargs)
     if not response["status"]:
         return response
@@ -113,6 +340,288 @@ def download_file_with_progress(download_url, download_path, progress_handler, c
     return download_through_stream(response, download_path, chunk_size, progress_handler)
 
 
+def configure_artifact_store(artifact_store):
+    """Set the store that download_artifact keeps downloaded artifacts in.
+
+    Args:
+        artifact_store (ArtifactStore): The store to use.
+    """
+    global _artifact_store
+    _artifact_store = artifact_store
+
+
+def download_artifact(download_url, download_path, progress_handler=None, size=None, **kwargs):
+    """Download an artifact, such as a release or firmware archive, through the artifact store.
+
+    If the store already has the artifact of the URL, it is placed at the download path without being downloaded.
+    Otherwise, it is downloaded with download_file_with_progress, added to the store and then placed at the download path.
+    Without a configured store, this is the same as download_file_with_progress.
+
+    Args:
+        download_url (str): URL to download the artifact from.
+        download_path (pathlib.Path): Path to place the artifact at.
+        progress_handler (ProgressHandler): Progress handler to update the download progress.
+        size (int, optional): The expected size of the artifact, if it is known.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and download_path (str).
+            If the download was paused, paused is also set to True.
+    """
+    if _artifact_store is None:
+        return download_file_with_progress(download_url, download_path, progress_handler, **kwargs)
+    if progress_handler is None:
+        progress_handler = ProgressHandler()
+    with _artifact_store.lock_url(download_url):
+        try:
+            if _artifact_store.materialize(download_url, download_path, size=size):
+                progress_handler.report_success()
+                return {"status": True, "message": "The artifact was already downloaded", "download_path": download_path}
+            staging_path = _artifact_store.get_staging_path(download_url)
+            download_result = download_file_with_progress(download_url, staging_path, progress_handler, **kwargs)
+            if not download_result["status"]:
+                return download_result
+            if size is not None and staging_path.stat().st_size != size:
+                staging_path.unlink(missing_ok=True)
+                return {"status": False, "message": "The downloaded file does not have the expected size", "download_path": None}
+            _artifact_store.add(download_url, staging_path)
+            _artifact_store.materialize(download_url, download_path)
+        except OSError as error:
+            logger.error("Failed to use the artifact store for %s: %s", download_url, error)
+            return {"status": False, "message": error, "download_path": None}
+    _artifact_store.evict()
+    return {"status": True, "message": "Download successful", "download_path": download_path}
+
+
+def probe_download(download_url, **kwargs):
+    """Check the size and validators of a file and whether the server accepts byte range requests for it.
+
+    Args:
+        download_url (str): URL of the file to probe.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str), url (str), size (int),
+            accept_ranges (bool), etag (str or None) and last_modified (str or None)
+    """
+    response = head(download_url, **kwargs)
+    if not response["status"]:
+        return response
+    response = response["response"]
+    return {
+        "status": True,
+        "message": "Probe successful",
+        # use the URL after redirects so that each range request does not have to follow them again
+        "url": response.url,
+        "size": int(response.headers.get("content-length", 0)),
+        "accept_ranges": response.headers.get("accept-ranges", "").lower() == "bytes",
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+    }
+
+
+class RangesRefusedError(Exception):
+    """Raised when a server answers a range request with the full file."""
+
+
+def _split_ranges(ranges, connections):
+    """Split the inclusive byte ranges into pieces so that about `connections` requests can run at once."""
+    total = sum(end - start + 1 for start, end in ranges)
+    segment_size = max(total // connections, constants.Requests.MIN_SEGMENT_SIZE.value)
+    pieces = []
+    for range_start, range_end in ranges:
+        start = range_start
+        while start <= range_end:
+            end = min(start + segment_size - 1, range_end)
+            if range_end - end < segment_size // 2:
+                # fold a small remainder into the last piece instead of making a tiny extra request
+                end = range_end
+            pieces.append((start, end))
+            start = end + 1
+    return pieces
+
+
+def download_file_segmented(download_url, download_path, probe, progress_handler, connections, chunk_size=1024*256, resumable=True, headers=constants.Requests.DEFAULT_HEADERS.value, **kwargs):
+    """Download a file by fetching byte ranges concurrently into a preallocated `.part` file.
+
+    Ranges that were completed by an earlier attempt are skipped. When the download is paused or the
+    connection drops, the `.part` file and its sidecar are kept so that the next call can resume it.
+
+    Args:
+        download_url (str): URL to download the file from. The server must accept byte ranges.
+        download_path (pathlib.Path): Path to save the downloaded file to.
+        probe (dict): The result of probe_download for the URL.
+        progress_handler (ProgressHandler): Progress handler to update the download progress.
+        connections (int): The maximum number of concurrent connections to use.
+        chunk_size (int): The size of the chunks to download.
+        resumable (bool): Whether to keep the partial file when the download is paused or interrupted.
+        headers (dict): Headers to include in the requests.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and download_path (str).
+            If the download was paused, paused is also set to True.
+            If the server did not honour the range requests, ranges_refused is also set to True.
+    """
+    if progress_handler is None:
+        progress_handler = ProgressHandler()
+    size = probe["size"]
+    if not progress_handler.is_total_units_set():
+        progress_handler.set_total_units(size / 1024 / 1024)
+
+    if resumable:
+        partial = PartialDownload.load(download_path, download_url, size, probe["etag"], probe["last_modified"])
+    else:
+        partial = PartialDownload(download_path, download_url, size, probe["etag"], probe["last_modified"])
+        partial.discard()
+    ranges = _split_ranges(partial.missing_ranges(), connections)
+    logger.debug("Downloading %s in %s ranges", download_url, len(ranges))
+
+    range_headers = dict(headers)
+    # only resume from the same version of the file, a changed file is sent in full and treated as refused
+    validator = probe["etag"] if probe["etag"] and not probe["etag"].startswith("W/") else probe["last_modified"]
+    if validator:
+        range_headers["If-Range"] = validator
+
+    progress_lock = threading.Lock()
+    stop_event = threading.Event()
+    downloaded_bytes = partial.completed_bytes()
+    progress_handler.report_progress(downloaded_bytes / 1024 / 1024)
+
+    def fetch_range(start, end):
+        nonlocal downloaded_bytes
+        # a range that was still queued when the download stopped is dropped before it sends its request
+        if stop_event.is_set() or progress_handler.should_cancel():
+            stop_event.set()
+            return False
+        response = get(probe["url"], stream=True, headers={**range_headers, "Range": f"bytes={start}-{end}"}, **kwargs)
+        if not response["status"]:
+            raise response["message"]
+        response = response["response"]
+        if response.status_code != 206:
+            response.close()
+            raise RangesRefusedError(f"Expected 206 Partial Content but got {response.status_code}")
+        position = start
+        saved_position = start
+        # every worker uses its own handle so that writes go straight to the range's offset
+        with response, open(partial.part_path, "r+b") as f:
+            f.seek(start)
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if stop_event.is_set():
+                        return False
+                    if progress_handler.should_cancel():
+                        stop_event.set()
+                        return False
+                    chunk = chunk[:end + 1 - position]
+                    f.write(chunk)
+                    position += len(chunk)
+                    with progress_lock:
+                        downloaded_bytes += len(chunk)
+                        completed = downloaded_bytes
+                    progress_handler.report_progress(completed / 1024 / 1024)
+                    if resumable and position - saved_position >= constants.Requests.PARTIAL_SAVE_INTERVAL.value:
+                        f.flush()
+                        partial.add_completed_range(saved_position, position - 1)
+                        partial.save()
+                        saved_position = position
+                    if position > end:
+                        break
+            finally:
+                # record whatever was written before stopping so that a retry continues from here
+                f.flush()
+                partial.add_completed_range(saved_position, position - 1)
+        if position <= end:
+            raise RequestException(f"Connection closed after {position - start} of {end - start + 1} bytes")
+        return True
+
+    try:
+        if not partial.part_path.exists():
+            with open(partial.part_path, "wb") as f:
+                f.truncate(size)
+        with ThreadPoolExecutor(max_workers=max(min(connections, len(ranges)), 1)) as executor:
+            futures = [executor.submit(fetch_range, start, end) for start, end in ranges]
+            try:
+                completed_ranges = [future.result() for future in futures]
+            except BaseException:
+                stop_event.set()
+                for future in futures:
+                    future.cancel()
+                raise
+    except RangesRefusedError as error:
+        logger.warning("Range request refused: %s", error)
+        partial.discard()
+        return {
+            "status": False,
+            "message": str(error),
+            "download_path": None,
+            "ranges_refused": True,
+        }
+    except PermissionError as error:
+        progress_handler.report_error(error)
+        partial.discard()
+        return {
+            "status": False,
+            "message": f"Permission was denied. Make sure the app and the user have permission to write to the current directory:\n\n{download_path.parent}",
+            "download_path": None
+        }
+    except (FileNotFoundError, RequestException, OSError) as error:
+        progress_handler.report_error(error)
+        if resumable:
+            partial.save()
+        else:
+            partial.discard()
+        return {
+            "status": False,
+            "message": error,
+            "download_path": None
+        }
+
+    if not all(completed_ranges):
+        progress_handler.cancel()
+        if resumable and progress_handler.should_pause():
+            partial.save()
+            return {
+                "status": False,
+                "message": "Download paused",
+                "download_path": None,
+                "paused": True,
+            }
+        try:
+            partial.discard()
+        except PermissionError:
+            return {
+                "status": False,
+                "message": "Download cancelled, and the file could not be deleted.",
+                "download_path": None
+            }
+        return {
+            "status": False,
+            "message": "Download cancelled",
+            "download_path": None
+        }
+
+    try:
+        finalize_result = partial.finalize()
+    except OSError as error:
+        progress_handler.report_error(error)
+        return {
+            "status": False,
+            "message": error,
+            "download_path": None
+        }
+    if not finalize_result["status"]:
+        progress_handler.report_error(finalize_result["message"])
+        return {
+            "status": False,
+            "message": finalize_result["message"],
+            "download_path": None
+        }
+    progress_handler.report_success()
+    return {
+        "status": True,
+        "message": "Download successful",
+        "download_path": Path(download_path)
+    }
+
+
 def download_through_stream(response, download_path, chunk_size, progress_handler):
     if progress_handler is None:
         progress_handler = ProgressHandler()
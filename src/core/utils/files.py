@@ -1,10 +1,138 @@
+import os
+import queue
 import shutil
+import sys
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import py7zr
+from py7zr.callbacks import ExtractCallback
+
+from core.config import constants
 from core.utils.progress_handler import ProgressHandler
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# the FICLONE ioctl of Linux, which makes the target share the extents of the source on btrfs and xfs
+FICLONE = 0x40049409
+
+
+def _try_reflink(source_fd, target_fd):
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        fcntl.ioctl(target_fd, FICLONE, source_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _preallocate(target_fd, size):
+    # reserving the space up front avoids fragmenting the file as it grows, it is only an optimisation
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(target_fd, 0, size)
+        else:
+            os.ftruncate(target_fd, size)
+    except OSError:
+        pass
+
+
+def copy_file(source, target, on_progress=None, should_cancel=None, size=None, buffer_size=constants.App.COPY_BUFFER_SIZE.value):
+    """
+    Copy a file and its metadata, reporting the progress in bytes.
 
-def copy_directory_with_progress(source_dir, target_dir, progress_handler=None, exclude=None, include=None):
+    Large files are cloned with a reflink or copied in the kernel with os.copy_file_range where the platform
+    and file system support it. Every other file is preallocated and copied through a reused buffer.
+
+    Args:
+        source (pathlib.Path): The file to copy.
+        target (pathlib.Path): The path to copy the file to. Its parent directory must exist.
+        on_progress (callable, optional): Called with the number of bytes copied since the last call.
+        should_cancel (callable, optional): Called between chunks, the copy stops if it returns True.
+        size (int, optional): The size of the source file, if it is already known.
+        buffer_size (int, optional): The size of the chunks to copy.
+
+    Returns:
+        pathlib.Path or None: The target path, or None if the copy was cancelled.
+            A partially written file is removed when the copy is cancelled or fails.
+    """
+    def cancelled():
+        return should_cancel is not None and should_cancel()
+
+    def report(copied_bytes):
+        if on_progress is not None:
+            on_progress(copied_bytes)
+
+    if size is None:
+        size = source.stat().st_size
+    large_file = size >= constants.App.COPY_LARGE_FILE_THRESHOLD.value
+    completed = False
+    try:
+        with open(source, "rb") as source_file, open(target, "wb") as target_file:
+            source_fd, target_fd = source_file.fileno(), target_file.fileno()
+            copied = 0
+            if large_file and _try_reflink(source_fd, target_fd):
+                copied = size
+                report(size)
+            elif size > 0:
+                _preallocate(target_fd, size)
+            if copied < size and large_file and hasattr(os, "copy_file_range"):
+                try:
+                    while copied < size and not cancelled():
+                        written = os.copy_file_range(source_fd, target_fd, min(buffer_size, size - copied))
+                        if written == 0:
+                            break
+                        copied += written
+                        report(written)
+                except OSError:
+                    if copied:
+                        raise
+                    # not supported between these file systems, fall back to copying through a buffer
+            if copied < size:
+                source_file.seek(copied)
+                target_file.seek(copied)
+                buffer = bytearray(buffer_size)
+                view = memoryview(buffer)
+                while not cancelled():
+                    read_bytes = source_file.readinto(buffer)
+                    if not read_bytes:
+                        break
+                    target_file.write(view[:read_bytes])
+                    copied += read_bytes
+                    report(read_bytes)
+            if copied < size and cancelled():
+                return None
+            # the file may have shrunk since it was preallocated
+            target_file.truncate()
+        shutil.copystat(source, target)
+        completed = True
+    finally:
+        if not completed:
+            target.unlink(missing_ok=True)
+    return target
+
+
+def copy_directory_with_progress(source_dir, target_dir, progress_handler=None, exclude=None, include=None, max_workers=constants.App.COPY_WORKERS.value):
+    """
+    Copy the files of a directory with a pool of worker threads, reporting the progress in MiB.
+
+    Args:
+        source_dir (pathlib.Path): The directory to copy.
+        target_dir (pathlib.Path): The directory to copy the files to.
+        progress_handler (ProgressHandler, optional): Progress handler to report the progress to.
+        exclude (list, optional): Folder names whose files are not copied.
+        include (list, optional): Folder names whose files are the only ones copied. Takes priority over exclude.
+        max_workers (int, optional): The number of files that are copied at the same time.
+
+    Returns:
+        dict: A dictionary with fields: status (bool) and message (str)
+    """
     if progress_handler is None:
         progress_handler = ProgressHandler()
     if not source_dir.exists() or not source_dir.is_dir():
@@ -22,32 +150,51 @@ def copy_directory_with_progress(source_dir, target_dir, progress_handler=None,
     elif exclude:
         all_files = [file for file in all_files if not any(
             excl_folder in file.parts for excl_folder in exclude)]
-    # Get the total number of files to copy
-    total_files = len(all_files)
-    progress_handler.set_total_units(total_files)
 
-    # Create the target directory if it doesn't exist
+    file_sizes = {file: file.stat().st_size for file in all_files}
+    progress_handler.set_total_units(sum(file_sizes.values()) / 1024 / 1024)
+
+    # Create the target directories up front, so that the workers only have to copy files
     target_dir.mkdir(parents=True, exist_ok=True)
+    for target_dirname in {target_dir / file.parent.relative_to(source_dir) for file in all_files}:
+        target_dirname.mkdir(parents=True, exist_ok=True)
 
-    # Copy files from source to target directory and display progress
-    copied_files = 0
-    for file in all_files:
-        if progress_handler.should_cancel():
-            progress_handler.cancel()
-            return {"status": False, "message": "Copy operation cancelled"}
+    progress_lock = threading.Lock()
+    copied_bytes = 0
+    failed = threading.Event()
 
-        target_file = target_dir / file.relative_to(source_dir)
+    def report_progress(new_bytes):
+        nonlocal copied_bytes
+        with progress_lock:
+            copied_bytes += new_bytes
+            progress_handler.report_progress(copied_bytes / 1024 / 1024)
 
-        target_dirname = target_file.parent
+    def should_stop():
+        return failed.is_set() or bool(progress_handler.should_cancel())
 
-        # Create the necessary directories in the target if they don't exist
-        target_dirname.mkdir(parents=True, exist_ok=True)
+    def copy(file):
+        return copy_file(file, target_dir / file.relative_to(source_dir), on_progress=report_progress,
+                         should_cancel=should_stop, size=file_sizes[file])
 
-        # Copy the file to the target directory
-        shutil.copy2(file, target_file)
+    # the largest files are started first, so that one of them is not left copying on its own at the end
+    all_files.sort(key=file_sizes.get, reverse=True)
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="CopyWorker") as executor:
+        futures = [executor.submit(copy, file) for file in all_files]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except OSError as copy_error:
+                if error is None:
+                    error = copy_error
+                failed.set()
 
-        copied_files += 1
-        progress_handler.report_progress(copied_files)
+    if error is not None:
+        progress_handler.report_error(error)
+        return {"status": False, "message": error}
+    if progress_handler.should_cancel():
+        progress_handler.cancel()
+        return {"status": False, "message": "Copy operation cancelled"}
 
     progress_handler.report_success()
     return {
@@ -56,23 +203,174 @@ def copy_directory_with_progress(source_dir, target_dir, progress_handler=None,
     }
 
 
-def extract_zip_archive_with_progress(zip_path, extract_directory, progress_handler):
+def get_zip_member_target(extract_directory, member_name):
+    """
+    Get the path that a zip member should be extracted to, refusing members that would escape the extract directory.
+
+    Args:
+        extract_directory (pathlib.Path): The directory the archive is being extracted to.
+        member_name (str): The name of the member in the archive.
+
+    Raises:
+        ValueError: If the member would be extracted outside the extract directory.
+
+    Returns:
+        pathlib.Path: The path to extract the member to.
+    """
+    extract_directory = extract_directory.resolve()
+    target = (extract_directory / member_name).resolve()
+    if not target.is_relative_to(extract_directory):
+        raise ValueError(f"Refusing to extract {member_name} outside of {extract_directory}")
+    return target
+
+
+def extract_zip_member(archive, member, extract_directory, on_progress=None, should_cancel=None, buffer_size=1024*1024, target=None):
+    """
+    Stream a single member of a zip archive to disk using a bounded buffer.
+
+    Args:
+        archive (zipfile.ZipFile): The open archive.
+        member (zipfile.ZipInfo): The member to extract.
+        extract_directory (pathlib.Path): The directory to extract the member to.
+        on_progress (callable, optional): Called with the number of uncompressed bytes written after each buffer.
+        should_cancel (callable, optional): Called before each buffer, the extraction stops if it returns True.
+        buffer_size (int, optional): The size of the buffer used to copy the member.
+        target (pathlib.Path, optional): The path to extract the member to, instead of its path in the extract directory.
+
+    Returns:
+        pathlib.Path or None: The extracted path, or None if the extraction was cancelled.
+            A partially written file is removed when the extraction is cancelled or fails.
+    """
+    if target is None:
+        target = get_zip_member_target(extract_directory, member.filename)
+    if member.is_dir():
+        target.mkdir(parents=True, exist_ok=True)
+        return target
+    target.parent.mkdir(parents=True, exist_ok=True)
+    completed = False
+    try:
+        with archive.open(member) as source, open(target, "wb") as destination:
+            while True:
+                if should_cancel is not None and should_cancel():
+                    return None
+                buffer = source.read(buffer_size)
+                if not buffer:
+                    break
+                destination.write(buffer)
+                if on_progress is not None:
+                    on_progress(len(buffer))
+        completed = True
+    finally:
+        if not completed:
+            target.unlink(missing_ok=True)
+    return target
+
+
+def extract_zip_members(zip_path, jobs, on_progress=None, should_cancel=None, max_workers=constants.App.EXTRACT_WORKERS.value, buffer_size=1024*1024):
+    """
+    Extract members of a zip archive in parallel. Every worker thread reads the archive through its own
+    file handle and streams its members to disk with a bounded buffer.
+
+    Args:
+        zip_path (pathlib.Path): The path of the archive.
+        jobs (list): Pairs of the zipfile.ZipInfo of a member and the pathlib.Path to extract it to.
+        on_progress (callable, optional): Called with the total number of uncompressed bytes written so far.
+        should_cancel (callable, optional): Called between buffers, the extraction stops if it returns True.
+        max_workers (int, optional): The number of members that are extracted at the same time.
+        buffer_size (int, optional): The size of the buffer used to copy each member.
+
+    Raises:
+        Exception: The first error raised while extracting a member, once the other workers have stopped.
+
+    Returns:
+        dict: A dictionary with fields: extracted (list of zipfile.ZipInfo) and cancelled (bool)
+    """
+    local = threading.local()
+    archives = []
+    lock = threading.Lock()
+    failed = threading.Event()
+    written_bytes = 0
+
+    def get_archive():
+        archive = getattr(local, "archive", None)
+        if archive is None:
+            archive = zipfile.ZipFile(zip_path, "r")
+            local.archive = archive
+            with lock:
+                archives.append(archive)
+        return archive
+
+    def report_progress(new_bytes):
+        nonlocal written_bytes
+        with lock:
+            written_bytes += new_bytes
+            if on_progress is not None:
+                on_progress(written_bytes)
+
+    def should_stop():
+        return failed.is_set() or (should_cancel is not None and bool(should_cancel()))
+
+    def extract(member, target):
+        if should_stop():
+            return None
+        return extract_zip_member(get_archive(), member, None, on_progress=report_progress, should_cancel=should_stop,
+                                  buffer_size=buffer_size, target=target)
+
+    extracted = []
+    cancelled = False
+    error = None
+    # the largest members are started first, so that one of them is not left extracting on its own at the end
+    jobs = sorted(jobs, key=lambda job: job[0].file_size, reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ExtractWorker") as executor:
+            futures = {executor.submit(extract, member, target): member for member, target in jobs}
+            for future in as_completed(futures):
+                try:
+                    if future.result() is None:
+                        cancelled = True
+                    else:
+                        extracted.append(futures[future])
+                except Exception as extract_error:
+                    if error is None:
+                        error = extract_error
+                    failed.set()
+    finally:
+        for archive in archives:
+            archive.close()
+    if error is not None:
+        raise error
+    return {"extracted": extracted, "cancelled": cancelled}
+
+
+def extract_zip_archive_with_progress(zip_path, extract_directory, progress_handler, max_workers=constants.App.EXTRACT_WORKERS.value):
+    """
+    Extract a zip archive in parallel, reporting the progress in MiB of uncompressed data.
+
+    Args:
+        zip_path (pathlib.Path): The path of the archive.
+        extract_directory (pathlib.Path): The directory to extract the archive to.
+        progress_handler (ProgressHandler): Progress handler to report the progress to.
+        max_workers (int, optional): The number of members that are extracted at the same time.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and extracted_files (list of str)
+    """
     extracted_files = []
     if progress_handler is None:
         progress_handler = ProgressHandler()
-    rollback_needed = False
     try:
         with zipfile.ZipFile(zip_path, 'r') as archive:
-            total_files = len(archive.namelist())
-            progress_handler.set_total_units(total_files)
-            for file in archive.namelist():
-                if progress_handler.should_cancel():
-                    rollback_needed = True
-                    break
-                archive.extract(file, extract_directory)
-                extracted_files.append(file)
-                # Calculate and display progress
-                progress_handler.report_progress(len(extracted_files))
+            members = archive.infolist()
+        jobs = [(member, get_zip_member_target(extract_directory, member.filename)) for member in members]
+        progress_handler.set_total_units(sum(member.file_size for member in members) / 1024 / 1024)
+        extract_result = extract_zip_members(
+            zip_path,
+            jobs,
+            on_progress=lambda written_bytes: progress_handler.report_progress(written_bytes / 1024 / 1024),
+            should_cancel=progress_handler.should_cancel,
+            max_workers=max_workers,
+        )
+        extracted_files = [member.filename for member in extract_result["extracted"]]
     except zipfile.BadZipFile as error:
         progress_handler.report_error(error)
         return {"status": False, "message": "The ZIP file is corrupted or invalid"}
@@ -80,7 +378,7 @@ def extract_zip_archive_with_progress(zip_path, extract_directory, progress_hand
         progress_handler.report_error(error)
         return {"status": False, "message": error}
 
-    if rollback_needed:
+    if extract_result["cancelled"]:
         progress_handler.cancel()
         dirs = []
         for file in extracted_files:
@@ -89,7 +387,8 @@ def extract_zip_archive_with_progress(zip_path, extract_directory, progress_hand
                 dirs.append(file_path)
             if file_path.is_file():
                 file_path.unlink(missing_ok=True)
-        for dir in dirs:
+        # remove the deepest directories first, so that their parents are empty when they are reached
+        for dir in sorted(dirs, key=lambda path: len(path.parts), reverse=True):
             try:
                 dir.rmdir()
             except OSError:
@@ -98,3 +397,128 @@ def extract_zip_archive_with_progress(zip_path, extract_directory, progress_hand
         return {"status": False, "message": "Extraction cancelled"}
     progress_handler.report_success()
     return {"status": True, "message": "Extraction successful", "extracted_files": extracted_files}
+
+
+class _SevenZipProgressCallback(ExtractCallback):
+    """
+    Reports the bytes decompressed by py7zr to a progress handler. py7zr calls it from its reporter thread.
+    """
+    def __init__(self, progress_handler):
+        self.progress_handler = progress_handler
+        self.decompressed_bytes = 0
+
+    def report_start_preparation(self):
+        pass
+
+    def report_start(self, processing_file_path, processing_bytes):
+        pass
+
+    def report_update(self, decompressed_bytes):
+        self.decompressed_bytes += int(decompressed_bytes)
+        self.progress_handler.report_progress(self.decompressed_bytes / 1024 / 1024)
+
+    def report_end(self, processing_file_path, wrote_bytes):
+        pass
+
+    def report_warning(self, message):
+        pass
+
+    def report_postprocess(self):
+        pass
+
+
+class _SevenZipCancelled(Exception):
+    pass
+
+
+class _SevenZipProgressQueue(queue.Queue):
+    """
+    The queue that py7zr's decompression threads put their progress on, for the reporter thread to pass to the callback.
+
+    An exception raised in the callback only stops the reporter thread, so the cancellation is checked here instead.
+    Raising from put stops the decompression thread that reported the progress, and py7zr raises it again from extractall.
+    This relies on the internals of py7zr 0.22.0, so it is only installed if the archive has a queue to replace.
+    """
+    def __init__(self, should_cancel):
+        super().__init__()
+        self.should_cancel = should_cancel
+
+    def put(self, item, block=True, timeout=None):
+        if item is not None and self.should_cancel():
+            raise _SevenZipCancelled()
+        super().put(item, block, timeout)
+
+
+def extract_7z_archive_with_progress(archive_path, extract_directory, progress_handler, strip_top_folder=False):
+    """
+    Extract a 7z archive, reporting the progress in MiB of uncompressed data.
+
+    The archive is decompressed by py7zr, which decodes the independent blocks of an archive in parallel threads,
+    into a staging directory inside the extract directory. Once it is complete, its contents are renamed into place,
+    which does not copy them as both directories are on the same file system. If the extraction is cancelled or fails,
+    the staging directory is removed, so the extract directory is left as it was.
+
+    Args:
+        archive_path (pathlib.Path): The path of the archive.
+        extract_directory (pathlib.Path): The directory to extract the archive to.
+        progress_handler (ProgressHandler): Progress handler to report the progress to.
+        strip_top_folder (bool, optional): If the archive has a single top level folder, extract its contents instead of the folder.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and extracted_files (list of str)
+    """
+    if progress_handler is None:
+        progress_handler = ProgressHandler()
+    extract_directory = extract_directory.resolve()
+    extract_directory.mkdir(parents=True, exist_ok=True)
+    staging_directory = extract_directory / f".{archive_path.name}.extracting"
+    shutil.rmtree(staging_directory, ignore_errors=True)
+    cancelled = False
+    try:
+        with py7zr.SevenZipFile(archive_path, mode="r") as archive:
+            files = archive.list()
+            progress_handler.set_total_units(sum(file.uncompressed for file in files if not file.is_directory) / 1024 / 1024)
+            if isinstance(getattr(archive, "q", None), queue.Queue):
+                archive.q = _SevenZipProgressQueue(progress_handler.should_cancel)
+            archive.extractall(path=staging_directory, callback=_SevenZipProgressCallback(progress_handler))
+        # without the progress queue of py7zr 0.22.0, the cancellation can only be checked once the archive is extracted
+        cancelled = progress_handler.should_cancel()
+    except _SevenZipCancelled:
+        cancelled = True
+    except Exception as error:
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        progress_handler.report_error(error)
+        return {"status": False, "message": f"Failed to extract 7z archive: {error}", "extracted_files": []}
+
+    if cancelled:
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        progress_handler.cancel()
+        return {"status": False, "message": "Extraction cancelled", "extracted_files": []}
+
+    source_directory = staging_directory
+    top_level_entries = list(staging_directory.iterdir())
+    if strip_top_folder and len(top_level_entries) == 1 and top_level_entries[0].is_dir():
+        source_directory = top_level_entries[0]
+    extracted_files = [path.relative_to(source_directory).as_posix() for path in source_directory.rglob("*") if not path.is_dir()]
+    try:
+        _move_into(source_directory, extract_directory)
+    except OSError as error:
+        progress_handler.report_error(error)
+        return {"status": False, "message": f"Failed to move the extracted files into place: {error}", "extracted_files": []}
+    finally:
+        shutil.rmtree(staging_directory, ignore_errors=True)
+
+    progress_handler.report_success()
+    return {"status": True, "message": "Extraction successful", "extracted_files": extracted_files}
+
+
+def _move_into(source_directory, target_directory):
+    # directories that already exist in the target are merged, so only files are renamed over existing ones
+    for source in source_directory.iterdir():
+        target = target_directory / source.name
+        if source.is_dir() and not source.is_symlink() and target.is_dir() and not target.is_symlink():
+            _move_into(source, target)
+            continue
+        if target.is_dir() and not target.is_symlink():
+            shutil.rmtree(target)
+        os.replace(source, target)
@@ -0,0 +1,182 @@
+"""
+An index of the ROMs in a game directory that is updated incrementally.
+
+Adding, removing or renaming a file changes the modification time of the directory that contains it,
+so the modification time of every directory is stored with the files that were found in it. When the
+index is refreshed, only the directories whose modification time has changed are listed again, and the
+directories that have not changed are only checked with a single stat call each. The whole directory is
+rescanned if it was replaced, or once the index is older than the rescan interval, to pick up changes that
+do not change the directory, such as a file being overwritten in place.
+
+The index is kept in memory and persisted in the cache, so the sizes of the games never have to be read from disk.
+"""
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+from core.config import constants
+from core.logging.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+LIBRARY_INDEX_VERSION = 1
+
+
+class RomLibraryIndex:
+    """
+    An index of the files with the given extensions in a directory.
+
+    Games are identified by their path relative to the directory, with forward slashes.
+
+    Methods:
+        - refresh: Update the index with the changes in the directory.
+        - get_games: Get the games in the index.
+        - get_size: Get the size of a game.
+    """
+    def __init__(self, directory, extensions, recursive=False, cache=None):
+        self.directory = Path(directory)
+        self.extensions = {extension.lower() for extension in extensions}
+        self.recursive = recursive
+        self.cache = cache
+        self.cache_key = "rom_library_" + hashlib.sha1(
+            f"{self.directory.resolve()}|{sorted(self.extensions)}|{recursive}".encode()
+        ).hexdigest()
+        self._lock = threading.Lock()
+        # relative directory -> [mtime_ns, {file name: [size, mtime_ns]}, [relative subdirectories]]
+        self._directories = {}
+        self._root_id = None
+        self._scanned_at = 0
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        if self.cache is None:
+            return
+        cache_result = self.cache.get_json(self.cache_key)
+        if not cache_result["status"]:
+            return
+        data = cache_result["data"]
+        if data.get("version") != LIBRARY_INDEX_VERSION:
+            return
+        # the cached data is shared, so it is copied before it is modified
+        self._directories = {
+            relative: [mtime_ns, {name: list(stats) for name, stats in files.items()}, list(subdirectories)]
+            for relative, (mtime_ns, files, subdirectories) in data["directories"].items()
+        }
+        self._root_id = tuple(data["root_id"]) if data["root_id"] else None
+        self._scanned_at = data["scanned_at"]
+
+    def _save(self):
+        if self.cache is None:
+            return
+        self.cache.add_json(self.cache_key, {
+            "version": LIBRARY_INDEX_VERSION,
+            "directories": self._directories,
+            "root_id": self._root_id,
+            "scanned_at": self._scanned_at,
+        })
+
+    def _scan_directory(self, relative, mtime_ns):
+        """
+        List a single directory, storing its files and returning its subdirectories.
+        The modification time is read before the directory is listed, so a change made while it is listed is picked up by the next refresh.
+        """
+        path = self.directory / relative if relative else self.directory
+        files = {}
+        subdirectories = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if self.recursive:
+                        subdirectories.append(f"{relative}/{entry.name}" if relative else entry.name)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in self.extensions:
+                    stat = entry.stat()
+                    files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+        self._directories[relative] = [mtime_ns, files, subdirectories]
+        return subdirectories
+
+    def _forget_directory(self, relative):
+        prefix = f"{relative}/"
+        for known in [known for known in self._directories if known == relative or known.startswith(prefix)]:
+            del self._directories[known]
+
+    def refresh(self):
+        """
+        Update the index with the changes in the directory.
+
+        Returns:
+            dict: A dictionary with fields: status (bool), message (str) and rescanned (int, the number of directories that were listed)
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            try:
+                root_stat = os.stat(self.directory)
+            except OSError as error:
+                return {"status": False, "message": f"Could not read the game directory: {error}", "rescanned": 0}
+            root_id = (root_stat.st_dev, root_stat.st_ino)
+            if root_id != self._root_id or time.time() - self._scanned_at > constants.App.ROM_LIBRARY_RESCAN_INTERVAL.value:
+                logger.info("Rescanning the game directory %s", self.directory)
+                self._directories = {}
+                self._root_id = root_id
+                self._scanned_at = time.time()
+
+            rescanned = 0
+            pending = [""]
+            while pending:
+                relative = pending.pop()
+                known = self._directories.get(relative)
+                path = self.directory / relative if relative else self.directory
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    self._forget_directory(relative)
+                    continue
+                if known is not None and known[0] == mtime_ns:
+                    pending.extend(known[2])
+                    continue
+                subdirectories = self._scan_directory(relative, mtime_ns)
+                rescanned += 1
+                # subdirectories that no longer exist are dropped with everything below them
+                if known is not None:
+                    for directory in set(known[2]).difference(subdirectories):
+                        self._forget_directory(directory)
+                pending.extend(subdirectories)
+
+            if rescanned:
+                self._save()
+            logger.debug("Refreshed the game directory %s, %s directories listed", self.directory, rescanned)
+            return {"status": True, "message": "Library refreshed", "rescanned": rescanned}
+
+    def get_games(self):
+        """
+        Get the games in the index, sorted by their path.
+
+        Returns:
+            list: The paths of the games relative to the directory.
+        """
+        with self._lock:
+            return sorted(
+                f"{relative}/{name}" if relative else name
+                for relative, (_, files, _) in self._directories.items()
+                for name in files
+            )
+
+    def get_size(self, game):
+        """
+        Get the size of a game from the index.
+
+        Args:
+            game (str): The path of the game relative to the directory.
+
+        Returns:
+            int or None: The size of the game in bytes, or None if it is not in the index.
+        """
+        relative, _, name = game.rpartition("/")
+        with self._lock:
+            directory = self._directories.get(relative)
+            if directory is None or name not in directory[1]:
+                return None
+            return directory[1][name][0]
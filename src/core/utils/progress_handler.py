@@ -16,6 +16,9 @@ class ProgressHandler:
     the user can cancel the operation if it is taking too long. The should_cancel method
     will be called periodically to check if the user has pressed the cancel button within
     the functions and the cancel method will be called from these functions.
+
+    Operations that can be resumed, such as downloads, call should_pause after they
+    have been cancelled to decide whether to keep their partial progress.
     """
     def report_progress(self, value):
         pass
@@ -26,6 +29,9 @@ class ProgressHandler:
     def report_error(self, error):
         pass
 
+    def report_status(self, status):
+        pass
+
     def set_total_units(self, total_units):
         pass
 
@@ -35,5 +41,8 @@ class ProgressHandler:
     def should_cancel(self):
         pass
 
+    def should_pause(self):
+        return False
+
     def cancel(self):
         pass
@@ -0,0 +1,176 @@
+"""
+An inverted index for searching game lists.
+
+Titles are indexed by their lowercase character trigrams. A query is answered by intersecting
+the posting sets of its trigrams and confirming the substring match, so any part of a title,
+including the start of a word, can be searched for without scanning every title.
+
+Redump style names, such as "Game (USA, Europe) (En,Fr) (Rev 1)", are parsed for their regions
+and revision, which can be filtered on with "region:" and "rev:" terms in the query.
+"""
+import re
+
+from core.logging.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+REDUMP_REGIONS = {
+    "asia", "australia", "austria", "belgium", "brazil", "canada", "china", "croatia", "denmark", "europe",
+    "finland", "france", "germany", "greece", "hong kong", "india", "ireland", "israel", "italy", "japan",
+    "korea", "latin america", "mexico", "netherlands", "new zealand", "norway", "poland", "portugal", "russia",
+    "scandinavia", "south africa", "spain", "sweden", "switzerland", "taiwan", "turkey", "uk", "usa", "world",
+}
+PARENTHESES_REGEX = re.compile(r"\(([^()]*)\)")
+REVISION_REGEX = re.compile(r"^rev\s+([\w.]+)$")
+FILTER_REGEX = re.compile(r"\b(region|rev):(\"[^\"]*\"|\S+)")
+
+
+def trigrams(text):
+    """
+    Get the set of character trigrams of a string.
+
+    Args:
+        text (str): The string to split.
+
+    Returns:
+        set: The trigrams of the string.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def parse_redump_name(name):
+    """
+    Parse the regions and revision from a Redump style name.
+
+    Args:
+        name (str): The name of the game.
+
+    Returns:
+        dict: A dictionary with fields: regions (set of lowercase region names) and revision (str or None)
+    """
+    regions = set()
+    revision = None
+    for group in PARENTHESES_REGEX.findall(name.lower()):
+        parts = [part.strip() for part in group.split(",")]
+        if all(part in REDUMP_REGIONS for part in parts):
+            regions.update(parts)
+            continue
+        revision_match = REVISION_REGEX.match(group.strip())
+        if revision_match:
+            revision = revision_match.group(1)
+    return {"regions": regions, "revision": revision}
+
+
+class GameSearchIndex:
+    """
+    A trigram index over a list of game names.
+
+    The result of the previous query is kept, and a query that extends it, for example by typing
+    more characters, is answered by narrowing that result instead of searching the whole index.
+
+    Methods:
+        - search: Search the index.
+    """
+    def __init__(self, games, key=str):
+        """
+        Args:
+            games (list): The games to index.
+            key (callable, optional): Gets the name of a game, for games that are not strings.
+        """
+        self.games = list(games)
+        self._lowered = [key(game).lower() for game in self.games]
+        self._postings = {}
+        self._metadata = []
+        for index, lowered in enumerate(self._lowered):
+            for trigram in trigrams(lowered):
+                self._postings.setdefault(trigram, []).append(index)
+            self._metadata.append(parse_redump_name(lowered))
+        self._last_query = None
+        self._last_result = None
+        logger.debug("Built search index for %s games with %s trigrams", len(self.games), len(self._postings))
+
+    @staticmethod
+    def parse_query(query):
+        """
+        Split a query into its text and its filters.
+
+        Args:
+            query (str): The query, for example 'mario region:usa rev:1'.
+
+        Returns:
+            tuple: The lowercase text, the region filter (str or None) and the revision filter (str or None)
+        """
+        query = query.lower()
+        filters = {}
+        for name, value in FILTER_REGEX.findall(query):
+            filters[name] = value.strip('"')
+        text = " ".join(FILTER_REGEX.sub(" ", query).split())
+        return text, filters.get("region"), filters.get("rev")
+
+    def _matches_filters(self, index, region, revision):
+        metadata = self._metadata[index]
+        if region is not None and not any(game_region.startswith(region) for game_region in metadata["regions"]):
+            return False
+        if revision is not None and metadata["revision"] != revision:
+            return False
+        return True
+
+    def _candidates(self, text):
+        # a query that extends the previous one can only match titles that matched the previous one
+        if self._last_query is not None:
+            last_text, last_region, last_revision = self._last_query
+            if last_region is None and last_revision is None and last_text in text:
+                return self._last_result
+        query_trigrams = trigrams(text)
+        if not query_trigrams:
+            return range(len(self.games))
+        postings = []
+        for trigram in query_trigrams:
+            posting = self._postings.get(trigram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return sorted(candidates)
+
+    def _fuzzy_search(self, text, region, revision, limit):
+        # rank the titles by the number of trigrams they share with the query
+        query_trigrams = trigrams(text)
+        scores = {}
+        for trigram in query_trigrams:
+            for index in self._postings.get(trigram, []):
+                scores[index] = scores.get(index, 0) + 1
+        minimum_score = max(1, len(query_trigrams) // 2)
+        ranked = sorted(
+            (index for index, score in scores.items() if score >= minimum_score and self._matches_filters(index, region, revision)),
+            key=lambda index: (-scores[index], index),
+        )
+        return ranked[:limit]
+
+    def search(self, query, fuzzy=True, fuzzy_limit=100):
+        """
+        Search the index for games whose name contains the text of the query.
+
+        Args:
+            query (str): The text to search for, optionally with 'region:<region>' and 'rev:<revision>' filters.
+            fuzzy (bool, optional): If nothing contains the text, return the closest matches instead.
+            fuzzy_limit (int, optional): The maximum number of fuzzy matches to return.
+
+        Returns:
+            list: The matching games, in their original order, or ranked by similarity for fuzzy matches.
+        """
+        text, region, revision = self.parse_query(query)
+        result = [
+            index for index in self._candidates(text)
+            if text in self._lowered[index] and self._matches_filters(index, region, revision)
+        ]
+        self._last_query = (text, region, revision)
+        self._last_result = result
+        if not result and fuzzy and len(text) >= 3:
+            return [self.games[index] for index in self._fuzzy_search(text, region, revision, fuzzy_limit)]
+        return [self.games[index] for index in result]
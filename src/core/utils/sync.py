@@ -0,0 +1,181 @@
+"""
+Incremental synchronisation of user data directories.
+
+The files of a source directory are synced onto a target directory, replacing the target files
+that differ and keeping the target files that are not in the source, like shutil.copytree with dirs_exist_ok.
+A manifest of the size, modification time and hash of every synced file is kept, so a file whose
+size and modification time match the target is skipped without being read, and a file that was only
+touched is recognised by its hash instead of being copied again.
+
+When the source is moved rather than copied, files are renamed into place when both directories are
+on the same file system, and an empty target is replaced by the whole source directory with a single rename.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+from core.logging.logger import Logger
+from core.utils.files import copy_file
+
+logger = Logger(__name__).get_logger()
+
+MANIFEST_VERSION = 1
+
+
+def get_manifest_path(manifest_directory, target_dir):
+    """
+    Get the path of the manifest for a target directory.
+
+    Args:
+        manifest_directory (pathlib.Path): The directory that the manifests are stored in.
+        target_dir (pathlib.Path): The directory that is synced to.
+
+    Returns:
+        pathlib.Path: The path of the manifest.
+    """
+    return manifest_directory / f"{hashlib.sha1(str(target_dir.resolve()).encode()).hexdigest()}.json"
+
+
+def hash_file(path):
+    """
+    Get the SHA-1 hash of a file.
+
+    Args:
+        path (pathlib.Path): The file to hash.
+
+    Returns:
+        str: The hex digest of the file.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha1").hexdigest()
+
+
+def _load_manifest(manifest_path, target_dir):
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("target") != str(target_dir):
+        return {}
+    return manifest.get("files", {})
+
+
+def _save_manifest(manifest_path, source_dir, target_dir, files):
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = manifest_path.with_suffix(".tmp")
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "source": str(source_dir), "target": str(target_dir), "files": files}, f)
+    os.replace(temporary_path, manifest_path)
+
+
+def _scan_files(directory):
+    # os.scandir returns the stat results of the entries with the listing on Windows, so no extra calls are made
+    files = {}
+    directories = []
+    pending = [(directory, "")]
+    while pending:
+        current, relative = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                entry_relative = f"{relative}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry_relative)
+                    pending.append((entry.path, f"{entry_relative}/"))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry_relative] = (stat.st_size, stat.st_mtime_ns)
+    return files, directories
+
+
+def _is_empty_directory(path):
+    with os.scandir(path) as entries:
+        return next(entries, None) is None
+
+
+def _same_file_system(source_dir, target_dir):
+    target = target_dir if target_dir.exists() else target_dir.parent
+    try:
+        return os.stat(source_dir).st_dev == os.stat(target).st_dev
+    except OSError:
+        return False
+
+
+def sync_directories(source_dir, target_dir, manifest_path, move=False):
+    """
+    Sync the files of a source directory onto a target directory, only transferring the files that have changed.
+
+    Args:
+        source_dir (pathlib.Path): The directory to sync from.
+        target_dir (pathlib.Path): The directory to sync to. It is created if it does not exist.
+        manifest_path (pathlib.Path): The path of the manifest of the target directory.
+        move (bool, optional): Whether to remove the source directory once it has been synced.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str), transferred (int) and skipped (int)
+    """
+    if not source_dir.is_dir():
+        return {"status": False, "message": f"Path does not exist or is not a directory: {source_dir}", "transferred": 0, "skipped": 0}
+    same_file_system = _same_file_system(source_dir, target_dir)
+
+    if move and same_file_system and (not target_dir.exists() or (target_dir.is_dir() and _is_empty_directory(target_dir))):
+        logger.info("Moving %s to %s with a single rename", source_dir, target_dir)
+        if target_dir.exists():
+            target_dir.rmdir()
+        target_dir.parent.mkdir(parents=True, exist_ok=True)
+        os.rename(source_dir, target_dir)
+        manifest_path.unlink(missing_ok=True)
+        return {"status": True, "message": "Directory moved", "transferred": 0, "skipped": 0}
+
+    manifest = _load_manifest(manifest_path, target_dir)
+    source_files, source_directories = _scan_files(source_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for relative in source_directories:
+        (target_dir / relative).mkdir(parents=True, exist_ok=True)
+
+    files = {}
+    transferred = 0
+    skipped = 0
+    for relative, (size, mtime_ns) in source_files.items():
+        source_file = source_dir / relative
+        target_file = target_dir / relative
+        entry = manifest.get(relative)
+        try:
+            target_stat = target_file.stat()
+        except FileNotFoundError:
+            target_stat = None
+
+        if target_stat is not None and target_stat.st_size == size:
+            if target_stat.st_mtime_ns == mtime_ns:
+                files[relative] = entry if entry and entry["mtime_ns"] == mtime_ns and entry["size"] == size else {"size": size, "mtime_ns": mtime_ns, "hash": None}
+                skipped += 1
+                continue
+            # the sizes match but the times do not, compare the contents before copying the file again
+            target_unchanged = entry is not None and entry["size"] == size and entry["mtime_ns"] == target_stat.st_mtime_ns and entry["hash"]
+            target_hash = entry["hash"] if target_unchanged else hash_file(target_file)
+            source_hash = hash_file(source_file)
+            if source_hash == target_hash:
+                os.utime(target_file, ns=(target_stat.st_atime_ns, mtime_ns))
+                files[relative] = {"size": size, "mtime_ns": mtime_ns, "hash": source_hash}
+                skipped += 1
+                continue
+
+        if move and same_file_system:
+            os.replace(source_file, target_file)
+        else:
+            copy_file(source_file, target_file, size=size)
+        target_stat = target_file.stat()
+        files[relative] = {"size": target_stat.st_size, "mtime_ns": target_stat.st_mtime_ns, "hash": None}
+        transferred += 1
+
+    # keep the entries of the target files that are not in the source, so they are still known on the next sync
+    for relative, entry in manifest.items():
+        if relative not in files and (target_dir / relative).is_file():
+            files[relative] = entry
+    _save_manifest(manifest_path, source_dir, target_dir, files)
+
+    if move:
+        shutil.rmtree(source_dir)
+    logger.info("Synced %s to %s: %s files transferred, %s unchanged", source_dir, target_dir, transferred, skipped)
+    return {"status": True, "message": "Directories synced", "transferred": transferred, "skipped": skipped}
@@ -0,0 +1,276 @@
+"""
+Verification of ROMs against the checksums in DAT files, such as the ones published by Redump and No-Intro.
+
+The CRC32, MD5 and SHA-1 of a file are computed together in a single pass over it, and files are hashed
+in a pool of processes, so a large library is hashed by several cores at once. The checksums of every file
+are cached with its size and modification time, so a file that has not changed since it was last verified
+is not read again, and verifying against a newly imported DAT file only has to look the checksums up.
+
+DAT files are imported into a local directory and read with iterparse, so a large DAT file is never held in memory as a whole.
+Images in compressed formats, such as RVZ or WBFS, have different checksums to the dumps in a DAT file and are reported as unknown.
+"""
+import hashlib
+import os
+import shutil
+import time
+import xml.etree.ElementTree as ElementTree
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from core.config import constants
+from core.logging.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+VERIFICATION_CACHE_VERSION = 1
+DAT_EXTENSIONS = {".dat", ".xml"}
+
+
+def hash_rom(path, buffer_size=constants.App.VERIFY_BUFFER_SIZE.value):
+    """
+    Compute the CRC32, MD5 and SHA-1 of a file in a single pass.
+
+    This runs in the worker processes of the verification pool, so it must stay a module level function.
+
+    Args:
+        path (str): The path of the file.
+        buffer_size (int, optional): The size of the reads.
+
+    Returns:
+        dict: A dictionary with fields: size (int), crc (str), md5 (str) and sha1 (str)
+    """
+    crc = 0
+    md5 = hashlib.md5()
+    sha1 = hashlib.sha1()
+    size = 0
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            chunk = view[:read]
+            crc = zlib.crc32(chunk, crc)
+            md5.update(chunk)
+            sha1.update(chunk)
+            size += read
+    return {"size": size, "crc": f"{crc:08x}", "md5": md5.hexdigest(), "sha1": sha1.hexdigest()}
+
+
+def iter_dat_roms(dat_path):
+    """
+    Read the ROMs of a Logiqx XML DAT file, without loading the whole file into memory.
+
+    Args:
+        dat_path (pathlib.Path): The path of the DAT file.
+
+    Yields:
+        dict: A dictionary with fields: game (str), name (str), size (int or None), crc (str or None), md5 (str or None) and sha1 (str or None)
+    """
+    game_name = None
+    for event, element in ElementTree.iterparse(dat_path, events=("start", "end")):
+        if element.tag in ("game", "machine"):
+            if event == "start":
+                game_name = element.get("name")
+            else:
+                # the ROMs of the game have been read, so it is dropped to keep the memory use flat
+                element.clear()
+        elif element.tag == "rom" and event == "end":
+            size = element.get("size")
+            yield {
+                "game": game_name,
+                "name": element.get("name"),
+                "size": int(size) if size and size.isdigit() else None,
+                "crc": (element.get("crc") or "").lower() or None,
+                "md5": (element.get("md5") or "").lower() or None,
+                "sha1": (element.get("sha1") or "").lower() or None,
+            }
+
+
+def import_dat_file(source, dat_directory):
+    """
+    Import a DAT file into the DAT directory, replacing a DAT file with the same name.
+
+    Args:
+        source (pathlib.Path): The DAT file to import.
+        dat_directory (pathlib.Path): The directory that DAT files are imported into.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str) and roms (int)
+    """
+    source = Path(source)
+    if source.suffix.lower() not in DAT_EXTENSIONS:
+        return {"status": False, "message": f"Not a DAT file: {source}", "roms": 0}
+    try:
+        roms = sum(1 for rom in iter_dat_roms(source) if rom["sha1"] or rom["crc"])
+    except (OSError, ElementTree.ParseError) as error:
+        return {"status": False, "message": f"Could not read the DAT file: {error}", "roms": 0}
+    if roms == 0:
+        return {"status": False, "message": "The DAT file does not contain any checksums", "roms": 0}
+    dat_directory.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, dat_directory / source.name)
+    logger.info("Imported the DAT file %s with %s ROMs", source.name, roms)
+    return {"status": True, "message": f"Imported {roms} ROMs from {source.name}", "roms": roms}
+
+
+class DatIndex:
+    """
+    The checksums of the ROMs in every DAT file in a directory.
+
+    Methods:
+        - load: Read the DAT files in the directory.
+        - match: Find the ROM that a file matches.
+    """
+    def __init__(self, dat_directory):
+        self.dat_directory = Path(dat_directory)
+        self.dat_files = []
+        self._by_sha1 = {}
+        self._by_md5 = {}
+        self._by_crc = {}
+        self._by_name = {}
+
+    def load(self):
+        """
+        Read the DAT files in the directory.
+
+        Returns:
+            int: The number of ROMs that were read.
+        """
+        self.dat_files = []
+        self._by_sha1, self._by_md5, self._by_crc, self._by_name = {}, {}, {}, {}
+        if not self.dat_directory.is_dir():
+            return 0
+        roms = 0
+        for dat_path in sorted(self.dat_directory.iterdir()):
+            if dat_path.suffix.lower() not in DAT_EXTENSIONS:
+                continue
+            try:
+                for rom in iter_dat_roms(dat_path):
+                    rom["dat"] = dat_path.stem
+                    if rom["sha1"]:
+                        self._by_sha1[rom["sha1"]] = rom
+                    if rom["md5"]:
+                        self._by_md5[rom["md5"]] = rom
+                    if rom["crc"]:
+                        self._by_crc[(rom["crc"], rom["size"])] = rom
+                    if rom["name"]:
+                        self._by_name[rom["name"].lower()] = rom
+                    roms += 1
+            except ElementTree.ParseError as error:
+                logger.error("Could not read the DAT file %s: %s", dat_path, error)
+                continue
+            self.dat_files.append(dat_path.name)
+        logger.info("Loaded %s ROMs from %s DAT files", roms, len(self.dat_files))
+        return roms
+
+    def match(self, name, checksums):
+        """
+        Find the ROM that a file matches.
+
+        The strongest checksum in the DAT file is preferred. A file that matches nothing, but has the name
+        of a ROM in a DAT file, is reported as a mismatch, as it is most likely a bad or incomplete dump.
+
+        Args:
+            name (str): The file name of the file.
+            checksums (dict): The checksums of the file, as returned by hash_rom.
+
+        Returns:
+            dict: A dictionary with fields: status ("verified", "mismatch" or "unknown"), game (str or None) and dat (str or None)
+        """
+        rom = (
+            self._by_sha1.get(checksums["sha1"])
+            or self._by_md5.get(checksums["md5"])
+            or self._by_crc.get((checksums["crc"], checksums["size"]))
+        )
+        if rom is not None:
+            return {"status": "verified", "game": rom["game"], "dat": rom["dat"]}
+        rom = self._by_name.get(name.lower())
+        if rom is not None:
+            return {"status": "mismatch", "game": rom["game"], "dat": rom["dat"]}
+        return {"status": "unknown", "game": None, "dat": None}
+
+
+def _get_cache_key(directory):
+    return "rom_verification_" + hashlib.sha1(str(Path(directory).resolve()).encode()).hexdigest()
+
+
+def verify_library(directory, games, dat_index, cache=None, on_progress=None, should_cancel=None, max_workers=constants.App.VERIFY_WORKERS.value):
+    """
+    Verify the games in a directory against the checksums in the DAT files.
+
+    Only the games whose size or modification time has changed since they were last hashed are read,
+    largest first, in a pool of processes.
+
+    Args:
+        directory (pathlib.Path): The game directory.
+        games (list): The paths of the games relative to the directory.
+        dat_index (DatIndex): The loaded DAT files.
+        cache (Cache, optional): The cache that the checksums are kept in.
+        on_progress (callable, optional): Called with the number of bytes hashed so far and the total number of bytes to hash.
+        should_cancel (callable, optional): Returns True if the verification should stop.
+        max_workers (int, optional): The number of processes that hash files.
+
+    Returns:
+        dict: A dictionary with fields: status (bool), message (str), results (list of dictionaries with fields: game, status, dat_game and dat),
+              hashed (int) and cancelled (bool)
+    """
+    directory = Path(directory)
+    cache_key = _get_cache_key(directory)
+    cached = {}
+    if cache is not None:
+        cache_result = cache.get_json(cache_key)
+        if cache_result["status"] and cache_result["data"].get("version") == VERIFICATION_CACHE_VERSION:
+            cached = cache_result["data"]["files"]
+
+    checksums = {}
+    pending = []
+    for game in games:
+        try:
+            stat = os.stat(directory / game)
+        except FileNotFoundError:
+            continue
+        entry = cached.get(game)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            checksums[game] = entry
+        else:
+            pending.append((game, stat.st_size, stat.st_mtime_ns))
+
+    cancelled = False
+    if pending:
+        pending.sort(key=lambda item: item[1], reverse=True)
+        total_bytes = sum(size for _, size, _ in pending)
+        hashed_bytes = 0
+        logger.info("Hashing %s games (%s bytes) in %s", len(pending), total_bytes, directory)
+        start_time = time.perf_counter()
+        executor = ProcessPoolExecutor(max_workers=max(1, min(max_workers, len(pending))))
+        try:
+            futures = {executor.submit(hash_rom, str(directory / game)): (game, size, mtime_ns) for game, size, mtime_ns in pending}
+            for future in as_completed(futures):
+                game, size, mtime_ns = futures[future]
+                try:
+                    checksums[game] = {**future.result(), "mtime_ns": mtime_ns}
+                except OSError as error:
+                    logger.error("Could not hash %s: %s", game, error)
+                hashed_bytes += size
+                if on_progress is not None:
+                    on_progress(hashed_bytes, total_bytes)
+                if should_cancel is not None and should_cancel():
+                    cancelled = True
+                    break
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("Hashed %s bytes in %.2f seconds", hashed_bytes, time.perf_counter() - start_time)
+
+    if cache is not None:
+        cache.add_json(cache_key, {"version": VERIFICATION_CACHE_VERSION, "files": checksums})
+
+    results = []
+    for game in games:
+        if game not in checksums:
+            continue
+        match = dat_index.match(game.rpartition("/")[2], checksums[game])
+        results.append({"game": game, "status": match["status"], "dat_game": match["game"], "dat": match["dat"]})
+    message = "Verification cancelled" if cancelled else "Library verified"
+    return {"status": True, "message": message, "results": results, "hashed": len(pending), "cancelled": cancelled}
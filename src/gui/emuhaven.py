@@ -15,9 +15,9 @@ from core.config.cache import Cache
 from core.config.paths import Paths
 from core.config.settings import Settings
 from core.logging.logger import Logger
-from gui.handlers.thread_event_manager import ThreadEventManager
+from gui.handlers.thread_event_manager import EventPriority, ThreadEventManager
 from core.network.github import get_latest_release_with_asset
-from core.network import web
+from core.network import async_web, myrient, web
 from core.config.versions import Versions
 from gui.frames.dolphin.dolphin_frame import DolphinFrame
 from gui.frames.ryujinx.ryujinx_frame import RyujinxFrame
@@ -40,11 +40,44 @@ class EmuHaven(customtkinter.CTk):
         self.select_frame_by_name(opening_menu)
         self.protocol("WM_DELETE_WINDOW", self.close_app)
         self.iconbitmap(self.assets.emuhaven_logo_path)
-        self.after(200, self.check_currentdir_permissions)
-        self.after(400, self.check_for_updates)
-        self.after(600, self.show_announcements)
+        self.run_startup_tasks()
+
+    def run_startup_tasks(self):
+        # the startup checks run concurrently in worker threads and only their results are shown on the main thread
+        # they are daemon events so that they never prevent the application from closing
+        self.event_manager.add_event(
+            event_id="startup_check_currentdir_permissions",
+            func=self.check_currentdir_permissions,
+            daemon=True,
+            priority=EventPriority.CRITICAL,
+        )
+        self.event_manager.add_event(
+            event_id="startup_check_for_updates",
+            func=self.check_for_updates,
+            completion_funcs_with_result=[self.prompt_update],
+            daemon=True,
+            priority=EventPriority.CRITICAL,
+        )
+        self.event_manager.add_event(
+            event_id="startup_show_announcements",
+            func=self.fetch_announcements,
+            completion_funcs_with_result=[self.show_announcements],
+            daemon=True,
+            priority=EventPriority.CRITICAL,
+        )
+        self.event_manager.add_event(
+            event_id="startup_refresh_myrient_catalogs",
+            func=self.refresh_myrient_catalogs,
+            daemon=True,
+            priority=EventPriority.BACKGROUND,
+        )
 
-    def show_announcements(self):
+    def refresh_myrient_catalogs(self):
+        # the listings of every console are kept in the catalog, so a search across consoles covers all of them
+        myrient.refresh_all_catalogs()
+        return {}
+
+    def fetch_announcements(self):
         announcements_url = constants.GitHub.RAW_URL.value.format(
             owner=constants.App.GH_OWNER.value,
             repo=constants.App.GH_REPO.value,
@@ -54,20 +87,23 @@ class EmuHaven(customtkinter.CTk):
         response = web.get(announcements_url)
         if not response["status"]:
             self.logger.error(f"Failed to get announcements: {response['message']}")
-            return 
+            return {"result": ({},)}
         try:
             announcements = response["response"].json()
         except Exception as error:
             self.logger.error(f"Failed to parse announcements:\n {response["response"].text}\n{error}")
-            return
+            return {"result": ({},)}
+        return {"result": (announcements or {},)}
+
+    def show_announcements(self, announcements):
         if not announcements:
-            return 
+            return
         for announcement_id, announcement in announcements.items():
             if announcement_id not in self.settings.announcements_read:
                 messagebox.showinfo(self, announcement["title"], announcement["message"])
                 self.settings.announcements_read.append(announcement_id)
         self.settings.save()
-        
+
     def check_currentdir_permissions(self):
         self.logger.info("Checking current directory permissions")
         try:
@@ -77,15 +113,24 @@ class EmuHaven(customtkinter.CTk):
             test.unlink(missing_ok=True)
             self.logger.info("Current directory is writable")
         except PermissionError:
-            messagebox.showerror(self, "Warning", "You do not have permission to write to the current directory. Please run the application as an administrator or move the application to a directory where you have write permissions.")
-            self.destroy()
+            return {
+                "message": {
+                    "function": self.show_permission_error,
+                    "arguments": (),
+                }
+            }
+        return {}
+
+    def show_permission_error(self):
+        messagebox.showerror(self, "Warning", "You do not have permission to write to the current directory. Please run the application as an administrator or move the application to a directory where you have write permissions.")
+        self.destroy()
 
     def check_for_updates(self):
         # check if application is in executable mode or not
         if getattr(sys, "frozen", False) is False:
-            return
+            return {"result": (None,)}
         if self.settings.auto_app_updates is False:
-            return
+            return {"result": (None,)}
         latest_release = get_latest_release_with_asset(
             repo_owner=constants.App.GH_OWNER.value,
             repo_name=constants.App.GH_REPO.value,
@@ -95,15 +140,24 @@ class EmuHaven(customtkinter.CTk):
 
         if not latest_release["status"]:
             self.logger.error(f"Failed to get the latest release: {latest_release["message"]}")
-            messagebox.showerror(self, "Error", f"Failed to get the latest release: {latest_release["message"]}")
-            return
+            return {
+                "result": (None,),
+                "message": {
+                    "function": messagebox.showerror,
+                    "arguments": (self, "Error", f"Failed to get the latest release: {latest_release["message"]}"),
+                }
+            }
 
         current_version = self.version
         latest_version = version.parse(latest_release["release"]["version"])
         if current_version >= latest_version:
             self.logger.info(f"Current version {current_version} is greater than the latest version {latest_version}")
-            return
+            return {"result": (None,)}
+        return {"result": (latest_version,)}
 
+    def prompt_update(self, latest_version):
+        if latest_version is None:
+            return
         if messagebox.askyesno(self, "Update Available", f"An update is available. Would you like to download the latest version ({latest_version})?", icon="info") == "yes":
             webbrowser.open(f"https://github.com/{constants.App.GH_OWNER.value}/{constants.App.GH_REPO.value}/releases/tag/v{latest_version}")
 
@@ -269,7 +323,7 @@ class EmuHaven(customtkinter.CTk):
         self.settings_frame.revert_settings()
 
     def close_app(self):
-        ongoing_events = [event["id"] for event in self.event_manager.events]
+        ongoing_events = self.event_manager.get_blocking_events()
         if ongoing_events:
             messagebox.showwarning(self, "Warning", f"There are ongoing events. Please wait for them to finish before closing the application.\n\nOngoing events: {', '.join(ongoing_events)}")
             return
@@ -279,4 +333,7 @@ class EmuHaven(customtkinter.CTk):
                 shutil.rmtree(temp_folder)
             except PermissionError:
                 pass
+        web.close_sessions()
+        async_web.close()
+        self.cache.close()
         self.destroy()
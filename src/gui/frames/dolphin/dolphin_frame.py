@@ -6,7 +6,7 @@ from core.emulators.dolphin.runner import Dolphin
 from gui.frames.dolphin.dolphin_games_frame import DolphinROMFrame
 from gui.frames.emulator_frame import EmulatorFrame
 from gui.handlers.progress.progress_handler import ProgressHandler
-from gui.handlers.thread_event_manager import ThreadEventManager
+from gui.handlers.thread_event_manager import EventPriority, ThreadEventManager
 from gui.libs.CTkMessagebox import messagebox
 from gui.windows.folder_selector import FolderSelector
 from gui.windows.path_dialog import PathDialog
@@ -104,7 +104,7 @@ class DolphinFrame(EmulatorFrame):
         self.dolphin_data_log.grid_rowconfigure(1, weight=1)
         self.data_progress_handler = ProgressHandler(self.dolphin_data_log)
 
-        self.manage_games_frame = DolphinROMFrame(self, self.settings, self.cache, event_manager=self.event_manager)
+        self.manage_games_frame = DolphinROMFrame(self, self.settings, self.cache, event_manager=self.event_manager, paths=self.paths)
         self.manage_games_frame.grid(row=0, column=0, padx=20, pady=20, sticky="nsew")
 
     def switch_channel(self, *args):
@@ -199,7 +199,8 @@ class DolphinFrame(EmulatorFrame):
             self.install_dolphin_handler,
             kwargs={"archive_path": path_to_archive},
             completion_functions=[lambda: self.configure_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while installing Dolphin.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while installing Dolphin.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
             )
 
     def install_dolphin_handler(self, archive_path=None, update_mode=False):
@@ -223,8 +224,15 @@ class DolphinFrame(EmulatorFrame):
                     }
                 self.configure_buttons(launch_dolphin_button_text="Updating...")
 
-            self.main_progress_frame.start_operation(title="Install Dolphin", total_units=0, units=" MiB", status="Downloading...")
+            self.main_progress_frame.start_operation(title="Install Dolphin", total_units=0, units=" MiB", status="Downloading...", pausable=True)
             download_result = self.dolphin.download_release(release_fetch_result["release"], progress_handler=self.main_progress_frame)
+            if download_result.get("paused"):
+                return {
+                    "message": {
+                        "function": messagebox.showinfo,
+                        "arguments": (self.winfo_toplevel(), "Dolphin", "The download was paused. It will resume the next time you install Dolphin."),
+                    }
+                }
             if not download_result["status"]:
                 if "cancelled" in download_result["message"]:
                     return {
@@ -242,7 +250,7 @@ class DolphinFrame(EmulatorFrame):
 
             archive_path = download_result["download_path"]
 
-        self.main_progress_frame.start_operation(title="Install Dolphin", total_units=1, units=" Files", status="Extracting...")
+        self.main_progress_frame.start_operation(title="Install Dolphin", total_units=1, units=" MiB", status="Extracting...")
         self.main_progress_frame.set_cancel_button_state(state="disabled")
         extract_result = self.dolphin.extract_release(archive_path, progress_handler=self.main_progress_frame)
         if not extract_result["status"]:
@@ -336,14 +344,15 @@ class DolphinFrame(EmulatorFrame):
             func=self.import_data_handler,
             kwargs={"import_directory": directory, "folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Dolphin data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Dolphin data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def import_data_handler(self, import_directory, folders):
         self.data_progress_handler.start_operation(
             title="Import Dolphin Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Importing..."
         )
         import_result = self.dolphin.import_dolphin_data(
@@ -389,14 +398,15 @@ class DolphinFrame(EmulatorFrame):
             func=self.export_data_handler,
             kwargs={"export_directory": export_directory, "folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Dolphin data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Dolphin data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def export_data_handler(self, export_directory, folders):
         self.data_progress_handler.start_operation(
             title="Export Dolphin Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Exporting..."
         )
         export_result = self.dolphin.export_dolphin_data(
@@ -434,7 +444,8 @@ class DolphinFrame(EmulatorFrame):
             func=self.delete_data_handler,
             kwargs={"folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Dolphin data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Dolphin data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def delete_data_handler(self, folders):
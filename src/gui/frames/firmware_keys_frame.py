@@ -1,6 +1,7 @@
 import customtkinter
 
-from gui.handlers.thread_event_manager import ThreadEventManager
+from core.config import constants
+from gui.handlers.thread_event_manager import EventPriority
 from gui.libs.CTkMessagebox import messagebox
 from gui.libs.CTkScrollableDropdown import CTkScrollableDropdown
 from gui.windows.path_dialog import PathDialog
@@ -11,7 +12,6 @@ class FirmwareKeysFrame(customtkinter.CTkFrame):
         super().__init__(master)
         self.frame_obj = frame_obj
         self.event_manager = frame_obj.event_manager
-        self.event_manager = ThreadEventManager(self)
         self.cache = frame_obj.cache
         self.settings = frame_obj.settings
         self.versions = frame_obj.versions
@@ -90,7 +90,8 @@ class FirmwareKeysFrame(customtkinter.CTkFrame):
             func=self.install_firmware_handler,
             kwargs=kwargs,
             completion_functions=[lambda: self.frame_obj.configure_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Firmware Installation", "An unexpected error occured while installing the firmware. Check the logs for more details and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Firmware Installation", "An unexpected error occured while installing the firmware. Check the logs for more details and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def install_firmware_handler(self, firmware_archive=None, firmware_release=None):
@@ -123,7 +124,7 @@ class FirmwareKeysFrame(customtkinter.CTkFrame):
                     "arguments": (self.winfo_toplevel(), "Firmware Installation", "The firmware archive is invalid or corrupt"),
                 }
             }
-        self.frame_obj.main_progress_frame.start_operation("Install Firmware", total_units=0, units=" Files", status="Extracting...")
+        self.frame_obj.main_progress_frame.start_operation("Install Firmware", total_units=0, units=" MiB", status="Extracting...")
         install_result = self.emulator_obj.install_firmware_from_archive(firmware_archive, progress_handler=self.frame_obj.main_progress_frame)
         if not install_result["status"]:
             if "cancelled" in install_result["message"]:
@@ -181,7 +182,8 @@ class FirmwareKeysFrame(customtkinter.CTkFrame):
             func=self.install_keys_handler,
             kwargs=kwargs,
             completion_functions=[lambda: self.frame_obj.configure_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Key Installation", "An unexpected error occured while installing the keys. Check the logs for more details and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Key Installation", "An unexpected error occured while installing the keys. Check the logs for more details and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def install_keys_handler(self, keys_file=None, keys_release=None):
@@ -294,7 +296,7 @@ class FirmwareKeysFrame(customtkinter.CTkFrame):
             }
 
         # save to cache
-        self.cache.add_json("firmware_keys", firmware_keys_fetch_result["firmware_keys"], ttl=604800)
+        self.cache.add_json("firmware_keys", firmware_keys_fetch_result["firmware_keys"], ttl=constants.Switch.FIRMWARE_KEYS_TTL.value)
 
         # return result
         return {
@@ -2,11 +2,20 @@ import customtkinter
 
 from core.config import constants
 from core.logging.logger import Logger
-from gui.handlers.thread_event_manager import ThreadEventManager
+from core.utils.search import GameSearchIndex
+from gui.handlers.thread_event_manager import EventPriority, ThreadEventManager
 from gui.libs.CTkMessagebox import messagebox
 
 
 class GameListFrame(customtkinter.CTkFrame):
+    """
+    A paginated list of games.
+
+    The rows of the list are recycled: a row is created with create_row the first time it is needed,
+    and on every page change the existing rows are bound to the new games with bind_row. At most one page
+    of rows is ever created, however many games there are and however often the page changes.
+    Subclasses implement create_row and bind_row to build and fill their own rows.
+    """
     def __init__(self, master, event_manager: ThreadEventManager):
         super().__init__(master, height=700)
         self.logger = Logger(__name__).get_logger()
@@ -16,6 +25,8 @@ class GameListFrame(customtkinter.CTkFrame):
         self.current_page = 1
         self.game_list = []
         self.searched_games = []
+        self.search_index = None
+        self.row_pool = []
         self.build_frame()
 
     def configure_widgets(self, fetch_button_text="Get Games", state="disabled"):
@@ -29,13 +40,15 @@ class GameListFrame(customtkinter.CTkFrame):
     def get_game_list_button_event(self, *args, ignore_messages=True):
         self.configure_widgets(fetch_button_text="Fetching...")
         self.event_manager.add_event(
-            event_id="get_games",
-            func=self.get_game_list,
+            event_id=f"get_games_{self}",
+            func=self.get_game_list_with_index,
             kwargs={},
             completion_functions=[lambda: self.configure_widgets(state="normal")],
             completion_funcs_with_result=[self.process_game_list],
             error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "Failed to fetch games.")],
-            ignore_messages=ignore_messages
+            ignore_messages=ignore_messages,
+            priority=EventPriority.CRITICAL,
+            coalesce=True,
         )
 
     def get_game_list(self):
@@ -47,10 +60,28 @@ class GameListFrame(customtkinter.CTkFrame):
             }
         }
 
-    def process_game_list(self, game_list):
+    def get_game_list_with_index(self):
+        """
+        Get the game list and build its search index in the worker thread, so that it is not built on the Tk thread.
+        """
+        output = self.get_game_list()
+        if isinstance(output, dict) and isinstance(output.get("result"), tuple) and output["result"]:
+            game_list = output["result"][0]
+            output["result"] = (game_list, GameSearchIndex(game_list, key=self.get_game_name))
+        return output
+
+    def get_game_name(self, game):
+        """
+        Get the name of a game, which is what the search matches against.
+        Subclasses whose games are not strings override this.
+        """
+        return str(game)
+
+    def process_game_list(self, game_list, search_index=None):
         self.logger.debug(f"Processing received game list of length {len(game_list)}")
         self.game_list = game_list
         self.searched_games = game_list
+        self.search_index = search_index
         self.total_pages = (len(game_list) + constants.App.RESULTS_PER_GAME_PAGE.value - 1) // constants.App.RESULTS_PER_GAME_PAGE.value
         self.total_pages_label.configure(text=f"/ {self.total_pages}")
         self.update_results()
@@ -66,7 +97,7 @@ class GameListFrame(customtkinter.CTkFrame):
         search_frame = customtkinter.CTkFrame(self, corner_radius=50)
         search_frame.grid(row=0, column=0, pady=(10, 0), padx=10, sticky="ne")
 
-        self.search_entry = customtkinter.CTkEntry(search_frame, state="disabled", placeholder_text="Search")
+        self.search_entry = customtkinter.CTkEntry(search_frame, state="disabled", placeholder_text="Search (region: rev:)")
         self.search_entry.grid(row=0, column=0, padx=10, pady=10, sticky="e")
         self.search_entry.bind("<Return>", self.perform_search)
         self.search_button = customtkinter.CTkButton(search_frame, state="disabled", text="Go", width=60, command=self.perform_search)
@@ -138,18 +169,20 @@ class GameListFrame(customtkinter.CTkFrame):
             return
         self.update_in_progress = True
         start_index = (self.current_page - 1) * constants.App.RESULTS_PER_GAME_PAGE.value
-        end_index = (start_index + constants.App.RESULTS_PER_GAME_PAGE.value) - 1
-        for widget in self.result_frame.winfo_children():
-            widget.grid_forget()
-
-        row_counter = 0
-        for i, game in enumerate(self.searched_games):
-            if i > end_index:
-                break
-            if i < start_index:
+        page_games = self.searched_games[start_index:start_index + constants.App.RESULTS_PER_GAME_PAGE.value]
+
+        row_index = 0
+        for game in page_games:
+            if row_index == len(self.row_pool):
+                self.row_pool.append(self.create_row())
+            row = self.row_pool[row_index]
+            if not self.bind_row(row, game):
                 continue
-            self.add_game_to_frame(game, row_counter)
-            row_counter += 2
+            row["frame"].grid(row=row_index, column=0, padx=10, pady=5, sticky="ew")
+            row_index += 1
+        # rows that are not needed on this page are hidden and kept for later pages
+        for row in self.row_pool[row_index:]:
+            row["frame"].grid_remove()
 
         self.current_page_entry.configure(state="normal")
         self.current_page_entry.delete(0, customtkinter.END)
@@ -158,18 +191,48 @@ class GameListFrame(customtkinter.CTkFrame):
         self.prev_button.configure(state="normal")
         self.update_in_progress = False
 
-    def add_game_to_frame(self, game, row_counter):
-        customtkinter.CTkLabel(self.result_frame, text=game).grid(row=row_counter, column=0, padx=5, pady=5, sticky="ew")
+    def create_row(self):
+        """
+        Create the widgets for a row of the list.
+
+        Returns:
+            dict: The widgets of the row. The frame that contains them must be stored under "frame".
+        """
+        frame = customtkinter.CTkFrame(self.result_frame, fg_color="transparent")
+        frame.grid_columnconfigure(0, weight=1)
+        label = customtkinter.CTkLabel(frame)
+        label.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        return {"frame": frame, "label": label}
+
+    def bind_row(self, row, game):
+        """
+        Show a game in an existing row.
+
+        Args:
+            row (dict): The row created by create_row.
+            game: The game to show.
+
+        Returns:
+            bool: Whether the row should be shown. If False, the row is reused for the next game.
+        """
+        row["label"].configure(text=game)
+        return True
 
     def perform_search(self, *args):
-        query = self.search_entry.get()
+        query = self.search_entry.get().strip()
         if query == "":
             self.searched_games = self.game_list
         else:
-            self.searched_games = []
-            for game in self.game_list:
-                if query.lower() in game.lower():
-                    self.searched_games.append(game)
+            # the index is rebuilt if the game list has changed since it was built
+            if self.search_index is None:
+                self.search_index = GameSearchIndex(self.game_list, key=self.get_game_name)
+            self.searched_games = self.search_index.search(query)
+        self.show_searched_games()
+
+    def show_searched_games(self):
+        """
+        Show the first page of the searched games.
+        """
         self.total_pages = (len(self.searched_games) + constants.App.RESULTS_PER_GAME_PAGE.value - 1) // constants.App.RESULTS_PER_GAME_PAGE.value
         self.total_pages_label.configure(text=f"/ {self.total_pages}")
         self.current_page = 1
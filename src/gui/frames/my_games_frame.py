@@ -1,34 +1,78 @@
+from pathlib import Path
+from tkinter import filedialog
+
 import customtkinter
 
+from core.utils.library import RomLibraryIndex
+from core.utils.verify import DatIndex, import_dat_file, verify_library
 from gui.frames.game_list_frame import GameListFrame
+from gui.handlers.progress.progress_handler import ProgressHandler
+from gui.handlers.thread_event_manager import EventPriority
 from gui.libs.CTkMessagebox import messagebox
 
 
 class MyGamesFrame(GameListFrame):
-    def __init__(self, master, event_manager, emulator_settings_object, game_extensions, scan_subdirectories=False):
+    def __init__(self, master, event_manager, emulator_settings_object, game_extensions, scan_subdirectories=False, cache=None, dat_directory=None):
         self.scan_subdirectories = scan_subdirectories
         self.total_pages = None
         self.emulator_settings = emulator_settings_object
         self.game_extensions = game_extensions
+        self.cache = cache
+        self.library = None
+        self.dat_directory = dat_directory
+        self.verification_results = {}
         self.update_in_progress = False
         super().__init__(master=master, event_manager=event_manager)
+        self.progress_handler = ProgressHandler(self.winfo_toplevel(), widget="window")
 
-    def get_game_list(self):
-        games = []
-        if not (self.emulator_settings.game_directory.exists() and self.emulator_settings.game_directory.is_dir()):
-            return []
-        if self.scan_subdirectories:
-            return self.get_current_roms_from_subdirectories()
-        for file in self.emulator_settings.game_directory .iterdir():
-            if file.is_file() and file.suffix in self.game_extensions:
-                # Create a ROMFile object and append it to the roms list
-                games.append(file.name)
+    def build_frame(self):
+        super().build_frame()
+        if self.dat_directory is None:
+            return
+        self.verify_button = customtkinter.CTkButton(self.refresh_frame, text="Verify", width=100, corner_radius=50, command=self.verify_library_button_event)
+        self.verify_button.grid(row=0, column=1, padx=5, pady=5)
+        self.import_dat_button = customtkinter.CTkButton(self.refresh_frame, text="Import DAT", width=100, corner_radius=50, command=self.import_dat_button_event)
+        self.import_dat_button.grid(row=0, column=2, padx=5, pady=5)
 
+    def get_game_list(self):
+        game_directory = self.emulator_settings.game_directory
+        if not (game_directory.exists() and game_directory.is_dir()):
+            return {
+                "result": ([],),
+            }
+        # the index is kept between refreshes, so only the directories that have changed are listed again
+        if self.library is None or self.library.directory != game_directory:
+            self.library = RomLibraryIndex(game_directory, self.game_extensions, recursive=self.scan_subdirectories, cache=self.cache)
+        refresh_result = self.library.refresh()
+        if not refresh_result["status"]:
+            self.logger.error(refresh_result["message"])
+            return {
+                "result": ([],),
+            }
         return {
-            "result": (games,),
+            "result": (self.library.get_games(),),
         }
 
-    def add_game_to_frame(self, game, row_counter):
+    def create_row(self):
+        game_frame = customtkinter.CTkFrame(self.result_frame, corner_radius=7, border_width=1, fg_color="transparent", height=200)
+        game_frame.grid_columnconfigure(0, weight=1)
+        row = {"frame": game_frame, "game": None}
+
+        row["label"] = customtkinter.CTkLabel(game_frame, font=("Arial", 15), anchor="w")
+        row["label"].grid(row=0, column=0, sticky="nsew", padx=5, pady=10)
+
+        row["size_label"] = customtkinter.CTkLabel(game_frame, font=("Arial", 12), anchor="w")
+        row["size_label"].grid(row=0, column=1, sticky="nsew", padx=5, pady=10)
+
+        # the command reads the game from the row, as the row is reused for other games
+        row["status_label"] = customtkinter.CTkLabel(game_frame, font=("Arial", 12), anchor="w")
+        row["status_label"].grid(row=0, column=2, sticky="nsew", padx=5, pady=10)
+
+        delete_button = customtkinter.CTkButton(game_frame, text="Delete", width=100, command=lambda: self.delete_game(row["game"]))
+        delete_button.grid(row=0, column=3, padx=5, pady=2)
+        return row
+
+    def bind_row(self, row, game):
         def convert_bytes_to_suitable_unit(bytes):
             if bytes < 1024:
                 return f"{bytes} B"
@@ -41,31 +85,86 @@ class MyGamesFrame(GameListFrame):
             else:
                 return f"{bytes / 1024 / 1024 / 1024 / 1024:.2f} TB"
 
-        game_frame = customtkinter.CTkFrame(self.result_frame, corner_radius=7, border_width=1, fg_color="transparent", height=200)
-        game_frame.grid(row=row_counter, column=0, sticky="ew", pady=10, padx=10)
-        game_frame.grid_columnconfigure(0, weight=1)
-
-        game_label = customtkinter.CTkLabel(game_frame, text=game, font=("Arial", 15), anchor="w")
-        game_label.grid(row=0, column=0, sticky="nsew", padx=5, pady=10)
-
-        game_size = (self.emulator_settings.game_directory / game).stat().st_size
-        game_size_label = customtkinter.CTkLabel(game_frame, text=convert_bytes_to_suitable_unit(game_size), font=("Arial", 12), anchor="w")
-        game_size_label.grid(row=0, column=1, sticky="nsew", padx=5, pady=10)
+        row["game"] = game
+        row["label"].configure(text=game)
+        # the size comes from the library index, so no file is read on the Tk thread
+        game_size = self.library.get_size(game) if self.library is not None else None
+        row["size_label"].configure(text=convert_bytes_to_suitable_unit(game_size) if game_size is not None else "")
+        row["status_label"].configure(text=self.verification_results.get(game, "").capitalize())
+        return True
 
-        delete_button = customtkinter.CTkButton(game_frame, text="Delete", width=100, command=lambda: self.delete_game(game))
-        delete_button.grid(row=0, column=2, padx=5, pady=2)
+    def import_dat_button_event(self):
+        dat_path = filedialog.askopenfilename(title="Select a DAT file", filetypes=[("DAT files", "*.dat *.xml")])
+        if not dat_path:
+            return
+        import_result = import_dat_file(Path(dat_path), self.dat_directory)
+        if not import_result["status"]:
+            messagebox.showerror(self.winfo_toplevel(), "Import DAT", import_result["message"])
+            return
+        messagebox.showsuccess(self.winfo_toplevel(), "Import DAT", import_result["message"])
 
-    def get_current_roms_from_subdirectories(self):
-        games = []
+    def verify_library_button_event(self):
+        self.verify_button.configure(state="disabled", text="Verifying...")
+        self.event_manager.add_event(
+            event_id=f"verify_games_{self}",
+            func=self.verify_library,
+            # Tk may only be used on its own thread, so the toplevel is looked up before the event is scheduled
+            kwargs={"toplevel": self.winfo_toplevel()},
+            completion_functions=[lambda: self.verify_button.configure(state="normal", text="Verify")],
+            completion_funcs_with_result=[self.show_verification_results],
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Verify Library", "An unexpected error occurred while verifying the library")],
+            priority=EventPriority.BACKGROUND,
+            deduplicate=True,
+        )
 
-        for _, _, files in self.emulator_settings.game_directory.walk():
-            for file in files:
-                if file.suffix in self.game_extensions and file.is_file():
-                    games.append(file.name)
+    def verify_library(self, toplevel):
+        dat_index = DatIndex(self.dat_directory)
+        if dat_index.load() == 0:
+            return {
+                "message": {
+                    "function": messagebox.showerror,
+                    "arguments": (toplevel, "Verify Library", "No DAT files have been imported. Import a Redump or No-Intro DAT file to verify your games against."),
+                }
+            }
+        games = self.get_game_list()["result"][0]
+        self.progress_handler.start_operation("Verifying Library", total_units=0, units=" MiB", status="Hashing...")
+        verify_result = verify_library(
+            self.emulator_settings.game_directory,
+            games,
+            dat_index,
+            cache=self.cache,
+            on_progress=lambda hashed_bytes, total_bytes: self.report_verification_progress(hashed_bytes, total_bytes),
+            should_cancel=self.progress_handler.should_cancel,
+        )
+        self.progress_handler.report_success()
+        verification_results = {result["game"]: result["status"] for result in verify_result["results"]}
+        if verify_result["cancelled"]:
+            return {"result": (verification_results, )}
+        counts = {status: 0 for status in ("verified", "mismatch", "unknown")}
+        for result in verify_result["results"]:
+            counts[result["status"]] += 1
+        mismatched = [result["game"] for result in verify_result["results"] if result["status"] == "mismatch"]
+        text = f"Verified: {counts['verified']}\nMismatched: {counts['mismatch']}\nUnknown: {counts['unknown']}"
+        if mismatched:
+            text += "\n\nThe following games do not match their DAT entry and may be bad or incomplete dumps:\n\n" + "\n".join(mismatched[:20])
         return {
-            "result": games,
+            "message": {
+                "function": messagebox.showinfo if mismatched else messagebox.showsuccess,
+                "arguments": (toplevel, "Verify Library", text),
+            },
+            "result": (verification_results, ),
         }
 
+    def show_verification_results(self, verification_results):
+        self.verification_results = verification_results
+        self.update_results()
+
+    def report_verification_progress(self, hashed_bytes, total_bytes):
+        # the total is only known once the unchanged games have been skipped
+        if not self.progress_handler.is_total_units_set():
+            self.progress_handler.set_total_units(total_bytes / 1024 / 1024)
+        self.progress_handler.report_progress(hashed_bytes / 1024 / 1024)
+
     def delete_game(self, game):
         game_path = self.emulator_settings.game_directory / game
         if not game_path.exists():
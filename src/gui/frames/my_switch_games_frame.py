@@ -1,10 +1,15 @@
+import asyncio
+import threading
 from pathlib import Path
 
 import customtkinter
 
-from core.network.web import download_file
+from core.config import constants
+from core.emulators.titledb import TitleDBIndex, normalize_title_id
+from core.network import async_web
 from gui.frames.game_list_frame import GameListFrame
 from gui.handlers.progress.progress_handler import ProgressHandler
+from gui.handlers.thread_event_manager import EventPriority
 from gui.libs.CTkMessagebox import messagebox
 from gui.windows.saves_browser import SavesBrowser
 
@@ -16,8 +21,10 @@ class MySwitchGamesFrame(GameListFrame):
         self.emulator_name = emulator_name
         self.event_manager = event_manager
         self.fetching_titledb = False
-        self.titledb = {}
+        self.titledb = None
+        self.titledb_lock = threading.Lock()
         self.game_id_name_map = {}
+        self.icon_buttons = {}
         self.emulator_object = emulator_object
         super().__init__(master, event_manager)
         self.progress_handler = ProgressHandler(self.winfo_toplevel(), widget="window")
@@ -53,12 +60,41 @@ class MySwitchGamesFrame(GameListFrame):
             "result": (title_ids, ),
         }
 
-    def add_game_to_frame(self, game, row_counter):
+    def create_row(self):
+        game_frame = customtkinter.CTkFrame(self.result_frame)
+        game_frame.grid_columnconfigure(1, weight=1)  # Allow the second column to expand
+        row = {"frame": game_frame, "game": None}
+
+        # Game cover button
+        row["cover"] = customtkinter.CTkButton(game_frame, hover_color=None, border_width=0, text="", image=self.assets.placeholder_icon)
+        row["cover"].grid(row=0, column=0, rowspan=3, padx=10, pady=5, sticky="nsew")  # Span 3 rows
+
+        # Game name label
+        row["name_label"] = customtkinter.CTkLabel(game_frame, font=customtkinter.CTkFont("Arial", 16))
+        row["name_label"].grid(row=0, column=1, padx=10, columnspan=2, pady=5, sticky="nsew")
+
+        # Game description text box
+        row["description"] = customtkinter.CTkTextbox(game_frame, height=130, border_width=0, fg_color="transparent", state="disabled")
+        row["description"].grid(row=1, column=1, padx=10, columnspan=2, pady=5, sticky="nsew")
+
+        # the commands read the game from the row, as the row is reused for other games
+        # Download mods button
+        download_mods_button = customtkinter.CTkButton(game_frame, text="Download Mods", height=50, font=("Arial", 14))
+        download_mods_button.configure(command=lambda: self.download_mods_button_event(row["game"], download_mods_button))
+        download_mods_button.grid(row=2, column=1, padx=10, pady=10, sticky="sw")
+
+        # Download saves button
+        download_saves_button = customtkinter.CTkButton(game_frame, text="Download Saves", height=50, font=("Arial", 14))
+        download_saves_button.configure(command=lambda: self.download_saves_button_event(row["game"], download_saves_button))
+        download_saves_button.grid(row=2, column=2, padx=10, pady=10, sticky="se")
+        return row
+
+    def bind_row(self, row, game):
         # game can either be a title ID or a game name
         title_id = None
         name = None
 
-        if game.isnumeric():
+        if normalize_title_id(game) is not None:
             title_id = game
         else:
             name = game
@@ -67,108 +103,167 @@ class MySwitchGamesFrame(GameListFrame):
             # if game is title ID, get name from title ID
             meta = self.get_title_meta_from_id(title_id)
             if meta is None:
-                return
+                return False
         elif name:
             # if game is the name, get title ID from mapping and then get meta
             title_id = self.game_id_name_map.get(name, None)
             if not title_id:
-                return
+                return False
             meta = self.get_title_meta_from_id(title_id)
+            if meta is None:
+                return False
 
         name = meta["name"]
-        description = meta["description"]
-        icon_url = meta["iconUrl"]
         # add the title id and name to the mapping
         self.game_id_name_map[name] = title_id
         self.game_id_name_map[title_id] = name
-        game_frame = customtkinter.CTkFrame(self.result_frame)
-        game_frame.grid(row=row_counter, column=0, padx=10, pady=5, sticky="nsew")
-        game_frame.grid_columnconfigure(1, weight=1)  # Allow the second column to expand
-
-        # Game cover button
-        game_cover = customtkinter.CTkButton(game_frame, hover_color=None, border_width=0, text="", image=self.assets.placeholder_icon)
-        game_cover.grid(row=0, column=0, rowspan=3, padx=10, pady=5, sticky="nsew")  # Span 3 rows
+        row["game"] = title_id
+
+        # the icon is set from the in-memory cache or once the page's icons have been prefetched
+        row["cover"].configure(image=self.assets.get_cached_image(f"{title_id}_icon") or self.assets.placeholder_icon)
+        self.icon_buttons[title_id] = (row["cover"], meta["iconUrl"])
+        row["name_label"].configure(text=name)
+        row["description"].configure(state="normal")
+        row["description"].delete("1.0", customtkinter.END)
+        row["description"].insert(customtkinter.END, meta["description"])
+        row["description"].configure(state="disabled")  # Make the text box read-only
+
+        # replace the title ID with the name in place, so that the order of the list is kept
+        if game != name and game in self.game_list:
+            self.game_list[self.game_list.index(game)] = name
+            self.search_index = None
+        return True
+
+    def update_results(self):
+        self.icon_buttons = {}
+        super().update_results()
+        self.prefetch_icons()
+
+    def prefetch_icons(self):
+        # fetch the icons of the shown page and the next one, so that the next page can be shown straight away
+        icons = {title_id: icon_url for title_id, (_, icon_url) in self.icon_buttons.items()}
+        page_size = constants.App.RESULTS_PER_GAME_PAGE.value
+        start_index = self.current_page * page_size
+        for game in self.searched_games[start_index:start_index + page_size]:
+            title_id = game if normalize_title_id(game) is not None else self.game_id_name_map.get(game)
+            meta = self.get_title_meta_from_id(title_id) if title_id else None
+            if meta is not None:
+                icons[title_id] = meta["iconUrl"]
+        icons = {title_id: icon_url for title_id, icon_url in icons.items() if self.assets.get_cached_image(f"{title_id}_icon") is None}
+        if not icons:
+            return
         self.event_manager.add_event(
-            event_id=f"download_icon_{title_id}",
-            func=self.download_icon,
-            kwargs={"title_id": title_id, "icon_url": icon_url, "button": game_cover},
-            completion_funcs_with_result=[self.update_game_cover],
+            event_id=f"prefetch_icons_{self}",
+            func=self.download_icons,
+            kwargs={"icons": icons},
+            completion_funcs_with_result=[self.update_game_covers],
+            priority=EventPriority.BACKGROUND,
+            coalesce=True,
         )
 
-        # Game name label
-        game_name_label = customtkinter.CTkLabel(game_frame, text=name, font=customtkinter.CTkFont("Arial", 16))
-        game_name_label.grid(row=0, column=1, padx=10, columnspan=2, pady=5, sticky="nsew")
-
-        # Game description text box
-        game_desc_text = customtkinter.CTkTextbox(game_frame, height=130, border_width=0, fg_color="transparent")
-        game_desc_text.insert(customtkinter.END, description)
-        game_desc_text.configure(state="disabled")  # Make the text box read-only
-        game_desc_text.grid(row=1, column=1, padx=10, columnspan=2, pady=5, sticky="nsew")
-
-        # Download mods button
-        download_mods_button = customtkinter.CTkButton(game_frame, text="Download Mods", height=50, font=("Arial", 14))
-        download_mods_button.configure(command=lambda game=game, button=download_mods_button: self.download_mods_button_event(game, button))
-        download_mods_button.grid(row=2, column=1, padx=10, pady=10, sticky="sw")
-
-        # Download saves button
-        download_saves_button = customtkinter.CTkButton(game_frame, text="Download Saves", height=50, font=("Arial", 14))
-        download_saves_button.configure(command=lambda game=game, button=download_saves_button: self.download_saves_button_event(game, button))
-        download_saves_button.grid(row=2, column=2, padx=10, pady=10, sticky="se")
-
-        # remove title ID from list and add name instead
-        self.game_list.remove(game)
-        self.game_list.append(name)
+    async def download_icons(self, icons):
+        semaphore = asyncio.Semaphore(constants.Switch.ICON_PREFETCH_CONCURRENCY.value)
+
+        async def fetch(title_id, icon_url):
+            async with semaphore:
+                return title_id, await self.get_icon_thumbnail(title_id, icon_url)
+
+        # a failed icon is skipped, so the icons that were fetched are still shown
+        results = await asyncio.gather(*(fetch(title_id, icon_url) for title_id, icon_url in icons.items()), return_exceptions=True)
+        icon_paths = {}
+        for title_id, result in zip(icons, results):
+            if isinstance(result, Exception):
+                self.logger.error("Failed to fetch icon for %s: %s", title_id, result)
+                continue
+            if result[1] is not None:
+                icon_paths[title_id] = result[1]
+        return {
+            "result": (icon_paths, )
+        }
 
-    def download_icon(self, title_id, icon_url, button):
-        cache_query_result = self.cache.get_file(f"{title_id}_icon")
+    async def get_icon_thumbnail(self, title_id, icon_url):
+        # the cache reads and writes files, so it is kept off the event loop
+        cache_query_result = await asyncio.to_thread(self.cache.get_file, f"{title_id}_icon_thumbnail")
         if cache_query_result["status"]:
-            icon_path = cache_query_result["path"]
-            return {
-                "result": (button, icon_path, )
-            }
-        download_result = download_file(icon_url, Path(f"{title_id}.png").resolve())
-        if not download_result["status"]:
-            return {}
+            return cache_query_result["path"]
+        if not icon_url:
+            return None
 
+        download_result = await async_web.download_file(icon_url, Path(f"{title_id}.png").resolve())
+        if not download_result["status"]:
+            return None
         icon_path = download_result["download_path"]
-        add_to_cache_result = self.cache.add_file(f"{title_id}_icon", icon_path)
+        thumbnail_path = icon_path.with_name(f"{title_id}_thumbnail.png")
+        try:
+            # decoding and resizing is CPU bound, so it is kept off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.assets.create_thumbnail, icon_path, thumbnail_path, constants.Switch.ICON_SIZE.value)
+        except OSError as error:
+            self.logger.error("Failed to create thumbnail for %s: %s", title_id, error)
+            thumbnail_path.unlink(missing_ok=True)
+            return None
+        finally:
+            icon_path.unlink(missing_ok=True)
+
+        add_to_cache_result = await asyncio.to_thread(self.cache.add_file, f"{title_id}_icon_thumbnail", thumbnail_path)
         if not add_to_cache_result["status"]:
-            return {}
-
-        cache_query_result = self.cache.get_file(f"{title_id}_icon")
-        if not cache_query_result:
-            return {}
-        icon_path = cache_query_result["path"]
-
-        return {
-            "result": (button, icon_path, )
-        }
-
-    def update_game_cover(self, button, image):
-        button.configure(image=self.assets.create_image(image, (224, 224)))
+            return None
+        return add_to_cache_result["path"]
+
+    def update_game_covers(self, icon_paths):
+        for title_id, icon_path in icon_paths.items():
+            try:
+                image = self.assets.cache_image(f"{title_id}_icon", icon_path, constants.Switch.ICON_SIZE.value)
+            except OSError as error:
+                self.logger.error("Failed to load icon for %s: %s", title_id, error)
+                continue
+            button = self.icon_buttons.get(title_id, (None, None))[0]
+            if button is not None and button.winfo_exists():
+                button.configure(image=image)
 
     def get_title_meta_from_id(self, title_id):
-        if not self.titledb:
+        if self.titledb is None:
             self.assert_titledb()
-        return self.titledb.get(str(title_id))
-
-    def load_titledb(self, titledb=None):
-        if titledb is None:
-            titledb = self.cache.get_json("TitleDB")["data"]
-        self.titledb = titledb
+        with self.titledb_lock:
+            if self.titledb is None:
+                return None
+            return self.titledb.get(title_id)
+
+    def load_titledb(self, index_path=None):
+        if index_path is None:
+            cache_query = self.cache.get_file("TitleDB_index")
+            if not cache_query["status"]:
+                return {
+                    "message": {
+                        "function": messagebox.showerror,
+                        "arguments": (self.winfo_toplevel(), "Error", "The TitleDB index could not be found in the cache."),
+                    }
+                }
+            index_path = cache_query["path"]
+        titledb = TitleDBIndex(index_path)
+        self.close_titledb()
+        with self.titledb_lock:
+            self.titledb = titledb
         return {}
 
+    def close_titledb(self):
+        # the index is memory mapped, so it has to be closed before the file can be replaced
+        with self.titledb_lock:
+            if self.titledb is not None:
+                self.titledb.close()
+                self.titledb = None
+
     def assert_titledb(self, ):
         if self.fetching_titledb:
             return
-        if self.titledb:
+        if self.titledb is not None:
             return
-        cache_query = self.cache.get_file("TitleDB")
+        cache_query = self.cache.get_file("TitleDB_index")
         if cache_query["status"]:
             self.event_manager.add_event(
                 event_id="load_titledb",
                 func=self.load_titledb,
                 kwargs={},
+                deduplicate=True,
                 error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An error occurred while attempting to load the TitleDB.")],
             )
             return
@@ -178,8 +273,10 @@ class MySwitchGamesFrame(GameListFrame):
             event_id="fetch_titledb",
             func=self.download_titledb,
             kwargs={},
+            deduplicate=True,
             error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unknown error occured while attempting to download the titleDB.")],
-            completion_functions=[lambda: setattr(self, "fetching_titledb", False)]
+            completion_functions=[lambda: setattr(self, "fetching_titledb", False)],
+            priority=EventPriority.TRANSFER,
         )
 
     def download_titledb(self):
@@ -194,23 +291,25 @@ class MySwitchGamesFrame(GameListFrame):
                     "arguments": (self.winfo_toplevel(), "Error", f"An error occured while attempting to download the TitleDB:\n\n{download_result['message']}"),
                 }
             }
-        download_path = download_result["download_path"]
-
-        self.cache.add_file(key="TitleDB", file=download_path, ttl=60*60*24*7)
+        download_path = Path(download_result["download_path"])
 
-        cache_lookup_result = self.cache.get_json("TitleDB")
-        if not cache_lookup_result:
+        self.progress_handler.start_operation("Indexing TitleDB", total_units=0, units="MiB", status="Indexing...")
+        index_result = self.emulator_object.build_titledb_index(download_path)
+        download_path.unlink(missing_ok=True)
+        self.progress_handler.report_success()
+        if not index_result["status"]:
             self.fetching_titledb = False
             return {
                 "message": {
                     "function": messagebox.showerror,
-                    "arguments": (self.winfo_toplevel(), "Error", "An error occured while attempting to lookup the TitleDB in the cache."),
+                    "arguments": (self.winfo_toplevel(), "Error", f"An error occured while attempting to index the TitleDB:\n\n{index_result['message']}"),
                 }
             }
 
-        titledb = cache_lookup_result["data"]
+        self.close_titledb()
+        add_to_cache_result = self.cache.add_file(key="TitleDB_index", file=index_result["index_path"], ttl=constants.Switch.TITLEDB_TTL.value)
 
-        self.load_titledb(titledb, refetch_on_error=False)
+        self.load_titledb(add_to_cache_result["path"])
 
         self.fetching_titledb = False
         return {
@@ -2,36 +2,32 @@ import webbrowser
 
 import customtkinter
 
+from core.config import constants
 from core.logging.logger import Logger
-from core.network.myrient import get_game_download_url, get_list_of_games
+from core.network.myrient import get_catalog_games, get_game_download_url, search_catalog
 from gui.frames.game_list_frame import GameListFrame
+from gui.handlers.thread_event_manager import EventPriority
 from gui.libs.CTkMessagebox import messagebox
 
 
 class MyrientGameListFrame(GameListFrame):
-    def __init__(self, master, event_manager, cache, myrient_path, console_name, download_button_event):
+    """
+    The games of a Myrient listing.
+
+    If search consoles are given, the games of all of them can be searched at once through the catalog,
+    so a game can be found without knowing which of the consoles it was released for.
+    """
+    def __init__(self, master, event_manager, myrient_path, console_name, download_button_event, search_consoles=None):
         self.myrient_path = myrient_path
         self.console_name = console_name
-        self.cache = cache
+        self.search_consoles = search_consoles
         self.download_button_event = download_button_event
         super().__init__(master=master, event_manager=event_manager)
         self.logger = Logger(__name__).get_logger()
 
     def get_game_list(self):
-        cache_lookup_result = self.cache.get_json(f"{self.console_name}_games")
-        if cache_lookup_result["status"]:
-            self.logger.info("game list cache hit")
-            game_list = cache_lookup_result["data"]
-            return {
-                "result": (game_list, ),
-                "message": {
-                    "function": messagebox.showsuccess,
-                    "arguments": (self.winfo_toplevel(), "Success", "Successfully retrieved games from cache.")
-                }
-            }
-        self.logger.info("game list cache miss")
-        scrape_result = get_list_of_games(myrient_path=self.myrient_path)
-        if not scrape_result["status"]:
+        catalog_result = get_catalog_games(self.console_name, self.myrient_path)
+        if not catalog_result["status"]:
             return {
                 "result": ([], ),
                 "message": {
@@ -39,23 +35,77 @@ class MyrientGameListFrame(GameListFrame):
                     "arguments": (self.winfo_toplevel(), "Error", "Failed to fetch games.")
                 }
             }
-        self.cache.add_json(f"{self.console_name}_games", scrape_result["games"])
+        self.logger.info("Retrieved %s games from the catalog, refreshed: %s", len(catalog_result["games"]), catalog_result["refreshed"])
         return {
-            "result": (scrape_result["games"],),
+            "result": (catalog_result["games"],),
             "message": {
                 "function": messagebox.showsuccess,
-                "arguments": (self.winfo_toplevel(), "Success", "Successfully fetched games.")
+                "arguments": (self.winfo_toplevel(), "Success", "Successfully fetched games." if catalog_result["refreshed"] else "Successfully retrieved games from the catalog.")
             }
         }
 
-    def add_game_to_frame(self, game, row_counter):
-        game_download_url = get_game_download_url(game_name=game, myrient_path=self.myrient_path)
-        entry = customtkinter.CTkEntry(self.result_frame, width=400)
-        entry.insert(0, game)
-        entry.configure(state="disabled")
-
-        entry.grid(row=row_counter, column=0, padx=10, pady=5, sticky="w")
-        button = customtkinter.CTkButton(self.result_frame, text="Download")
-        button.configure(command=lambda button=button, game=game: self.download_button_event(game, self.myrient_path))
-        button.bind("<Shift-Button-1>", lambda event, game=game: webbrowser.open(game_download_url))
-        button.grid(row=row_counter, column=1, padx=10, pady=5, sticky="e")
+    def build_frame(self):
+        super().build_frame()
+        if not self.search_consoles:
+            return
+        self.search_all_consoles = customtkinter.CTkCheckBox(self.refresh_frame, text="Search all consoles")
+        self.search_all_consoles.grid(row=0, column=1, padx=5, pady=5)
+
+    def perform_search(self, *args):
+        query = self.search_entry.get().strip()
+        if not (self.search_consoles and self.search_all_consoles.get() and query):
+            super().perform_search(*args)
+            return
+        # the catalog is locked while a listing is being refreshed, so it is searched in a worker thread
+        self.event_manager.add_event(
+            event_id=f"search_catalog_{self}",
+            func=self.search_catalog,
+            kwargs={"query": query},
+            completion_funcs_with_result=[self.show_catalog_results],
+            priority=EventPriority.CRITICAL,
+            coalesce=True,
+        )
+
+    def search_catalog(self, query):
+        games = search_catalog(query, consoles=self.search_consoles, limit=constants.Myrient.CATALOG_SEARCH_LIMIT.value)
+        return {"result": (query, games)}
+
+    def show_catalog_results(self, query, games):
+        # the results of a search that was replaced by another one while it ran are dropped
+        if query != self.search_entry.get().strip() or not self.search_all_consoles.get():
+            return
+        self.searched_games = games
+        self.show_searched_games()
+
+    def create_row(self):
+        frame = customtkinter.CTkFrame(self.result_frame, fg_color="transparent")
+        frame.grid_columnconfigure(0, weight=1)
+        row = {"frame": frame, "game": None, "myrient_path": self.myrient_path}
+
+        row["entry"] = customtkinter.CTkEntry(frame, width=400, state="disabled")
+        row["entry"].grid(row=0, column=0, padx=0, pady=0, sticky="w")
+        # the commands read the game from the row, as the row is reused for other games
+        button = customtkinter.CTkButton(frame, text="Download", command=lambda: self.download_button_event(row["game"], row["myrient_path"]))
+        button.bind("<Shift-Button-1>", lambda event: webbrowser.open(get_game_download_url(game_name=row["game"], myrient_path=row["myrient_path"])))
+        button.grid(row=0, column=2, padx=(10, 0), pady=0, sticky="e")
+        row["button"] = button
+        row["size_label"] = customtkinter.CTkLabel(frame, font=("Arial", 12), anchor="e")
+        row["size_label"].grid(row=0, column=1, padx=(10, 0), pady=0, sticky="e")
+        return row
+
+    def get_game_name(self, game):
+        return game["name"]
+
+    def bind_row(self, row, game):
+        row["game"] = game["name"]
+        # the results of a search across consoles come from other listings
+        row["myrient_path"] = game.get("path", self.myrient_path)
+        row["entry"].configure(state="normal")
+        row["entry"].delete(0, customtkinter.END)
+        row["entry"].insert(0, game["name"])
+        row["entry"].configure(state="disabled")
+        size = game["size"] or ""
+        if game.get("console", self.console_name) != self.console_name:
+            size = f"{size} ({game['console']})"
+        row["size_label"].configure(text=size)
+        return True
@@ -7,6 +7,7 @@ from gui.frames.emulator_frame import EmulatorFrame
 from gui.frames.firmware_keys_frame import FirmwareKeysFrame
 from gui.frames.ryujinx.ryujinx_games_frame import RyujinxROMFrame
 from gui.handlers.progress.progress_handler import ProgressHandler
+from gui.handlers.thread_event_manager import EventPriority
 from gui.libs.CTkMessagebox import messagebox
 from gui.windows.folder_selector import FolderSelector
 from gui.windows.path_dialog import PathDialog
@@ -207,7 +208,8 @@ class RyujinxFrame(EmulatorFrame):
             func=self.install_ryujinx_handler,
             kwargs={"archive_path": path_to_archive},
             completion_functions=[lambda: self.configure_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occured while installing Ryujinx. Please check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occured while installing Ryujinx. Please check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def install_ryujinx_handler(self, update_mode=False, archive_path=None):
@@ -229,8 +231,15 @@ class RyujinxFrame(EmulatorFrame):
                     }
                 self.configure_buttons(launch_ryujinx_button_text="Updating...")
             total_units = release_fetch_result["release"]["size"] / 1024 / 1024
-            self.main_progress_frame.start_operation(title="Install Ryujinx", total_units=total_units, units=" MiB", status="Downloading...")
+            self.main_progress_frame.start_operation(title="Install Ryujinx", total_units=total_units, units=" MiB", status="Downloading...", pausable=True)
             download_result = self.ryujinx.download_release(release_fetch_result["release"], progress_handler=self.main_progress_frame)
+            if download_result.get("paused"):
+                return {
+                    "message": {
+                        "function": messagebox.showinfo,
+                        "arguments": (self.winfo_toplevel(), "Ryujinx", "The download was paused. It will resume the next time you install Ryujinx."),
+                    }
+                }
             if not download_result["status"]:
                 if "cancelled" in download_result["message"]:
                     return {
@@ -248,7 +257,7 @@ class RyujinxFrame(EmulatorFrame):
 
             archive_path = download_result["download_path"]
 
-        self.main_progress_frame.start_operation(title="Install Ryujinx", total_units=0, units=" Files", status="Extracting...")
+        self.main_progress_frame.start_operation(title="Install Ryujinx", total_units=0, units=" MiB", status="Extracting...")
         extract_result = self.ryujinx.extract_release(archive_path, progress_handler=self.main_progress_frame)
         if not extract_result["status"]:
             if "cancelled" in extract_result["message"]:
@@ -333,14 +342,15 @@ class RyujinxFrame(EmulatorFrame):
             func=self.import_data_handler,
             kwargs={"import_directory": directory, "folders": folders, "save_folder": import_option == "Save Data"},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Ryujinx data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Ryujinx data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def import_data_handler(self, import_directory, folders, save_folder=False):
         self.data_progress_handler.start_operation(
             title="Import Ryujinx Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Importing..."
         )
         import_result = self.ryujinx.import_ryujinx_data(
@@ -387,14 +397,15 @@ class RyujinxFrame(EmulatorFrame):
             func=self.export_data_handler,
             kwargs={"export_directory": export_directory, "folders": folders, "save_folder": self.export_optionmenu.get() == "Save Data"},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Ryujinx data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Ryujinx data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def export_data_handler(self, export_directory, folders, save_folder=False):
         self.data_progress_handler.start_operation(
             title="Export Ryujinx Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Exporting..."
         )
         export_result = self.ryujinx.export_ryujinx_data(
@@ -433,7 +444,8 @@ class RyujinxFrame(EmulatorFrame):
             func=self.delete_data_handler,
             kwargs={"folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Ryujinx data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Ryujinx data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def delete_data_handler(self, folders):
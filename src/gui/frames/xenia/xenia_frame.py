@@ -6,7 +6,7 @@ from core.emulators.xenia.runner import Xenia
 from gui.frames.emulator_frame import EmulatorFrame
 from gui.frames.xenia.xenia_games_frame import XeniaGamesFrame
 from gui.handlers.progress.progress_handler import ProgressHandler
-from gui.handlers.thread_event_manager import ThreadEventManager
+from gui.handlers.thread_event_manager import EventPriority, ThreadEventManager
 from gui.libs.CTkMessagebox import messagebox
 from gui.windows.folder_selector import FolderSelector
 from gui.windows.path_dialog import PathDialog
@@ -109,7 +109,7 @@ class XeniaFrame(EmulatorFrame):
         self.xenia_data_log.grid_rowconfigure(1, weight=1)
         self.data_progress_handler = ProgressHandler(self.xenia_data_log)
 
-        self.manage_games_frame = XeniaGamesFrame(self, settings=self.settings, cache=self.cache, event_manager=self.event_manager)
+        self.manage_games_frame = XeniaGamesFrame(self, settings=self.settings, cache=self.cache, event_manager=self.event_manager, paths=self.paths)
 
     def switch_channel(self, value=None):
         value = self.selected_channel.get()
@@ -214,7 +214,8 @@ class XeniaFrame(EmulatorFrame):
             func=self.install_xenia_handler,
             kwargs={"archive_path": path_to_archive},
             completion_functions=[lambda: self.configure_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occured while installing Xenia. Please check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occured while installing Xenia. Please check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def install_xenia_handler(self, update_mode=False, archive_path=None):
@@ -236,8 +237,15 @@ class XeniaFrame(EmulatorFrame):
                         "status": True
                     }
                 self.configure_buttons(launch_xenia_button_text="Updating...")
-            self.main_progress_frame.start_operation(title="Installing Xenia", total_units=release_fetch_result["release"]["size"] / 1024 / 1024, units=" MiB", status="Downloading...")
+            self.main_progress_frame.start_operation(title="Installing Xenia", total_units=release_fetch_result["release"]["size"] / 1024 / 1024, units=" MiB", status="Downloading...", pausable=True)
             download_result = self.xenia.download_xenia_release(release_fetch_result["release"], progress_handler=self.main_progress_frame)
+            if download_result.get("paused"):
+                return {
+                    "message": {
+                        "function": messagebox.showinfo,
+                        "arguments": (self.winfo_toplevel(), "Xenia", "The download was paused. It will resume the next time you install Xenia."),
+                    }
+                }
             if not download_result["status"]:
                 if "cancelled" in download_result["message"]:
                     return {
@@ -255,7 +263,7 @@ class XeniaFrame(EmulatorFrame):
 
             archive_path = download_result["download_path"]
 
-        self.main_progress_frame.start_operation(title="Installing Xenia", total_units=0, units=" Files", status="Extracting...")
+        self.main_progress_frame.start_operation(title="Installing Xenia", total_units=0, units=" MiB", status="Extracting...")
         extract_result = self.xenia.extract_xenia_release(archive_path, progress_handler=self.main_progress_frame)
         if not extract_result["status"]:
             if "cancelled" in extract_result["message"]:
@@ -335,14 +343,15 @@ class XeniaFrame(EmulatorFrame):
             func=self.import_data_handler,
             kwargs={"import_directory": directory, "folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Xenia data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Xenia data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def import_data_handler(self, import_directory, folders):
         self.data_progress_handler.start_operation(
             title="Import Xenia Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Importing..."
         )
         import_result = self.xenia.import_xenia_data(
@@ -388,14 +397,15 @@ class XeniaFrame(EmulatorFrame):
             func=self.export_data_handler,
             kwargs={"export_directory": export_directory, "folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Xenia data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Xenia data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def export_data_handler(self, export_directory, folders):
         self.data_progress_handler.start_operation(
             title="Export Xenia Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Exporting..."
         )
         export_result = self.xenia.export_xenia_data(
@@ -433,7 +443,8 @@ class XeniaFrame(EmulatorFrame):
             func=self.delete_data_handler,
             kwargs={"folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Xenia data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Xenia data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def delete_data_handler(self, folders):
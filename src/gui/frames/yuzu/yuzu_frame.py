@@ -7,7 +7,7 @@ from gui.frames.emulator_frame import EmulatorFrame
 from gui.frames.firmware_keys_frame import FirmwareKeysFrame
 from gui.frames.yuzu.yuzu_games_frame import YuzuGamesFrame
 from gui.handlers.progress.progress_handler import ProgressHandler
-from gui.handlers.thread_event_manager import ThreadEventManager
+from gui.handlers.thread_event_manager import EventPriority, ThreadEventManager
 from gui.libs.CTkMessagebox import messagebox
 from gui.windows.folder_selector import FolderSelector
 from gui.windows.path_dialog import PathDialog
@@ -219,6 +219,7 @@ class YuzuFrame(EmulatorFrame):
             kwargs={"archive_path": path_to_archive},
             completion_functions=[lambda: self.configure_buttons(state="normal")],
             error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Install Yuzu", "An unexpected error has occured while installing Yuzu.\n\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def install_yuzu_handler(self, archive_path):
@@ -230,7 +231,7 @@ class YuzuFrame(EmulatorFrame):
                     "arguments": (self.winfo_toplevel(), "Install Yuzu", f"The archive provided is not a valid yuzu {self.settings.yuzu.release_channel.replace("_", " ")} release."),
                 }
             }
-        self.main_progress_frame.start_operation("Installing Yuzu", 0, " Files", "Extracting...")
+        self.main_progress_frame.start_operation("Installing Yuzu", 0, " MiB", "Extracting...")
         install_status = self.yuzu.install_yuzu(archive_path, progress_handler=self.main_progress_frame)
         if not install_status["status"]:
             if "cancelled" in install_status["message"]:
@@ -307,14 +308,15 @@ class YuzuFrame(EmulatorFrame):
             func=self.import_data_handler,
             kwargs={"import_directory": directory, "folders": folders, "save_folder": import_option == "Save Data"},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Yuzu data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while importing Yuzu data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def import_data_handler(self, import_directory, folders, save_folder=False):
         self.data_progress_handler.start_operation(
             title="Import Yuzu Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Importing..."
         )
         import_result = self.yuzu.import_yuzu_data(
@@ -361,14 +363,15 @@ class YuzuFrame(EmulatorFrame):
             func=self.export_data_handler,
             kwargs={"export_directory": export_directory, "folders": folders, "save_folder": self.yuzu_export_optionmenu.get() == "Save Data"},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Yuzu data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while exporting Yuzu data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def export_data_handler(self, export_directory, folders, save_folder=False):
         self.data_progress_handler.start_operation(
             title="Export Yuzu Data",
             total_units=0,
-            units=" Files",
+            units=" MiB",
             status="Exporting..."
         )
         export_result = self.yuzu.export_yuzu_data(
@@ -407,7 +410,8 @@ class YuzuFrame(EmulatorFrame):
             func=self.delete_data_handler,
             kwargs={"folders": folders},
             completion_functions=[lambda: self.configure_data_buttons(state="normal")],
-            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Yuzu data.\nPlease check the logs for more information and report this issue.")]
+            error_functions=[lambda: messagebox.showerror(self.winfo_toplevel(), "Error", "An unexpected error occurred while deleting Yuzu data.\nPlease check the logs for more information and report this issue.")],
+            priority=EventPriority.TRANSFER,
         )
 
     def delete_data_handler(self, folders):
@@ -24,6 +24,9 @@ class ProgressFrame(customtkinter.CTkFrame):
         self.cancel_operation_button = customtkinter.CTkButton(
             self, text="Cancel", command=self.cancel_button_event
         )
+        self.pause_operation_button = customtkinter.CTkButton(
+            self, text="Pause", command=self.pause_button_event
+        )
 
         self.operation_title.grid(row=0, column=0, sticky="W", padx=10, pady=5)
 
@@ -56,9 +59,21 @@ class ProgressFrame(customtkinter.CTkFrame):
     def set_cancel_button_state(self, state):
         self.cancel_operation_button.configure(state=state)
 
+    def set_pausable(self, pausable):
+        if pausable:
+            self.pause_operation_button.grid(row=3, column=4, pady=10, padx=(10, 0), sticky="E")
+        else:
+            self.pause_operation_button.grid_forget()
+
+    def set_pause_button_state(self, state):
+        self.pause_operation_button.configure(state=state)
+
     def cancel_button_event(self):
         self.handler.send_cancel_signal_to_operation()
 
+    def pause_button_event(self):
+        self.handler.send_pause_signal_to_operation()
+
     def show(self):
         self.grid(row=0, column=0, sticky="ew")
 
@@ -2,14 +2,19 @@
 This is the ProgressHandler class for the GUI
 
 For the GUI, our progress handler will be a progress bar that updates as the progress is reported.
-The progress handler will have a report_progress method that will have to take the completed_data as an argument.
-The report_progress method will then update the progress bar with the new values
 
-We need to create the progress bar class.
+Operations run in worker threads, so the progress handler never touches the widgets from the methods
+that the operations call. report_progress only stores the latest number of completed units, and every
+other report is put on the report queue. The queue and the latest progress are drained on the Tk thread
+at a fixed rate, so any number of reports between two refreshes results in a single update of the widgets.
+The speed and time left are calculated over a sliding window of the recent progress.
 """
+import collections
 import queue
+import tkinter
 from time import perf_counter
 
+from core.config import constants
 from core.logging.logger import Logger
 from gui.handlers.progress.progress_frame import ProgressFrame
 from gui.handlers.progress.progress_window import ProgressWindow
@@ -20,79 +25,104 @@ class ProgressHandler:
         self.logger = Logger(__name__).get_logger()
         self._progress_bar = ProgressFrame(master, self) if widget == "frame" else ProgressWindow(master, self)
         self.master = master
-        self.smoothing_factor = 0.3
         self.report_queue = queue.Queue()
-        self._operation_start_time = 0
         self._units = ""
         self._total_units = 0
-        self._last_speed = 0
-        self._average_speed = 0
         self._current_units = 0
+        self._operation_active = False
+        self._speed_samples = collections.deque()
         self._should_cancel = False
+        self._should_pause = False
+        self.master.after(constants.App.PROGRESS_REFRESH_INTERVAL.value, self._refresh)
 
-    def start_operation(self, title, total_units, units, status="Starting..."):
-
-        self._average_speed = 0
+    def start_operation(self, title, total_units, units, status="Starting...", pausable=False):
         self._total_units = total_units
         self._should_cancel = False
+        self._should_pause = False
         self._units = units
         self._current_units = 0
-        self._last_speed = 0
-        self._operation_start_time = perf_counter()
-        self._progress_bar.set_eta("00:00:00")
-        self._progress_bar.set_title(title)
-        self._progress_bar.set_status(status)
-        self._progress_bar.update_progress(0, total_units, units)
-        self._progress_bar.set_speed(0, units)
-        self._progress_bar.set_cancel_button_state("normal")
-        self._progress_bar.show()
+        self.report_queue.put({
+            "type": "start",
+            "title": title,
+            "total_units": total_units,
+            "units": units,
+            "status": status,
+            "pausable": pausable,
+        })
 
     def is_total_units_set(self):
         return self._total_units > 0
 
     def set_total_units(self, total_units):
         self._total_units = total_units
-        self._progress_bar.update_progress(self._current_units, total_units, self._units)
+        self.report_queue.put({"type": "total_units", "total_units": total_units})
+
+    def _refresh(self):
+        """
+        Drain the report queue and update the widgets with the latest progress. Runs on the Tk thread.
+        """
+        try:
+            while True:
+                try:
+                    report = self.report_queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._process_report(report)
+            if self._operation_active:
+                self._update_progress_widgets(self._current_units)
+        except Exception as error:
+            self.logger.error("Failed to refresh progress: %s", error)
+        try:
+            self.master.after(constants.App.PROGRESS_REFRESH_INTERVAL.value, self._refresh)
+        except tkinter.TclError:
+            # the window has been destroyed
+            pass
 
     def _process_report(self, report):
         match report["type"]:
-            case "progress":
-                self._handle_progress_report(report)
+            case "start":
+                self._handle_start_report(report)
+            case "total_units":
+                self._progress_bar.update_progress(self._current_units, report["total_units"], self._units)
             case "success":
                 self._handle_success_report(report)
             case "error":
                 self._handle_error_report(report)
             case "configure":
                 self._handle_configure_report(report)
+            case "hide":
+                self._operation_active = False
+                self._progress_bar.hide()
+
+    def _handle_start_report(self, report):
+        self._operation_active = True
+        self._speed_samples.clear()
+        self._speed_samples.append((perf_counter(), 0))
+        self._progress_bar.set_eta("00:00:00")
+        self._progress_bar.set_title(report["title"])
+        self._progress_bar.set_status(report["status"])
+        self._progress_bar.update_progress(0, report["total_units"], report["units"])
+        self._progress_bar.set_speed(0, report["units"])
+        self._progress_bar.set_cancel_button_state("normal")
+        self._progress_bar.set_pause_button_state("normal")
+        self._progress_bar.set_pausable(report["pausable"])
+        self._progress_bar.show()
 
-    def _handle_progress_report(self, report):
-        """
-        {
-            "type": "progress",
-            "completed_units": x,
-        }
-        """
-        completed_units = report["completed_units"]
-        self._current_units = completed_units
-        # update progress bar, percentage and progress label
-
+    def _update_progress_widgets(self, completed_units):
         self._progress_bar.update_progress(completed_units, self._total_units, self._units)
 
-        # calculate download speed
-        last_speed = completed_units / (
-            (perf_counter() - self._operation_start_time)
-        )
-        # use exponential moving average to calculate download speed
-        self._average_speed = (
-            self.smoothing_factor * last_speed +
-
-            (1 - self.smoothing_factor) * self._average_speed
-        )
-        self._progress_bar.set_speed(self._average_speed, self._units)
+        # calculate the speed over the samples in the sliding window
+        now = perf_counter()
+        self._speed_samples.append((now, completed_units))
+        while len(self._speed_samples) > 2 and now - self._speed_samples[0][0] > constants.App.PROGRESS_SPEED_WINDOW.value:
+            self._speed_samples.popleft()
+        oldest_time, oldest_units = self._speed_samples[0]
+        speed = (completed_units - oldest_units) / (now - oldest_time) if now > oldest_time else 0
+        self._progress_bar.set_speed(max(speed, 0), self._units)
 
         # calculate time left
-        if self._average_speed != 0:
-            time_left = (self._total_units - completed_units) / self._average_speed
+        if speed > 0:
+            time_left = max(self._total_units - completed_units, 0) / speed
             minutes, seconds = divmod(int(time_left), 60)
             hours, minutes = divmod(minutes, 60)
             time_left_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
@@ -101,12 +131,12 @@ class ProgressHandler:
         self._progress_bar.set_eta(time_left_str)
 
     def _handle_success_report(self, report):
-        self._should_cancel = True
-        self.cancel()
+        self._operation_active = False
+        self._progress_bar.hide()
 
     def _handle_error_report(self, report):
-        self._should_cancel = True
-        self.cancel()
+        self._operation_active = False
+        self._progress_bar.hide()
 
     def _handle_configure_report(self, report):
         match report["widget"]:
@@ -114,34 +144,53 @@ class ProgressHandler:
                 self._progress_bar.set_status(report["kwargs"]["text"])
             case "cancel_button":
                 self._progress_bar.set_cancel_button_state(report["kwargs"]["state"])
+            case "pause_button":
+                self._progress_bar.set_pause_button_state(report["kwargs"]["state"])
 
     def report_progress(self, completed_units):
-        self._handle_progress_report({"completed_units": completed_units})
+        # only the latest value is kept, it is picked up by the next refresh
+        self._current_units = completed_units
 
     def report_success(self):
-        self._handle_success_report({})
+        self._should_cancel = True
+        self.report_queue.put({"type": "success"})
 
     def report_error(self, error):
-        self._handle_error_report({"error": error})
+        self._should_cancel = True
+        self.report_queue.put({"type": "error", "error": error})
 
     def report_configure(self, widget, **kwargs):
         self.report_queue.put({"type": "configure", "widget": widget, "kwargs": kwargs})
 
+    def report_status(self, status):
+        self.report_configure("status", text=status)
+
     def set_cancel_button_state(self, state):
-        self._progress_bar.set_cancel_button_state(state)
+        self.report_configure("cancel_button", state=state)
 
     def should_cancel(self):
         return self._should_cancel
 
+    def should_pause(self):
+        return self._should_pause
+
     def send_cancel_signal_to_operation(self):
         """
         called by external events like cancel buttons to signal the operation to cancel
         """
         self._should_cancel = True
         self.set_cancel_button_state("disabled")
+        self.report_configure("pause_button", state="disabled")
+
+    def send_pause_signal_to_operation(self):
+        """
+        called by the pause button to stop the operation while keeping its progress so that it can be resumed later
+        """
+        self._should_pause = True
+        self.send_cancel_signal_to_operation()
 
     def cancel(self):
         """
         called by the operation
         """
-        self._progress_bar.hide()
+        self.report_queue.put({"type": "hide"})
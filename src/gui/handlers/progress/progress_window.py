@@ -35,6 +35,12 @@ class ProgressWindow(customtkinter.CTkToplevel):
     def set_cancel_button_state(self, state):
         self._progress_frame.set_cancel_button_state(state)
 
+    def set_pausable(self, pausable):
+        self._progress_frame.set_pausable(pausable)
+
+    def set_pause_button_state(self, state):
+        self._progress_frame.set_pause_button_state(state)
+
     def cancel_button_event(self):
         self._progress_frame.cancel_button_event()
 
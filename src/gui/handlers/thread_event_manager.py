@@ -1,24 +1,125 @@
+import asyncio
+import collections
+import inspect
 import queue
 import threading
 import traceback
+from enum import Enum
+from time import perf_counter
 
+from core.config import constants
 from core.logging.logger import Logger
+from core.network import async_web
+
+
+class EventPriority(Enum):
+    """
+    The priority class of an event. Each class has its own bounded pool of worker threads,
+    so background work such as fetching icons never delays an event that the user is waiting on,
+    and long transfers such as downloads, installs and data copies never hold up short ones.
+    """
+    CRITICAL = "critical"
+    NORMAL = "normal"
+    TRANSFER = "transfer"
+    BACKGROUND = "background"
+
+
+class _WorkerPool:
+    """
+    A bounded pool of daemon worker threads that are started as they are needed.
+
+    A new worker is started whenever there are more queued events than idle workers, so an event
+    never waits behind another one while the pool has room for another worker. A worker counts as
+    idle from when it is started until it takes an event, and again once the event has finished.
+    """
+    def __init__(self, name, max_workers, run):
+        self.name = name
+        self.max_workers = max_workers
+        self._run = run
+        self._events = collections.deque()
+        self._workers = []
+        self._idle_workers = 0
+        self._condition = threading.Condition()
+
+    def submit(self, event):
+        with self._condition:
+            self._events.append(event)
+            if len(self._events) > self._idle_workers and len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name=f"{self.name}-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                self._idle_workers += 1
+                worker.start()
+            self._condition.notify()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._events:
+                    self._condition.wait()
+                event = self._events.popleft()
+                self._idle_workers -= 1
+            try:
+                self._run(event)
+            finally:
+                with self._condition:
+                    self._idle_workers += 1
 
 
 class ThreadEventManager:
+    """
+    Runs events in bounded worker pools and processes their results on the Tk thread.
+
+    Every event belongs to a priority class with its own pool of worker threads. Coroutine functions
+    are run on the background event loop of core.network.async_web instead, so they do not use a worker thread
+    while they wait on the network. Results are put on a single queue, which is drained by one polling loop
+    on the Tk thread.
+
+    Events with the same id can be deduplicated, where a new event is ignored while another one with
+    the same id is queued or running, or coalesced, where a new event replaces the one with the same id
+    that is still waiting to start.
+    """
     def __init__(self, window):
         self.logger = Logger(__name__).get_logger()
         self.events = []
+        self._events_by_id = {}
+        self._lock = threading.Lock()
         self.window = window
         self.result_queue = queue.Queue()
+        self._pools = {
+            priority: _WorkerPool(f"EventWorker-{priority.value}", constants.App.EVENT_WORKERS.value[priority.value], self._run_event)
+            for priority in EventPriority
+        }
+        self.window.after(constants.App.EVENT_POLL_INTERVAL.value, self._main_thread_loop)
 
     def is_event_running(self, event_id):
-        for event in self.events:
-            if event["id"] == event_id:
-                return True
-        return False
+        return bool(self._events_by_id.get(event_id))
+
+    def get_blocking_events(self):
+        """
+        Get the ids of the running events that should prevent the application from closing.
+        Daemon events, such as startup checks, are not included.
+        """
+        with self._lock:
+            return [event["id"] for event in self.events if not event["daemon"]]
+
+    def add_event(self, event_id, func, kwargs=None, completion_functions=None, error_functions=None, completion_funcs_with_result=None, ignore_messages=False, daemon=False,
+                  priority=EventPriority.NORMAL, deduplicate=False, coalesce=False):
+        """
+        Queue a function to run in a worker thread.
 
-    def add_event(self, event_id, func, kwargs=None, completion_functions=None, error_functions=None, completion_funcs_with_result=None, ignore_messages=False):
+        Args:
+            event_id (str): The id of the event.
+            func (callable): The function or coroutine function to run.
+            kwargs (dict, optional): The keyword arguments to call the function with.
+            completion_functions (list, optional): Functions to call on the Tk thread once the event has finished.
+            error_functions (list, optional): Functions to call on the Tk thread if the function raised an exception.
+            completion_funcs_with_result (list, optional): Functions to call on the Tk thread with the result of the function.
+            ignore_messages (bool, optional): Whether to skip the message and error functions.
+            daemon (bool, optional): Whether the event may be abandoned when the application closes.
+            priority (EventPriority, optional): The priority class of the event.
+            deduplicate (bool, optional): Ignore this event if another one with the same id is queued or running.
+            coalesce (bool, optional): Replace the event with the same id that has not started yet instead of queueing another one.
+        """
         event = {
             "id": event_id,
             "function": func,
@@ -27,42 +128,131 @@ class ThreadEventManager:
             "completion_func_with_result": completion_funcs_with_result if completion_funcs_with_result else [],
             "error_functions": error_functions if error_functions else [],
             "ignore_messages": ignore_messages,
-            "output_queue": queue.Queue(),
-            "error_during_run": False
+            "daemon": daemon,
+            "priority": priority,
+            "future": None,
+            "started": False,
+            "error_during_run": False,
+            "start_time": 0,
         }
-        self.events.append(event)
+        with self._lock:
+            existing_events = self._events_by_id.get(event_id, [])
+            if deduplicate and existing_events:
+                self.logger.debug(f"Event {event_id} is already queued or running, ignoring")
+                return
+            if coalesce:
+                for existing_event in existing_events:
+                    if not existing_event["started"]:
+                        # the queued event picks up the latest arguments and callbacks
+                        for key in ("function", "kwargs", "completion_functions", "completion_func_with_result", "error_functions", "ignore_messages"):
+                            existing_event[key] = event[key]
+                        self.logger.debug(f"Coalesced event {event_id} into the queued event")
+                        return
+            self.events.append(event)
+            self._events_by_id.setdefault(event_id, []).append(event)
         self.start_event(event)
 
     def start_event(self, event):
+        self.logger.info(f"Queueing event: {event["id"]}")
+        if inspect.iscoroutinefunction(event["function"]):
+            event["future"] = async_web.submit(self._run_async_event(event))
+            event["future"].add_done_callback(lambda future: self._on_async_event_done(event, future))
+            return
+        self._pools[event["priority"]].submit(event)
+
+    def _begin_event(self, event):
+        """
+        Mark the event as started and get the arguments to call its function with.
+
+        Returns:
+            dict or None: The keyword arguments, or None if the event was cancelled before it started.
+        """
+        with self._lock:
+            if event["started"]:
+                # the event was cancelled before it started and has already been reported
+                return None
+            event["started"] = True
         self.logger.info(f"Starting event: {event["id"]}")
-        thread = threading.Thread(target=self._run_event, args=(event,))
-        thread.start()
-        self._main_thread_loop(event)
+        event["start_time"] = perf_counter()
+        return event["kwargs"]
 
     def _run_event(self, event):
+        kwargs = self._begin_event(event)
+        if kwargs is None:
+            return
         try:
-            output = event["function"](**event["kwargs"])
+            output = event["function"](**kwargs)
         except Exception as e:
             self.logger.error(f"Error in event {event["id"]}: {e} \n{traceback.format_exc()}")
             event["error_during_run"] = True
             output = None
+        self._finish_event(event, output)
 
-        self.logger.info(f"Event completed: {event["id"]}")
+    async def _run_async_event(self, event):
+        kwargs = self._begin_event(event)
+        if kwargs is None:
+            return
+        try:
+            output = await event["function"](**kwargs)
+        except asyncio.CancelledError:
+            self.logger.info(f"Event cancelled: {event["id"]}")
+            self.result_queue.put((event, None))
+            return
+        except Exception as e:
+            self.logger.error(f"Error in event {event["id"]}: {e} \n{traceback.format_exc()}")
+            event["error_during_run"] = True
+            output = None
+        self._finish_event(event, output)
+
+    def _on_async_event_done(self, event, future):
+        # a coroutine that is cancelled before it starts never runs, so it has to be reported here
+        if not future.cancelled():
+            return
+        with self._lock:
+            if event["started"]:
+                return
+            event["started"] = True
+        self.logger.info(f"Event cancelled before starting: {event["id"]}")
+        self.result_queue.put((event, None))
+
+    def _finish_event(self, event, output):
+        self.logger.info(f"Event completed: {event["id"]} in {perf_counter() - event["start_time"]:.2f}s")
         if output is None:
             output = {}
 
         if not output:
             self.logger.warning(f"Event {event["id"]} returned no result")
 
-        event["output_queue"].put(output)
+        self.result_queue.put((event, output))
 
-    def _main_thread_loop(self, event):
-        if not event["output_queue"].empty():
+    def _main_thread_loop(self):
+        while True:
+            try:
+                event, output = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
             self.logger.info(f"Processing output for event: {event["id"]}")
-            output = event["output_queue"].get()
-            self._process_output(output, event)
-            return
-        self.window.after(50, self._main_thread_loop, event)
+            try:
+                if output is None:
+                    # the event was cancelled, only run the clean up functions
+                    for completion_func in event["completion_functions"]:
+                        completion_func()
+                else:
+                    self._process_output(output, event)
+            except Exception as e:
+                self.logger.error(f"Error while processing the output of event {event["id"]}: {e} \n{traceback.format_exc()}")
+            finally:
+                self._remove_event(event)
+        self.window.after(constants.App.EVENT_POLL_INTERVAL.value, self._main_thread_loop)
+
+    def _remove_event(self, event):
+        with self._lock:
+            self.events.remove(event)
+            events_with_id = self._events_by_id.get(event["id"], [])
+            events_with_id.remove(event)
+            if not events_with_id:
+                self._events_by_id.pop(event["id"], None)
+        self.logger.info(f"{event["id"]} event result processed and removed from event list")
 
     def _process_output(self, output, event):
         # Assuming result is a dictionary with keys "message_func" and "message_args"
@@ -85,10 +275,6 @@ class ThreadEventManager:
         # if a completion function with result was provided, run it
         # and pass the result of the event to it
         # only if there was no error during the event
-        if event["completion_func_with_result"] and not event["error_during_run"]:
+        if event["completion_func_with_result"] and not event["error_during_run"] and result is not None:
             for completion_func in event["completion_func_with_result"]:
                 completion_func(*result)
-
-        # Remove the event from the list of events
-        self.events.remove(event)
-        self.logger.info(f"{event["id"]} event result processed and removed from event list")
@@ -7,6 +7,7 @@ import customtkinter
 from core.config import constants
 from core.network.web import download_file_with_progress
 from gui.handlers.progress.progress_handler import ProgressHandler
+from gui.handlers.thread_event_manager import EventPriority
 from gui.libs.CTkMessagebox import messagebox
 
 
@@ -63,6 +64,7 @@ class SavesBrowser(customtkinter.CTkToplevel):
             func=self.download_save,
             kwargs={"save": save},
             error_functions=[lambda: messagebox.showerror(self, "Save Download", "An unexpected error occurred while attempting to download this save"), lambda: setattr(self, "downloading_save", False)],
+            priority=EventPriority.TRANSFER,
         )
 
     def download_save(self, save):
@@ -1,28 +1,114 @@
+import argparse
+import multiprocessing
 import sys
+from pathlib import Path
 
 import customtkinter
 
+from core.config import constants
 from core.config.assets import Assets
 from core.config.cache import Cache
 from core.config.paths import Paths
 from core.config.settings import Settings
 from core.config.versions import Versions
 from core.logging.logger import Logger
+from core.network import github, myrient, web
+from core.network.artifact_store import ArtifactStore
+from core.network.myrient_catalog import MyrientCatalog
+from core.utils.library import RomLibraryIndex
+from core.utils.verify import DatIndex, import_dat_file, verify_library
 from gui.emuhaven import EmuHaven
 
 logger = Logger(__name__).get_logger()
 
+# the extensions of the games of each emulator, which its My ROMs tab lists
+GAME_EXTENSIONS = {
+    "dolphin": constants.Dolphin.GAME_FILE_EXTENSIONS.value,
+    "xenia": constants.Xenia.GAME_FILE_EXTENSIONS.value,
+}
+
+
+def run_cli(args, paths, cache):
+    """
+    Run a command from the command line.
+
+    Args:
+        args (list): The command line arguments.
+        paths (Paths): The paths of the application.
+        cache (Cache): The cache of the application.
+
+    Returns:
+        int: The exit code.
+    """
+    parser = argparse.ArgumentParser(prog=constants.App.NAME.value)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import-dat", help="Import a Redump or No-Intro DAT file")
+    import_parser.add_argument("dat_files", nargs="+", type=Path)
+    verify_parser = subparsers.add_parser("verify", help="Verify the games in a directory against the imported DAT files")
+    verify_parser.add_argument("directory", type=Path)
+    verify_parser.add_argument("--recursive", action="store_true", help="Include the games in subdirectories")
+    verify_parser.add_argument("--emulator", choices=sorted(GAME_EXTENSIONS), help="Only include the games of this emulator, instead of the games of every emulator")
+    verify_parser.add_argument("--workers", type=int, default=constants.App.VERIFY_WORKERS.value, help="The number of processes that hash games")
+    arguments = parser.parse_args(args)
+
+    if arguments.command == "import-dat":
+        exit_code = 0
+        for dat_file in arguments.dat_files:
+            import_result = import_dat_file(dat_file, paths.dat_dir)
+            print(import_result["message"])
+            if not import_result["status"]:
+                exit_code = 1
+        return exit_code
+
+    dat_index = DatIndex(paths.dat_dir)
+    if dat_index.load() == 0:
+        print("No DAT files have been imported, import one with the import-dat command")
+        return 1
+    if arguments.emulator:
+        game_extensions = GAME_EXTENSIONS[arguments.emulator]
+    else:
+        game_extensions = sorted({extension for extensions in GAME_EXTENSIONS.values() for extension in extensions})
+    library = RomLibraryIndex(arguments.directory, game_extensions, recursive=arguments.recursive, cache=cache)
+    refresh_result = library.refresh()
+    if not refresh_result["status"]:
+        print(refresh_result["message"])
+        return 1
+    verify_result = verify_library(
+        arguments.directory,
+        library.get_games(),
+        dat_index,
+        cache=cache,
+        on_progress=lambda hashed_bytes, total_bytes: print(f"\rHashed {hashed_bytes / 1024 / 1024:.0f} / {total_bytes / 1024 / 1024:.0f} MiB", end="", flush=True),
+        max_workers=arguments.workers,
+    )
+    if verify_result["hashed"]:
+        print()
+    for result in verify_result["results"]:
+        print(f"{result['status'].upper():<9} {result['game']}" + (f" ({result['dat_game']})" if result["dat_game"] else ""))
+    return 1 if any(result["status"] == "mismatch" for result in verify_result["results"]) else 0
+
+
 if __name__ == "__main__":
+    # the verification pool starts worker processes, which re-run this script when the application is frozen
+    multiprocessing.freeze_support()
     logger.info("Starting the application with arguments: %s", sys.argv[1:])
 
     paths = Paths()
     settings = Settings(paths)
     versions = Versions(paths)
-    cache = Cache(paths)
+    # the cache size limit setting is in MiB
+    cache = Cache(paths, size_limit=settings.cache_size_limit * 1024 * 1024)
+    cache.start_sweeper()
+    github.configure_cache(cache)
+    myrient.configure_catalog(MyrientCatalog(paths.myrient_catalog_file))
+    web.configure_artifact_store(ArtifactStore(paths.artifact_dir, size_limit=constants.App.ARTIFACT_STORE_SIZE_LIMIT.value))
 
     args = sys.argv[1:]
     if args:
         logger.info("Starting the application in CLI mode")
+        exit_code = run_cli(args, paths, cache)
+        cache.close()
+        sys.exit(exit_code)
 
     else:
         try: